@@ -0,0 +1,237 @@
+# =============================================================
+#  athena.py Pipeline - data analysis module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: analysis.py ===
+
+import logging                                # Built-in logging module for log management
+
+import numpy as np
+import pandas as pd
+
+from config_pipeline import (
+    SNAPSHOT_ENABLED,
+    SNAPSHOT_DIR,
+    AVG_CARDINALITY_THRESHOLD,
+    VELOCITY_THRESHOLD_LOW,
+    VELOCITY_THRESHOLD_HIGH,
+    VELOCITY_STATS_FILE,
+    SENSITIVITY_CORRELATION_THRESHOLD,
+    CORRELATION_ALERT_MAX_PAIRS,
+)
+from dataset import compact_dataset
+from imputation import impute_columns
+from notifier import send_alert
+from profiler import traced
+from sheet_snapshot import load_snapshot
+from streaming_stats import update_streaming_stats
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - LOAD AND VALIDATE INPUT DATA
+# Data is loaded (local snapshot first) and checked before training
+
+@traced("data_load")
+def load_and_validate_data(input_ws, active_codes, snapshot_dir=SNAPSHOT_DIR, dtypes=None, methods=None):
+    """
+    Load data from worksheet and validate expected columns.
+    'dtypes' and 'methods' are the legend dtypes and gap-fill methods (typed_loader.py, imputation.py).
+    """
+    logger.info("BLOCK 3.A: DATA LOADING AND INITIAL SETUP")
+    print("\n=== BLOCK 3.A: DATA LOADING AND INITIAL SETUP ===")
+    print("Loading data...")
+
+    df = None
+    if SNAPSHOT_ENABLED:
+        try:
+            df = load_snapshot(input_ws, active_codes, snapshot_dir, dtypes)
+        except Exception as e:
+            send_alert("warning", f"Local snapshot unavailable ({e}). Loading the full worksheet.")
+    if df is None:
+        from data_loader import load_data     # Full-sheet reader, only needed without a snapshot
+        df = load_data(input_ws, active_codes)
+
+    if df is None or df.empty:
+        send_alert("error", "Data load failed or DataFrame is empty.")
+        print("Error: Data load failed or DataFrame is empty.")
+        return None
+
+    missing_cols = [col for col in active_codes if col not in df.columns and col != df.index.name]   # The time code is the index
+    if missing_cols:
+        send_alert("error", f"Missing active columns in loaded DataFrame: {missing_cols}")
+        print(f"Error: Missing active columns: {missing_cols}")
+        return None
+
+    if not active_codes:
+        logger.warning("No active column codes found in legend.")
+        print("Warning: No active column codes found. Training will be skipped.")
+        return None
+
+    if methods:
+        df = impute_columns(df, methods)
+
+    print("Data loading completed.")
+    return compact_dataset(df, "Input data")
+
+
+# BLOC 2 - DATA VARIABILITY ANALYSIS AND ALGORITHM SUGGESTION
+# Analyze feature variability and suggest the most suitable ML algorithm
+
+def analyze_velocity(df, stats_path=VELOCITY_STATS_FILE):
+    """
+    Analyze the rate of change of features in a DataFrame
+    and suggest a suitable ML algorithm based on variability.
+    Statistics are persisted in 'stats_path' and updated with the new rows only
+    (see streaming_stats.py); stats_path=None computes them from scratch.
+    """
+    stats = update_streaming_stats(df, stats_path)
+    mean_velocity = stats.mean_abs_diff()
+
+    logger.info(f"Mean velocity per feature: {mean_velocity}")
+
+    stds = [v for v in stats.std().values() if not np.isnan(v)]
+    cardinalities = list(stats.cardinality().values())
+    avg_std = np.mean(stds) if stds else 0
+    avg_cardinality = np.mean(cardinalities) if cardinalities else 0
+
+    if cardinalities and avg_cardinality > AVG_CARDINALITY_THRESHOLD:
+        suggestion = 'random_forest'
+    elif avg_std < VELOCITY_THRESHOLD_LOW:
+        suggestion = 'linear_regression'
+    elif avg_std > VELOCITY_THRESHOLD_HIGH:
+        suggestion = 'xgboost'
+    else:
+        suggestion = 'gradient_boosting'
+
+    logger.info(f"Suggested algorithm: {suggestion}")
+    return suggestion
+
+
+# BLOC 3.A - CORRELATION ANALYSIS: INPUT VALIDATION
+# Validate DataFrame and isolate non-sensitive features
+
+def correlation_block(df, feature_cols, sensitive_cols):
+    """
+    Pearson correlation of every feature with every sensitive column (features x sensitive).
+    Same result as df[f].corr(df[s]) per pair (pairwise-complete rows), computed with
+    masked matrix products instead of one pandas call per pair.
+    """
+    if not feature_cols or not sensitive_cols:
+        return pd.DataFrame(index=feature_cols, columns=sensitive_cols, dtype=float)
+
+    F = df[feature_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    S = df[sensitive_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    F_mask = ~np.isnan(F)
+    S_mask = ~np.isnan(S)
+
+    # Centering by column mean does not change r but keeps the sums well conditioned
+    with np.errstate(invalid="ignore"):
+        F = np.where(F_mask, F - np.nanmean(F, axis=0), 0.0)
+        S = np.where(S_mask, S - np.nanmean(S, axis=0), 0.0)
+    Fm = F_mask.astype(np.float64)
+    Sm = S_mask.astype(np.float64)
+
+    n = Fm.T @ Sm                                 # Rows where both values are present
+    sum_f = F.T @ Sm
+    sum_s = Fm.T @ S
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = F.T @ S - sum_f * sum_s / n
+        var_f = (F ** 2).T @ Sm - sum_f ** 2 / n
+        var_s = Fm.T @ (S ** 2) - sum_s ** 2 / n
+        corr = cov / np.sqrt(var_f * var_s)
+    corr[(n < 2) | (var_f <= 0) | (var_s <= 0)] = np.nan
+
+    return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=feature_cols, columns=sensitive_cols)
+
+@traced("correlation")
+def analyze_sensitivity_correlation(df, sensitive_cols=None):
+    """Analyze feature sensitivity through correlation with specified columns."""
+    logger.info("BLOCK 3.B: CORRELATION SENSITIVITY ANALYSIS")
+    print("\n=== BLOCK 3.B: CORRELATION SENSITIVITY ANALYSIS ===")
+
+    sensitive_correlations = {}
+    # SENSITIVITY_CORRELATION_THRESHOLD moved to config_pipeline.py
+    bias_detected_corr = False
+
+    if df is None or df.empty or not sensitive_cols:
+        print("Warning: DataFrame is empty or no sensitive columns specified for correlation.")
+        return sensitive_correlations, bias_detected_corr
+
+    feature_cols = [col for col in df.columns if col not in sensitive_cols]
+    if not feature_cols:
+        print("Warning: No features available for correlation analysis.")
+        return sensitive_correlations, bias_detected_corr
+
+# BLOC 3.B - CORRELATION ANALYSIS: PROCESSING
+# Compute the full sensitive-vs-feature correlation block in one matrix operation
+
+    print("Analyzing feature sensitivity using correlation...")
+
+    present_sensitive = [col for col in sensitive_cols if col in df.columns]
+    for sensitive_col in present_sensitive:
+        sensitive_correlations[sensitive_col] = {}
+
+    numeric_features = [col for col in feature_cols if pd.api.types.is_numeric_dtype(df[col])]
+    numeric_sensitive = [col for col in present_sensitive if pd.api.types.is_numeric_dtype(df[col])]
+    corr_block = correlation_block(df, numeric_features, numeric_sensitive)
+
+    flagged = np.argwhere(np.abs(corr_block.values) > SENSITIVITY_CORRELATION_THRESHOLD)
+    flagged_pairs = []
+    for feature_idx, sensitive_idx in flagged:
+        feature_col = corr_block.index[feature_idx]
+        sensitive_col = corr_block.columns[sensitive_idx]
+        corr = corr_block.values[feature_idx, sensitive_idx]
+        sensitive_correlations[sensitive_col][feature_col] = [f"Correlation: {corr:.2f}"]
+        flagged_pairs.append((abs(corr), corr, feature_col, sensitive_col))
+        print(f"  Sens. Col: '{sensitive_col}', Feature: '{feature_col}' - Correlation: {corr:.2f}")
+
+    bias_detected_corr = bool(flagged_pairs)
+
+# BLOC 3.C - CORRELATION ANALYSIS: OUTPUT
+# Print and return correlation results; one summarized notification for all flagged pairs
+
+    if bias_detected_corr:
+        top_pairs = sorted(flagged_pairs, reverse=True)[:CORRELATION_ALERT_MAX_PAIRS]
+        summary = "\n".join(f"- '{feature_col}' vs '{sensitive_col}': {corr:.2f}" for _, corr, feature_col, sensitive_col in top_pairs)
+        more = len(flagged_pairs) - len(top_pairs)
+        if more > 0:
+            summary += f"\n... and {more} more"
+        send_alert(
+            "warning",
+            f"**POTENTIAL BIAS WARNING (Correlation):** {len(flagged_pairs)} feature/sensitive pairs above |r| > {SENSITIVITY_CORRELATION_THRESHOLD}:\n{summary}",
+            notify=True
+        )
+    else:
+        print("No significant correlations detected with the specified sensitive columns.")
+
+    return sensitive_correlations, bias_detected_corr
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module holds the data checks of athena.py (BLOC 2.A, 3.A-3.D) so they
+# can be imported without running the pipeline (benchmark.py, batch runs).
+#
+# - Keep it free of module-level side effects: no CLI parsing, no spreadsheet
+#   access at import time.
+#
+# - Thresholds live in config_pipeline.py (data variability and correlation
+#   sensitivity sections).
+# ================================================================================
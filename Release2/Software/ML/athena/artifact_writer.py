@@ -0,0 +1,303 @@
+# =============================================================
+#  athena.py Pipeline - artifact writer module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: artifact_writer.py ===
+
+import atexit
+import logging                                # Built-in logging module for log management
+import multiprocessing
+import os
+import queue
+import time
+
+import joblib
+import numpy as np
+
+from backends import load_backend
+from profiler import profiler, span
+from config_pipeline import (
+    ARTIFACT_WRITER_ENABLED,
+    ARTIFACT_QUEUE_SIZE,
+    ARTIFACT_MODEL_COMPRESS,
+    ARTIFACT_CLOSE_TIMEOUT,
+)
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - ARTIFACT RENDERERS
+# Run inside the writer process (or inline as a fallback); every file is written atomically
+
+def _atomic_path(path):
+    return f"{path}.tmp-{os.getpid()}"
+
+
+def write_model(path, payload):
+    """payload: {'model': fitted estimator}. Compressed joblib dump."""
+    tmp_path = _atomic_path(path)
+    joblib.dump(payload["model"], tmp_path, compress=ARTIFACT_MODEL_COMPRESS)
+    os.replace(tmp_path, path)
+
+
+def write_shap_summary(path, payload):
+    """payload: {'values', 'base_values', 'data', 'feature_names', 'title'}. SHAP summary plot as PNG."""
+    import matplotlib
+    matplotlib.use("Agg")                     # No display in the writer process
+    plt = load_backend("plotting")
+    shap = load_backend("shap")
+
+    explanation = shap.Explanation(
+        values=np.asarray(payload["values"]),
+        base_values=np.asarray(payload["base_values"]),
+        data=np.asarray(payload["data"]),
+        feature_names=list(payload["feature_names"]),
+    )
+    tmp_path = _atomic_path(path)
+    try:
+        shap.summary_plot(explanation, show=False)
+        plt.title(payload["title"])
+        plt.savefig(tmp_path, format="png")
+    finally:
+        plt.close("all")
+    os.replace(tmp_path, path)
+
+
+WRITERS = {
+    "model": write_model,
+    "shap_summary": write_shap_summary,
+}
+
+
+def _run_task(kind, path, payload):
+    """Write one artifact. Returns a report tuple (kind, path, error or None, seconds)."""
+    start = time.time()
+    try:
+        with span("artifact_write", kind=kind, path=path):
+            WRITERS[kind](path, payload)
+        return kind, path, None, time.time() - start
+    except Exception as e:
+        tmp_path = _atomic_path(path)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return kind, path, f"{type(e).__name__}: {e}", time.time() - start
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def _worker_loop(tasks, reports):
+    """Writer process: consume tasks until the None sentinel."""
+    profiler.drain()                          # Spans inherited from the parent at fork
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        reports.put(_run_task(*task) + (profiler.drain(),))   # Spans go back with the report
+
+
+# BLOC 2 - WRITER PROCESS
+# Bounded task queue: submit() blocks when ARTIFACT_QUEUE_SIZE artifacts are pending
+
+class ArtifactWriter:
+    """
+    Background process that renders and compresses run artifacts:
+    - submit_model() / submit_shap_summary() enqueue work and return immediately
+      (they block only when the queue is full)
+    - close() waits for the queue to drain and returns the run report
+    Without a running process (disabled, not started, or crashed) artifacts are
+    written inline, so nothing is lost.
+    Pool workers forked after start() find the writer with get_writer() and submit
+    to the same queue; their artifacts are announced to the parent's report.
+    """
+
+    def __init__(self, enabled=ARTIFACT_WRITER_ENABLED, queue_size=ARTIFACT_QUEUE_SIZE):
+        self.enabled = enabled
+        self.queue_size = queue_size
+        self._process = None
+        self._owner_pid = os.getpid()
+        self._writer_pid = None
+        self._tasks = None
+        self._reports = None
+        self._submitted = []
+        self._done = {}                       # path -> (kind, path, error, seconds)
+
+    def start(self):
+        """
+        Start the writer process (call early: the process is forked from the current one)
+        and make it this process's get_writer(). Start it before any worker pool is created.
+        """
+        global _active_writer
+        if not self.enabled or self._process is not None:
+            return
+        # fork: athena.py runs its setup at import time, so it must not be re-imported in the child
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._tasks = ctx.Queue(maxsize=self.queue_size)
+        self._reports = ctx.Queue()
+        self._process = ctx.Process(target=_worker_loop, args=(self._tasks, self._reports),
+                                    name="athena-artifact-writer", daemon=True)
+        self._process.start()
+        self._owner_pid = os.getpid()
+        self._writer_pid = self._process.pid
+        _active_writer = self
+        atexit.register(self.close)
+        logger.info(f"Artifact writer started (pid {self._process.pid}, queue size {self.queue_size}).")
+
+    def _alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def _collect(self, timeout=0):
+        """Move finished reports from the writer process into self._done."""
+        if self._reports is None:
+            return
+        while True:
+            try:
+                report = self._reports.get(timeout=timeout) if timeout else self._reports.get_nowait()
+            except queue.Empty:
+                return
+            if len(report) == 2:              # (kind, path) announced by a pool worker
+                self._submitted.append(report)
+                continue
+            self._done[report[1]] = report[:4]
+            profiler.merge(report[4])
+            if report[2]:
+                logger.error(f"Artifact writer: {report[0]} '{report[1]}' failed: {report[2]}")
+            else:
+                logger.info(f"Artifact writer: {report[0]} '{report[1]}' written in {report[3]:.2f} seconds.")
+
+    def submit(self, kind, path, payload):
+        if os.getpid() != self._owner_pid:
+            return self._submit_from_worker(kind, path, payload)
+        self._submitted.append((kind, path))
+        while self._alive():
+            try:
+                self._tasks.put((kind, path, payload), timeout=1)   # Blocks while the queue is full
+                self._collect()
+                return
+            except queue.Full:
+                continue
+        report = _run_task(kind, path, payload)
+        self._done[path] = report
+        if report[2]:
+            logger.error(f"Artifact {kind} '{path}' failed: {report[2]}")
+
+    def _submit_from_worker(self, kind, path, payload):
+        """
+        Forked pool worker: the Process handle only works in the parent, so the writer
+        is checked by pid. The (kind, path) notice goes to the parent's report queue;
+        an artifact written inline here is reported there as well.
+        """
+        self._reports.put((kind, path))
+        while _pid_alive(self._writer_pid):
+            try:
+                self._tasks.put((kind, path, payload), timeout=1)
+                return
+            except queue.Full:
+                continue
+        report = _run_task(kind, path, payload)
+        self._reports.put(report + ([],))
+        if report[2]:
+            logger.error(f"Artifact {kind} '{path}' failed: {report[2]}")
+
+    def submit_model(self, path, model):
+        self.submit("model", path, {"model": model})
+
+    def submit_shap_summary(self, path, shap_values, title):
+        self.submit("shap_summary", path, {
+            "values": shap_values.values,
+            "base_values": shap_values.base_values,
+            "data": shap_values.data,
+            "feature_names": shap_values.feature_names,
+            "title": title,
+        })
+
+    def close(self, timeout=ARTIFACT_CLOSE_TIMEOUT):
+        """Drain the queue, stop the process and return the report (safe to call twice)."""
+        if self._process is not None:
+            deadline = time.time() + timeout
+            if self._alive():
+                try:
+                    self._tasks.put(None, timeout=timeout)
+                except queue.Full:
+                    pass
+            # Reports must be read while waiting: a full pipe would keep the child from exiting
+            while self._alive() and time.time() < deadline:
+                self._collect(timeout=0.5)
+            self._process.join(timeout=max(deadline - time.time(), 0))
+            if self._process.is_alive():
+                logger.error(f"Artifact writer still busy after {timeout} seconds. Terminating.")
+                self._process.terminate()
+                self._process.join()
+            self._collect()
+            self._process = None
+        return self.report()
+
+    def report(self):
+        """{'written': [...], 'failed': [(kind, path, error)], 'pending': [...]} for the run summary."""
+        written, failed, pending = [], [], []
+        for kind, path in self._submitted:
+            if path not in self._done:
+                pending.append(path)
+            elif self._done[path][2]:
+                failed.append((kind, path, self._done[path][2]))
+            else:
+                written.append(path)
+        return {"written": written, "failed": failed, "pending": pending}
+
+
+_active_writer = None                         # Set by ArtifactWriter.start(); inherited by forked workers
+
+
+def get_writer():
+    """The started ArtifactWriter of this run (also inside pool workers forked after start()), or None."""
+    return _active_writer
+
+
+def format_report(report):
+    """One-line summary of close()/report() for logs and the final notification."""
+    return (f"Artifacts: {len(report['written'])} written, {len(report['failed'])} failed, "
+            f"{len(report['pending'])} not completed.")
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module moves SHAP plot rendering and model dumps out of the training loop.
+#
+# - start() forks the writer process: call it before heavy data is loaded so
+#   the child stays small. ARTIFACT_WRITER_ENABLED = False writes inline.
+#
+# - Training code gets the writer with get_writer(). Worker pools forked after
+#   start() (scheduler.run_jobs) share its queue, so model dumps and SHAP plots
+#   of '--workers' / '--zone_workers' / batch.py jobs are written in the
+#   background too and counted in the parent's report. With a non-fork start
+#   method the workers find no writer and write inline.
+#
+# - ARTIFACT_QUEUE_SIZE bounds the artifacts held in memory; submit() blocks
+#   once it is reached. Models are dumped with joblib compress=ARTIFACT_MODEL_COMPRESS.
+#
+# - close() waits up to ARTIFACT_CLOSE_TIMEOUT seconds. Artifacts that did not
+#   finish are reported as 'pending'; files are written via a temporary name,
+#   so a partial file never replaces a previous artifact.
+# ================================================================================
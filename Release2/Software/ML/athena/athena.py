@@ -29,14 +29,20 @@ from config_pipeline import *  # External thresholds and algorithm definitions
 import sys
 import logging
 
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-import xgboost as xgb
 
-from data_loader import load_data
+from prediction_sink import PredictionSink
+from artifact_writer import ArtifactWriter, format_report
 from retrain import retrain_models
 from output_utils import write_predictions, clean_preictions
-from notifier import send_telegram_notification
+from notifier import send_telegram_notification, send_alert, flush_alerts
+from resource_monitor import ResourceMonitor, FitCancelled
+from estimators import ESTIMATORS, available_algorithms, threads_per_fit, limit_native_threads
+from training import build_model, run_temporal_cv, final_fit_and_evaluate, select_by_temporal_cv
+from training import load_cached_result, store_cached_result
+from scheduler import run_algorithms_parallel, run_zones_parallel
+from profiler import profiler, span
+from cost_model import plan_models
+from dataset import read_only_view
 
 # BLOC 0.B - LOGGING UTILITIES
 # Logging configuration and formatted log output
@@ -81,6 +87,10 @@ args = parse_args()
 disabled_blocks = args.disable.split(",") if getattr(args, "disable", None) else []
 logger = setup_logging(getattr(args, "title", "default"))
 
+# --profile: stage timings are written to PROFILE_DIR at exit (see profiler.py)
+if getattr(args, "profile", False):
+    profiler.enable(f"profile_{getattr(args, 'title', 'default')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
 # BLOC 1.B - SPREADSHEET CONNECTION WITH RETRY
 # Connect to spreadsheet and get worksheets with retry logic
 
@@ -96,12 +106,13 @@ output_ws = None
 for attempt in range(1, MAX_RETRIES + 1):
     print(f"Trying to connect to spreadsheet (attempt {attempt}/{MAX_RETRIES})...")
     try:
-        client = get_spreadsheet_client()
-        spreadsheet = client.open(SPREADSHEET_NAME)
-        legend_ws = spreadsheet.worksheet(SHEET_LEGEND)
-        input_ws = spreadsheet.worksheet(SHEET_INPUT)
-        sheet_out_name = args.sheet_output if args.sheet_output else SHEET_OUTPUT
-        output_ws = spreadsheet.worksheet(sheet_out_name)
+        with span("connection", attempt=attempt):
+            client = get_spreadsheet_client()
+            spreadsheet = client.open(SPREADSHEET_NAME)
+            legend_ws = spreadsheet.worksheet(SHEET_LEGEND)
+            input_ws = spreadsheet.worksheet(SHEET_INPUT)
+            sheet_out_name = args.sheet_output if args.sheet_output else SHEET_OUTPUT
+            output_ws = spreadsheet.worksheet(sheet_out_name)
 
         logger.info(f"Successfully connected to spreadsheet '{SPREADSHEET_NAME}' on attempt {attempt}.")
         spreadsheet_ok = True
@@ -123,11 +134,12 @@ active_codes = []
 if spreadsheet_ok and legend_ws:
     print("Extracting active column codes from legend...")
     try:
-        for row in legend_ws.get_all_records():
-            code = row.get("column_code")
-            include = row.get("include", "NO").upper()
-            if code and include == "YES":
-                active_codes.append(code)
+        with span("legend"):
+            for row in legend_ws.get_all_records():
+                code = row.get("column_code")
+                include = row.get("include", "NO").upper()
+                if code and include == "YES":
+                    active_codes.append(code)
 
         logger.info(f"Active column codes extracted: {active_codes}")
         print(f"Active column codes: {active_codes}")
@@ -147,112 +159,78 @@ benchmark_sheet = getattr(args, "benchmark_sheet", None)
 threshold_r2 = getattr(args, "threshold_r2", THRESHOLD_R2_DEFAULT)
 cv_folds = getattr(args, "cv_folds", CV_FOLDS_DEFAULT)
 cv_k = getattr(args, "cv_k", CV_K_DEFAULT)
+output_dir = getattr(args, "output_dir", ".")  # Directory for trained model files
+results = {}  # Global metrics store: results[zone][algo] = {...}
+
+# BLOC 1.E - PREDICTION OUTPUT BUFFER
+# Predictions are spooled locally and written to the output sheet in one batch (see prediction_sink.py)
+
+prediction_sink = PredictionSink(output_ws)
+
+def finalize_predictions(timestamp, zone, prediction, extra=None):
+    """Queue one zone's prediction; nothing is sent until prediction_sink.flush()."""
+    prediction_sink.add(timestamp, zone, prediction, extra)
+
+# BLOC 1.F - ARTIFACT WRITER
+# SHAP plots and model dumps are handed to a background process (see artifact_writer.py)
+
+artifact_writer = ArtifactWriter()
+artifact_writer.start()  # Before any training: worker pools forked later submit to it too (get_writer())
+
+def report_artifacts():
+    """Wait for pending artifacts (workers' included) and add the outcome to the run summary."""
+    report = artifact_writer.close()
+    summary = format_report(report)
+    logger.info(summary)
+    print(summary)
+    if report["failed"] or report["pending"]:
+        details = [f"{kind} {path}: {error}" for kind, path, error in report["failed"]]
+        details += [f"{path}: not completed" for path in report["pending"]]
+        send_alert("error", summary + "\n" + "\n".join(details), notify=True)
+    return summary
 
 # BLOC 2.A - DATA VARIABILITY ANALYSIS AND ALGORITHM SUGGESTION
 # Analyze feature variability and suggest the most suitable ML algorithm
 
 # Thresholds moved to config_pipeline.py
 
-def analyze_velocity(df):
-    """
-    Analyze the rate of change of features in a DataFrame
-    and suggest a suitable ML algorithm based on variability.
-    """
-    numeric_df = df.select_dtypes(include='number')
-    diffs = numeric_df.diff().abs()
-    mean_velocity = diffs.mean()
-
-    logger.info(f"Mean velocity per feature: {mean_velocity.to_dict()}")
-
-    numeric_cols = df.select_dtypes(include='number')
-    categorical_cols = df.select_dtypes(exclude='number')
-    avg_std = numeric_cols.std().mean() if not numeric_cols.empty else 0
-    avg_cardinality = categorical_cols.nunique().mean() if not categorical_cols.empty else 0
-
-    if not categorical_cols.empty and avg_cardinality > AVG_CARDINALITY_THRESHOLD:
-        suggestion = 'random_forest'
-    elif avg_std < VELOCITY_THRESHOLD_LOW:
-        suggestion = 'linear_regression'
-    elif avg_std > VELOCITY_THRESHOLD_HIGH:
-        suggestion = 'xgboost'
-    else:
-        suggestion = 'gradient_boosting'
-
-    logger.info(f"Suggested algorithm: {suggestion}")
-    return suggestion
+from analysis import analyze_velocity  # Moved to analysis.py
 
 # BLOC 2.B - SMART MODEL SELECTION BASED ON CONTEXT
-# Suggest candidate models based on data size and available resources
-
-import psutil
+# Suggest candidate models from their predicted fit cost and the time/RAM budget (see cost_model.py)
 
-def select_smart_models(df, prediction_hours=3):
+def select_smart_models(df, prediction_hours=3, time_budget=MODEL_TIME_BUDGET, ram_budget=None, candidates=None):
     """
-    Analyze data and machine resources to suggest an ordered list of ML models.
+    Suggest an ordered list of ML models that fit the time/RAM budget.
+    Fit time and peak RAM are predicted from rows x features by the cost model
+    calibrated on previous runs (see cost_model.py). 'candidates' (default: every
+    installed algorithm suited to the data) keeps its order. Returns [(algo, rows)]:
+    rows below len(df) means training on that many most recent rows.
     """
-    row_count = len(df)
-    free_ram_mb = psutil.virtual_memory().available / 1024**2
     has_categorical = not df.select_dtypes(exclude='number').empty
+    features = max(df.select_dtypes(include='number').shape[1] - 1, 1)   # One column is the target
+
+    if candidates is None:
+        priority = ["linear_regression", "random_forest", "gradient_boosting", "xgboost", "lightgbm", "svr", "knn", "catboost"]
+        candidates = [algo for algo in available_algorithms(priority)
+                      if not (algo == "xgboost" and has_categorical) and not (algo == "catboost" and not has_categorical)]
+    plan = plan_models(candidates, len(df), features, time_budget, ram_budget)
 
-    models = []
-    models.append(("LinearRegression", 1))
-
-    if free_ram_mb > 50:
-        models.append(("Ridge", 2))
-    if row_count < 1000 and free_ram_mb > 100:
-        models.append(("RandomForest", 3))
-    if row_count < 1000 and free_ram_mb > 150:
-        models.append(("GradientBoosting", 4))
-    if row_count < 500 and free_ram_mb > 300 and not has_categorical:
-        models.append(("XGBoost", 5))
-    if row_count < 700 and free_ram_mb > 250:
-        models.append(("LightGBM", 6))
-    if row_count < 500 and free_ram_mb > 150:
-        models.append(("SVR", 7))
-    if row_count < 500 and free_ram_mb > 200:
-        models.append(("KNN", 8))
-    if has_categorical and free_ram_mb > 400:
-        models.append(("CatBoost", 9))
-
-    sorted_models = sorted(models, key=lambda x: x[1])
     print("\n[INFO] Suggested models (ordered):")
-    for name, priority in sorted_models:
-        print(f"  [{priority}] {name}")
+    for i, entry in enumerate(plan, 1):
+        subsample = "" if entry["rows"] >= len(df) else f", last {entry['rows']} of {len(df)} rows"
+        print(f"  [{i}] {entry['algo']} (~{entry['seconds']:.0f}s, ~{entry['peak_mb']:.0f} MB{subsample})")
 
-    return [name for name, _ in sorted_models]
+    return [(entry["algo"], entry["rows"]) for entry in plan]
 
 # BLOC 3.A - LOAD AND VALIDATE INPUT DATA
 # Begin operational phase: data is loaded and checked before training
 
-from tqdm import tqdm
 import pandas as pd
 
-def load_and_validate_data(input_ws, active_codes):
-    """Load data from worksheet and validate expected columns."""
-    logger.info("BLOCK 3.A: DATA LOADING AND INITIAL SETUP")
-    print("\n=== BLOCK 3.A: DATA LOADING AND INITIAL SETUP ===")
-    print("Loading data...")
-
-    df = load_data(input_ws, active_codes)
-
-    if df is None or df.empty:
-        send_alert("error", "Data load failed or DataFrame is empty.")
-        print("Error: Data load failed or DataFrame is empty.")
-        return None
-
-    missing_cols = [col for col in active_codes if col not in df.columns]
-    if missing_cols:
-        send_alert("error", f"Missing active columns in loaded DataFrame: {missing_cols}")
-        print(f"Error: Missing active columns: {missing_cols}")
-        return None
-
-    if not active_codes:
-        logger.warning("No active column codes found in legend.")
-        print("Warning: No active column codes found. Training will be skipped.")
-        return None
-
-    print("Data loading completed.")
-    return df
+from analysis import load_and_validate_data  # Moved to analysis.py
+from typed_loader import legend_dtypes
+from imputation import legend_methods
 
 # BLOC 3.B - CORRELATION ANALYSIS: INPUT VALIDATION
 # Validate DataFrame and isolate non-sensitive features
@@ -263,60 +241,7 @@ from logging import getLogger
 
 logger = getLogger(__name__)
 
-def analyze_sensitivity_correlation(df, sensitive_cols=None):
-    """Analyze feature sensitivity through correlation with specified columns."""
-    logger.info("BLOCK 3.B: CORRELATION SENSITIVITY ANALYSIS")
-    print("\n=== BLOCK 3.B: CORRELATION SENSITIVITY ANALYSIS ===")
-
-    sensitive_correlations = {}
-    # SENSITIVITY_CORRELATION_THRESHOLD moved to config_pipeline.py
-    bias_detected_corr = False
-
-    if df is None or df.empty or not sensitive_cols:
-        print("Warning: DataFrame is empty or no sensitive columns specified for correlation.")
-        return sensitive_correlations, bias_detected_corr
-
-    feature_cols = [col for col in df.columns if col not in sensitive_cols]
-    if not feature_cols:
-        print("Warning: No features available for correlation analysis.")
-        return sensitive_correlations, bias_detected_corr
-
-# BLOC 3.C - CORRELATION ANALYSIS: PROCESSING
-# Iterate features and compute correlations with sensitive columns
-
-    print("Analyzing feature sensitivity using correlation...")
-
-    for sensitive_col in sensitive_cols:
-        if sensitive_col in df.columns:
-            sensitive_correlations[sensitive_col] = {}
-
-            for feature_col in feature_cols:
-                if pd.api.types.is_numeric_dtype(df[feature_col]) and pd.api.types.is_numeric_dtype(df[sensitive_col]):
-                    corr = df[feature_col].corr(df[sensitive_col])
-
-                    if abs(corr) > SENSITIVITY_CORRELATION_THRESHOLD:
-                        bias_detected_corr = True
-
-                        if feature_col not in sensitive_correlations[sensitive_col]:
-                            sensitive_correlations[sensitive_col][feature_col] = []
-
-                        sensitive_correlations[sensitive_col][feature_col].append(f"Correlation: {corr:.2f}")
-                        print(f"  Sens. Col: '{sensitive_col}', Feature: '{feature_col}' - Correlation: {corr:.2f}")
-                        send_telegram_notification(
-                            f"**POTENTIAL BIAS WARNING (Correlation):**\n"
-                            f"Significant correlation ({corr:.2f}) found between feature '{feature_col}' and sensitive column '{sensitive_col}'."
-                        )
-
-# BLOC 3.D - CORRELATION ANALYSIS: OUTPUT
-# Print and return correlation results
-
-    if sensitive_correlations:
-        send_alert("warning", f"Potential feature-sensitivity correlations: {sensitive_correlations}", notify=True)
-        print(f"Warning: Potential correlations found: {sensitive_correlations}")
-    else:
-        print("No significant correlations detected with the specified sensitive columns.")
-
-    return sensitive_correlations, bias_detected_corr
+from analysis import correlation_block, analyze_sensitivity_correlation  # Moved to analysis.py
 
 # BLOC 4.A - HANDLE BIAS WARNING
 # Display warning if bias is detected and prepare initial algorithm list
@@ -344,7 +269,7 @@ def select_algorithms(suggested_algo, bias_alert, algos_to_run):
         if sys.stdin.isatty():
             ask_more = input("Do you want to manually select which algorithms to run? [Y/n]: ")
             if ask_more.lower() in ["", "y", "yes"]:
-                choices = ["linear_regression", "random_forest", "xgboost", "gradient_boosting", "all"]
+                choices = available_algorithms(list(ESTIMATORS)) + ["all"]
                 print("Choose algorithms:")
                 for i, opt in enumerate(choices, 1):
                     print(f" [{i}] {opt}")
@@ -394,16 +319,16 @@ def select_algorithms(suggested_algo, bias_alert, algos_to_run):
     elif sys.stdin.isatty():
         use_default = input("Do you want to use the suggested algorithm? [Y/n]: ")
         if use_default.lower() not in ["", "y", "yes"]:
-            choices = ["linear_regression", "random_forest", "xgboost", "gradient_boosting", "all"]
+            choices = available_algorithms(list(ESTIMATORS)) + ["all"]
             print("Choose algorithm:")
             for i, opt in enumerate(choices, 1):
                 print(f" [{i}] {opt}")
             sel = input("Enter number: ")
             try:
                 idx = int(sel) - 1
-                if idx == 4:
+                if idx == len(choices) - 1:
                     algos_to_run = choices[:-1]
-                elif 0 <= idx < 4:
+                elif 0 <= idx < len(choices) - 1:
                     algos_to_run = [choices[idx]]
                 else:
                     logger.warning(f"Invalid algorithm choice, using suggested: {suggested_algo}")
@@ -481,7 +406,7 @@ def train_and_evaluate(algo, model, X, y, zone, logger, threshold_r2, thr_eff, b
         if r2 < threshold_r2:
             alert_msg = f"**WARNING:** Performance below threshold (R²={r2:.2f} < {threshold_r2:.2f})"
             send_alert("warning", alert_msg, zone=zone, algo=algo, notify=True)
-alerts.append(alert_msg)
+            alerts.append(alert_msg)
 
         if r2 > best_r2_zone:
             best_r2_zone = r2
@@ -503,8 +428,7 @@ alerts.append(alert_msg)
 
 import numpy as np
 import pandas as pd
-import shap
-import matplotlib.pyplot as plt
+from shap_engine import compute_shap_values
 
 def compute_feature_importance_shap(algo, model, X, zone, logger, r2, threshold_r2):
     feature_importance_shap = None
@@ -517,8 +441,10 @@ def compute_feature_importance_shap(algo, model, X, zone, logger, r2, threshold_
             print(f"    {algo} Feature Importance:\n{importance.head()}")
 
         try:
-            explainer_shap = shap.Explainer(model, X)
-            shap_values = explainer_shap(X)
+            shap_values = compute_shap_values(model, X, algo)
+            if len(shap_values.values) == 0:
+                logger.warning(f"{zone} - {algo}: SHAP time budget spent before any row was explained.")
+                return feature_importance_shap, None
             mean_abs_shap = np.abs(shap_values.values).mean(axis=0)
             feature_importance_shap = pd.DataFrame(list(zip(X.columns, mean_abs_shap)), columns=['Feature', 'SHAP Importance']).sort_values(by='SHAP Importance', ascending=False)
 
@@ -526,12 +452,9 @@ def compute_feature_importance_shap(algo, model, X, zone, logger, r2, threshold_
             print(f"    {algo} SHAP Importance:\n{feature_importance_shap.head()}")
 
             if r2 > threshold_r2 - 0.05:
-                shap.summary_plot(shap_values, features=X, show=False)
-                plt.title(f"{zone} - SHAP Summary Plot ({algo})")
-                plt.savefig(f"shap_summary_{zone}_{algo}.png")
-                plt.close()
-                logger.info(f"{zone} - SHAP Summary Plot saved.")
-                print(f"  {zone} - SHAP Summary Plot generated.")
+                artifact_writer.submit_shap_summary(f"shap_summary_{zone}_{algo}.png", shap_values, f"{zone} - SHAP Summary Plot ({algo})")
+                logger.info(f"{zone} - SHAP Summary Plot queued.")
+                print(f"  {zone} - SHAP Summary Plot queued.")
 
         except Exception as e_shap:
             logger.error(f"SHAP error for {algo} - zone {zone}: {e_shap}")
@@ -555,13 +478,16 @@ def analyze_bias(algo, X, zone, logger, feature_importance_shap, shap_values, bi
             top_features = feature_importance_shap['Feature'].head(3).tolist()
             for feature in top_features:
                 if feature in X.columns:
-                    median_val = X[feature].median()
-                    group_low = X[X[feature] <= median_val]
-                    group_high = X[X[feature] > median_val]
-
-                    if not group_low.empty and not group_high.empty:
-                        shap_low = shap_values[group_low.index].values[:, X.columns.get_loc(feature)].mean()
-                        shap_high = shap_values[group_high.index].values[:, X.columns.get_loc(feature)].mean()
+                    # shap_values may cover a subsample of X: compare groups on the explained rows
+                    col = X.columns.get_loc(feature)
+                    explained = shap_values.data[:, col]
+                    median_val = np.median(explained)
+                    mask_low = explained <= median_val
+                    mask_high = ~mask_low
+
+                    if mask_low.any() and mask_high.any():
+                        shap_low = shap_values.values[mask_low, col].mean()
+                        shap_high = shap_values.values[mask_high, col].mean()
                         difference = abs(shap_high - shap_low)
 
                         if difference > 0.05:
@@ -591,11 +517,8 @@ def analyze_bias(algo, X, zone, logger, feature_importance_shap, shap_values, bi
 # BLOCK 5.D sec 1 - MAIN TRAINING LOOP FOR ALGORITHM - SECTION 1: Initialization and Resource Monitoring
 # Iterate over algorithms: monitor resources and attempt cross-validation
 
-import psutil
 import numpy as np
-from sklearn.model_selection import train_test_split
 import time
-from sklearn.metrics import mean_squared_error
 
 # BLOCK 5.D sec 1 - sub-section A - USER INTERFACE FOR DATA TYPE SELECTION
 
@@ -621,138 +544,65 @@ else:
     send_alert("warning", "Invalid choice in data type selection. Using default algorithm order.")
     algos_to_run_ordered = algos_to_run
 
+# Menus list every registered algorithm: drop the ones whose library is not installed
+algos_to_run_ordered = available_algorithms(algos_to_run_ordered)
+
 # Now we use the ordered list for iteration
-for algo in algos_to_run_ordered:
-    logger.info(f"Attempting algorithm: {algo}")
-    print(f"  Attempting algorithm: {algo}")
-    model = None
+max_ram_threshold = getattr(args, "max_ram_percentage", MAX_RAM_PERCENTAGE)
+max_cpu_threshold = getattr(args, "max_cpu_percentage", MAX_CPU_PERCENTAGE)
+workers = getattr(args, "workers", PARALLEL_WORKERS_DEFAULT)
+
+if max_ram_threshold > MAX_RAM_PERCENTAGE or max_cpu_threshold > MAX_CPU_PERCENTAGE:
+    send_alert("warning", "Configured resource thresholds are higher than recommended defaults.", zone=zone)
+
+# BLOCK 5.D sec 0 - PARALLEL MODE
+# With --workers != 1, algorithms are evaluated in worker processes admitted against the RAM budget
+
+if workers != 1:
+    parallel_results = run_algorithms_parallel(
+        algos_to_run_ordered, X, y, X_test, y_test, zone, output_dir, workers,
+        max_ram=max_ram_threshold, max_cpu=max_cpu_threshold
+    )
+    for algo, metrics in parallel_results.items():
+        results[zone].setdefault(algo, {}).update(metrics)
+    algos_to_run_sequential = []
+else:
+    algos_to_run_sequential = algos_to_run_ordered
 
-    max_ram_threshold = getattr(args, "max_ram_percentage", MAX_RAM_PERCENTAGE_DEFAULT)
-    max_cpu_threshold = getattr(args, "max_cpu_percentage", MAX_CPU_PERCENTAGE_DEFAULT)
+# Sequential fits get the whole thread budget (see estimators.py)
+fit_threads = threads_per_fit(1)
+limit_native_threads(fit_threads)
 
-    if max_ram_threshold > MAX_RAM_PERCENTAGE_DEFAULT or max_cpu_threshold > MAX_CPU_PERCENTAGE_DEFAULT:
-        send_alert("warning", "Configured resource thresholds are higher than recommended defaults.", zone=zone, algo=algo)
+# Resource usage is sampled on a background thread for the whole loop (see resource_monitor.py)
+resource_monitor = ResourceMonitor(max_cpu=max_cpu_threshold, max_ram=max_ram_threshold).start()
 
-    high_resource_counter = 0
-    critical_resource_counter = 0
-    exceeded_resources = False
+for algo in algos_to_run_sequential:
+    logger.info(f"Attempting algorithm: {algo}")
+    print(f"  Attempting algorithm: {algo}")
 
-    if algo == "linear_regression":
-        model = LinearRegression()
-    elif algo == "random_forest":
-        model = RandomForestRegressor()
-    elif algo == "xgboost":
-        model = xgb.XGBRegressor()
-    elif algo == "gradient_boosting":
-        model = GradientBoostingRegressor()
-    elif algo == "lightgbm":
-        from lightgbm import LGBMRegressor
-        model = LGBMRegressor()
-    elif algo == "svr":
-        from sklearn.svm import SVR
-        model = SVR()
-    elif algo == "knn":
-        from sklearn.neighbors import KNeighborsRegressor
-        model = KNeighborsRegressor()
-    elif algo == "catboost":
-        from catboost import CatBoostRegressor
-        model = CatBoostRegressor(verbose=0)
-    else:
+    model = build_model(algo, fit_threads)
+    if model is None:
         send_alert("warning", f"Unrecognized algorithm '{algo}'. Skipping.", zone=zone)
         continue
 
-# BLOCK 5.D sec 1 - sub-section B: Implementing Time Series Rolling Window Validation ---
-    total_rows = len(X)
-    num_cycles = 5
-    fold_size = total_rows // 6
-    cycle_performances = []
-
-    start_time_cv = time.time()
-
-    while True:  # Keep while True for resource monitoring
-        cpu_percent = psutil.cpu_percent()
-        ram_percent = psutil.virtual_memory().percent
-        logger.info(f"{zone} - {algo}: CPU Usage = {cpu_percent}%, RAM Usage = {ram_percent}%")
-
-        if cpu_percent > max_cpu_threshold or ram_percent > max_ram_threshold:
-            high_resource_counter += RESOURCE_MONITORING_INTERVAL
-            if high_resource_counter >= HIGH_RESOURCE_THRESHOLD_DURATION:
-                send_alert(
-                    "warning",
-                    f"High resource usage (CPU > {max_cpu_threshold}%, RAM > {max_ram_threshold}%) for {HIGH_RESOURCE_THRESHOLD_DURATION} seconds. Potential saturation risk.",
-                    zone=zone,
-                    algo=algo,
-                    notify=True
-                )
-                critical_resource_counter += RESOURCE_MONITORING_INTERVAL
-                if critical_resource_counter >= CRITICAL_RESOURCE_THRESHOLD_DURATION:
-                    send_alert(
-                        "error",
-                        f"Critical resource usage exceeded for {CRITICAL_RESOURCE_THRESHOLD_DURATION + HIGH_RESOURCE_THRESHOLD_DURATION} seconds. Stopping current algorithm '{algo}'.",
-                        zone=zone,
-                        algo=algo,
-                        notify=True
-                    )
-                    exceeded_resources = True
-                    break
-        else:
-            high_resource_counter = 0
-            critical_resource_counter = 0
-
-        for i in range(num_cycles):
-            train_start = 0
-            train_end = (i + 1) * fold_size
-            predict_start = train_end
-            predict_end = min((i + 2) * fold_size, total_rows)
+    # Unchanged data/algorithm/config since a previous run: reuse the cached model and metrics
+    cache_key = None
+    if MODEL_CACHE_ENABLED:
+        cache_key, cached_metrics = load_cached_result(algo, model, X, y, X_test, y_test, zone, output_dir)
+        if cached_metrics is not None:
+            results[zone].setdefault(algo, {}).update(cached_metrics)
+            continue
 
-            if predict_start >= total_rows:
-                break
+    resource_monitor.set_context(zone, algo)
+    exceeded_resources = False
 
-            X_train_temp = X[train_start:train_end]
-            y_train_temp = y[train_start:train_end]
-            X_predict_temp = X[predict_start:predict_end]
-            y_true_temp = y[predict_start:predict_end]
+# BLOCK 5.D sec 1 - sub-section B: Implementing Time Series Rolling Window Validation ---
+# Folds run back-to-back; the monitor cancels the in-flight fit if limits are exceeded (see training.py)
 
-            try:
-                model.fit(X_train_temp, y_train_temp)
-                predictions_temp = model.predict(X_predict_temp)
-
-                rmse = np.sqrt(mean_squared_error(y_true_temp, predictions_temp))
-                cycle_performances.append(rmse)
-                logger.info(f"{zone} - {algo}: Temporal CV Cycle {i+1} RMSE = {rmse:.4f}")
-                print(f"  {algo}: Temporal CV Cycle {i+1} RMSE = {rmse:.4f}")
-
-            except Exception as e:
-                send_alert(
-                    "error",
-                    f"{zone} - {algo}: Error during temporal CV cycle {i+1}: {e}",
-                    zone=zone,
-                    algo=algo
-                )
-                print(f"  {algo}: Error during temporal CV cycle {i+1}: {e}")
-                cycle_performances.append(np.nan)
-
-            time.sleep(RESOURCE_MONITORING_INTERVAL)
-
-        end_time_cv = time.time()
-        cv_time = end_time_cv - start_time_cv
-        mean_rmse = np.nanmean(cycle_performances)
-        logger.info(f"{zone} - {algo}: Temporal CV completed in {cv_time:.2f} seconds. Mean RMSE = {mean_rmse:.4f}")
-        print(f"  {algo}: Temporal CV completed in {cv_time:.2f} seconds. Mean RMSE = {mean_rmse:.4f}")
-
-        # Invert sign for consistency with previous logic (though lower RMSE is better here)
-        thr_cv = -mean_rmse
-
-        # May need to adapt 'thr_cv' logic if used elsewhere for selection.
-        # For now, directly store mean_rmse in results.
-        results[zone][algo] = {
-            "temporal_cv_rmse_mean": mean_rmse,
-            "temporal_cv_rmse_cycles": cycle_performances,
-            "temporal_cv_time": cv_time
-        }
-
-        exceeded_resources = False
-        break
+    try:
+        results[zone].setdefault(algo, {}).update(run_temporal_cv(algo, model, X, y, zone, resource_monitor))
+    except FitCancelled:
+        exceeded_resources = True
 # --- END OF: Implementing Time Series Rolling Window Validation ---
 
 
@@ -772,12 +622,13 @@ for algo in algos_to_run_ordered:
                 try:
                     reduction_percent = float(input("Enter the percentage to reduce the dataset (e.g., 0.8 for 80%): "))
                     if 0 < reduction_percent < 1:
+                        from sklearn.model_selection import train_test_split
                         X_reduced, _, y_reduced, _ = train_test_split(X, y, train_size=reduction_percent, random_state=42) # Reduce the dataset
                         X, y = X_reduced, y_reduced # Update X and y with the reduced dataset
                         logger.info(f"{zone}: Dataset reduced to {reduction_percent*100}% for algorithm '{algo}'.") # Log dataset reduction
                         print(f"  Dataset reduced. Retrying cross-validation for '{algo}'.") # Print info about retrying
-                        high_resource_counter = 0 # Reset resource counters after data reduction
-                        critical_resource_counter = 0
+                        resource_monitor.set_context(zone, algo) # Reset resource counters after data reduction
+                        cache_key = None # Results on a reduced dataset are not cached
                         exceeded_resources = False # Reset the flag
                         break
                     else:
@@ -801,44 +652,24 @@ for algo in algos_to_run_ordered:
             continue # Skip to the next algorithm
 
     if not exceeded_resources:
-        logger.info(f"{zone} - {algo}: Starting final training and evaluation.")
-        print(f"  Starting final training and evaluation for '{algo}'.")
-        start_time = time.time()
-        model.fit(X, y) # Train the model on the full dataset (or reduced if user chose to)
-        end_time = time.time()
-        training_time = end_time - start_time
-        logger.info(f"{zone} - {algo}: Training completed in {training_time:.2f} seconds.")
-        print(f"    Training completed in {training_time:.2f} seconds.")
-
-        y_pred = model.predict(X_test)
-        r2 = r2_score(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-
-        logger.info(f"{zone} - {algo}: R² = {r2:.4f}, RMSE = {rmse:.4f}")
-        print(f"    R² on test set: {r2:.4f}")
-        print(f"    RMSE on test set: {rmse:.4f}")
-
-        model_filename = f"{zone}_{algo}_trained_model.joblib"
-        joblib.dump(model, os.path.join(output_dir, model_filename))
-        logger.info(f"{zone} - {algo}: Trained model saved to {os.path.join(output_dir, model_filename)}")
-        print(f"    Trained model saved to {os.path.join(output_dir, model_filename)}")
-
-        results[zone][algo] = {"r2": r2, "rmse": rmse, "training_time": training_time, "model_path": os.path.join(output_dir, model_filename)}
+        try:
+            # Train the model on the full dataset (or reduced if user chose to)
+            metrics = final_fit_and_evaluate(algo, model, X, y, X_test, y_test, zone, output_dir, resource_monitor, artifact_writer)
+        except FitCancelled:
+            logger.info(f"{zone}: Final training of '{algo}' stopped due to resource issues.")
+            print(f"  Final training of '{algo}' stopped due to resource issues.")
+            continue
+        results[zone].setdefault(algo, {}).update(metrics)
+        store_cached_result(cache_key, model, results[zone][algo])
+
+resource_monitor.stop()
 
 # BLOC 5.E SECTION 1 - v1.2 Model Selection based on Temporal Validation
 
 selected_models_temporal_cv = {}
 
 for zone, algo_results in results.items():
-    best_algo = None
-    best_rmse = float('inf')
-
-    for algo, metrics in algo_results.items():
-        if "temporal_cv_rmse_mean" in metrics:
-            rmse = metrics["temporal_cv_rmse_mean"]
-            if rmse < best_rmse:
-                best_rmse = rmse
-                best_algo = algo
+    best_algo, best_rmse = select_by_temporal_cv(algo_results)
 
     if best_algo:
         selected_models_temporal_cv[zone] = best_algo
@@ -873,16 +704,8 @@ else:
         logger.info(f"Fallback algorithm: {fallback}")
         print(f"  Fallback algorithm: {fallback}")
         try:
-            model = None
-            if fallback == "linear_regression":
-                model = LinearRegression()
-            elif fallback == "random_forest":
-                model = RandomForestRegressor()
-            elif fallback == "xgboost":
-                model = xgb.XGBRegressor()
-            elif fallback == "gradient_boosting":
-                model = GradientBoostingRegressor()
-            if model:
+            model = build_model(fallback)
+            if model is not None:
                 model.fit(X, y)
                 from sklearn.metrics import r2_score
                 y_pred = model.predict(X)
@@ -916,10 +739,59 @@ if bias_alert:
             print(f"  Algorithm: {algo}, R²: {metrics['r2']:.2f}, Prediction: {metrics['prediction']}")
     print("Please review model performance and sensitive features carefully.")
 
+# BLOC 5.F - MULTI-ZONE TRAINING
+# Train and select a model for every zone; zones run in parallel worker processes with --zone_workers
+
+def train_and_choose_modelli(df, active_codes, target_map, algos_to_run, use_benchmark, best_history, threshold_r2, cv_folds, cv_k, final_bias_alert):
+    """Train all zones, merge their results in zone order and write the final predictions."""
+    target_codes = args.target.split(",") if getattr(args, "target", None) else active_codes
+    zones = [target_map.get(code, code) for code in target_codes if target_map.get(code, code) in df.columns]
+    zone_workers = getattr(args, "zone_workers", PARALLEL_WORKERS_DEFAULT)
+    max_ram_threshold = getattr(args, "max_ram_percentage", MAX_RAM_PERCENTAGE)
+    max_cpu_threshold = getattr(args, "max_cpu_percentage", MAX_CPU_PERCENTAGE)
+
+    # The cost model drops algorithms that exceed the time/RAM budget and subsamples the others if needed
+    train_rows = dict(select_smart_models(df, candidates=algos_to_run))
+    for algo in algos_to_run:
+        if algo not in train_rows:
+            send_alert("warning", f"'{algo}' exceeds the time/RAM budget even on {MODEL_MIN_TRAIN_ROWS} rows. Skipped.")
+    if train_rows:
+        algos_to_run = [algo for algo in algos_to_run if algo in train_rows]
+    else:
+        send_alert("warning", "No algorithm fits the time/RAM budget. Training the selected ones on all rows.")
+
+    logger.info(f"Training {len(zones)} zones with {zone_workers} zone worker(s): {zones}")
+    print(f"\nTraining {len(zones)} zones: {zones}")
+
+    zone_outputs = run_zones_parallel(
+        zones, df, algos_to_run, output_dir, zone_workers,
+        max_ram=max_ram_threshold, max_cpu=max_cpu_threshold, train_rows=train_rows
+    )
+
+    # Deterministic merge: always in zone order, whatever order the workers finished in
+    for zone in zones:
+        if zone not in zone_outputs:
+            send_alert("error", "Zone training failed. No prediction written.", zone=zone, notify=True)
+            continue
+
+        results[zone] = zone_outputs[zone]["results"]
+        selection = zone_outputs[zone]["selection"]
+        final_algo, final_pred, final_r2 = selection["algo"], selection["prediction"], selection["r2"]
+
+        if final_algo is None:
+            send_alert("warning", "No valid model found for zone.", zone=zone)
+            continue
+
+        logger.info(f"Selected for {zone}: {final_algo} with R²={final_r2:.2f}, prediction={final_pred}")
+        print(f"  Selected for {zone}: {final_algo} (R²={final_r2:.2f}), Prediction: {final_pred}")
+        finalize_predictions(df.index[-1].isoformat(), zone, final_pred, {"algo": final_algo, "r2": final_r2})
+
+    return results
+
 # BLOC 6.A - POST-PROCESSING AND FINAL NOTIFICATION
 # Clean prediction buffer and optionally notify via Telegram
 
-def postprocess_and_notify():
+def postprocess_and_notify(run_summary=None):
     logger.info("START BLOCK 6: POST-PROCESSING AND FINAL NOTIFICATION")
     print("\n=== BLOCK 6: POST-PROCESSING AND FINAL NOTIFICATION ===")
     
@@ -933,7 +805,11 @@ def postprocess_and_notify():
         print("Post-processing skipped.")
 
     if "notify" not in disabled_blocks:
-        send_telegram_notification(f"Script completed at {datetime.datetime.now().isoformat()}")
+        message = f"Script completed at {datetime.datetime.now().isoformat()}"
+        if run_summary:
+            message += f"\n{run_summary}"
+        flush_alerts()  # Queued alerts first, so the completion message arrives last
+        send_telegram_notification(message)
         print("Telegram notification sent.")
     else:
         logger.info("ADMIN: skipping final notification")
@@ -953,6 +829,7 @@ if __name__ == "__main__":
     input_ws = None
     output_ws = None
     active_codes = []
+    legend_entries = {}                       # {code: legend row} of the enabled columns
 
     sensitive_cols = getattr(args, "sensitive_cols", None)
     if sensitive_cols:
@@ -969,11 +846,13 @@ if __name__ == "__main__":
     for attempt in range(1, MAX_RETRIES + 1):
         print(f"Attempting spreadsheet connection ({attempt}/{MAX_RETRIES})...")
         try:
-            client = get_spreadsheet_client()
-            spreadsheet = client.open(SPREADSHEET_NAME)
-            legend_ws = spreadsheet.worksheet(SHEET_LEGEND)
-            input_ws = spreadsheet.worksheet(SHEET_INPUT)
-            output_ws = spreadsheet.worksheet(SHEET_OUTPUT)
+            with span("connection", attempt=attempt):
+                client = get_spreadsheet_client()
+                spreadsheet = client.open(SPREADSHEET_NAME)
+                legend_ws = spreadsheet.worksheet(SHEET_LEGEND)
+                input_ws = spreadsheet.worksheet(SHEET_INPUT)
+                output_ws = spreadsheet.worksheet(SHEET_OUTPUT)
+            prediction_sink.output_ws = output_ws
             logger.info(f"Spreadsheet connection to '{SPREADSHEET_NAME}' successful on attempt {attempt}.")
             spreadsheet_ok = True
             break
@@ -992,11 +871,13 @@ if __name__ == "__main__":
     if spreadsheet_ok and legend_ws:
         print("Extracting enabled column codes from legend...")
         try:
-            for row in legend_ws.get_all_records():
-                code = row.get("column code")
-                include = row.get("include", "NO").upper()
-                if code and include == "YES":
-                    active_codes.append(code)
+            with span("legend"):
+                for row in legend_ws.get_all_records():
+                    code = row.get("column code")
+                    include = row.get("include", "NO").upper()
+                    if code and include == "YES":
+                        active_codes.append(code)
+                        legend_entries[str(code)] = row
             logger.info(f"Extracted active codes: {active_codes}")
             print(f"Active codes found: {active_codes}")
 
@@ -1007,6 +888,7 @@ if __name__ == "__main__":
             logger.error(f"Error extracting active codes: {e}")
             print(f"Error extracting codes from legend.")
             active_codes = []
+            legend_entries = {}
     else:
         logger.warning("Legend worksheet not accessible.")
         print("Error accessing legend. Active codes not extracted.")
@@ -1015,13 +897,15 @@ if __name__ == "__main__":
 # Load data, run analysis, train models, handle postprocessing and notification
 
     if "preprocessing" not in disabled_blocks and spreadsheet_ok:
-        df = load_data_and_valid(input_ws, active_codes)
+        df = load_and_validate_data(input_ws, active_codes,
+                                    dtypes=legend_dtypes(legend_entries), methods=legend_methods(legend_entries))
         if df is not None:
             sensitive_cols = getattr(args, "sensitive_cols", None)
-            sensitive_correlations, bias_detected_corr = analyze_sensitivity_correlation(df.copy(), sensitive_cols)
-            shap_impact, bias_detected_shap = analyze_sensitivity_shap(df.copy(), sensitive_cols)
+            df_view = read_only_view(df)          # Shared, write-protected columns instead of one copy per stage
+            sensitive_correlations, bias_detected_corr = analyze_sensitivity_correlation(df_view, sensitive_cols)
+            shap_impact, bias_detected_shap = analyze_sensitivity_shap(df_view, sensitive_cols)
             bias_detected = bias_detected_corr or bias_detected_shap
-            suggested_algo = analyze_speed_and_suggest_algorithm(df.copy(), bias_detected)
+            suggested_algo = analyze_speed_and_suggest_algorithm(df_view, bias_detected)
 
             algos_to_run, final_bias_alert = choose_algorithms_initial(suggested_algo, bias_detected)
             best_history = load_benchmark(spreadsheet, use_benchmark, benchmark_sheet)
@@ -1032,8 +916,12 @@ if __name__ == "__main__":
                 logger.info("ADMIN: skipping training")
                 print("Training skipped.")
 
+            # One batched write for every zone (also retries rows spooled by a failed previous run)
+            prediction_sink.flush()
+            artifact_summary = report_artifacts()
+
             if "postprocess" not in disabled_blocks or "notify" not in disabled_blocks:
-                postprocess_and_notify()
+                postprocess_and_notify(artifact_summary)
         else:
             print("Processing stopped due to data loading errors.")
     else:
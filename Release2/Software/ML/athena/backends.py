@@ -0,0 +1,149 @@
+# =============================================================
+#  athena.py Pipeline - lazy backend registry
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: backends.py ===
+
+import importlib
+import json
+import logging                                # Built-in logging module for log management
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from config_pipeline import STARTUP_BENCHMARK_FILE, STARTUP_IMPORT_BUDGET
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - REGISTRY
+# Heavy libraries are named here and imported on first use only
+
+BACKENDS = {
+    "sklearn": "sklearn",
+    "xgboost": "xgboost",
+    "lightgbm": "lightgbm",
+    "catboost": "catboost",
+    "shap": "shap",
+    "plotting": "matplotlib.pyplot",
+    "psutil": "psutil",
+    "tqdm": "tqdm",
+}
+
+# Modules athena.py imports at startup; they must not pull in any backend above
+ATHENA_CORE_MODULES = [
+    "config_pipeline", "backends", "estimators", "resource_monitor", "training", "scheduler", "model_cache",
+    "sheet_snapshot", "prediction_sink", "artifact_writer", "shap_engine", "profiler", "analysis",
+    "cost_model", "dataset", "shared_data", "streaming_stats", "typed_loader", "imputation",
+]
+
+IMPORT_TIMES = {}                             # module -> seconds spent on its first import in this process
+
+
+def load_module(module_name):
+    """Import 'module_name' (once) and record how long the first import took."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES[module_name] = time.perf_counter() - start
+    logger.info(f"Backend '{module_name}' imported in {IMPORT_TIMES[module_name]:.2f} seconds.")
+    return module
+
+
+def load_backend(name):
+    """Return the module registered as backend 'name' (e.g. 'shap', 'plotting')."""
+    return load_module(BACKENDS[name])
+
+
+# BLOC 2 - STARTUP BENCHMARK
+# Each import is timed in a fresh interpreter, so costs are cold and independent
+
+def _time_import(statement):
+    """Seconds taken by 'statement' in a new Python process, or None if it fails."""
+    code = ("import time, sys; sys.path.insert(0, %r); t = time.perf_counter(); %s; "
+            "print(time.perf_counter() - t)" % (os.path.dirname(os.path.abspath(__file__)), statement))
+    try:
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=300)
+    except subprocess.TimeoutExpired:
+        return None
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark_imports(repeat=3):
+    """
+    Best-of-'repeat' cold import time per backend and for the athena core modules.
+    Returns {name: seconds or None (not installed / import error)}.
+    """
+    statements = {name: f"import {module}" for name, module in BACKENDS.items()}
+    statements["athena_core"] = "import " + ", ".join(ATHENA_CORE_MODULES)
+    results = {}
+    for name, statement in statements.items():
+        timings = [_time_import(statement) for _ in range(repeat)]
+        timings = [t for t in timings if t is not None]
+        results[name] = min(timings) if timings else None
+    return results
+
+
+def record_benchmark(results, path=STARTUP_BENCHMARK_FILE):
+    """Append one benchmark run to the history file and return the history."""
+    history = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    history.append({"timestamp": datetime.now().isoformat(timespec="seconds"),
+                    "python": sys.version.split()[0], "imports": results})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    return history
+
+
+if __name__ == "__main__":
+    results = benchmark_imports()
+    history = record_benchmark(results)
+    previous = history[-2]["imports"] if len(history) > 1 else {}
+
+    print(f"{'backend':<14}{'seconds':>10}{'previous':>10}")
+    for name, seconds in results.items():
+        prev = previous.get(name)
+        print(f"{name:<14}{'n/a' if seconds is None else f'{seconds:.3f}':>10}{'' if prev is None else f'{prev:.3f}':>10}")
+
+    core = results["athena_core"]
+    if core is None or core > STARTUP_IMPORT_BUDGET:
+        print(f"athena core import above budget ({STARTUP_IMPORT_BUDGET}s) or failing.")
+        sys.exit(1)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module keeps heavy libraries out of athena's startup path.
+#
+# - Use load_backend("shap"), load_backend("plotting") and estimators.py
+#   instead of module-level imports of sklearn, xgboost, lightgbm, catboost,
+#   shap, matplotlib, psutil or tqdm in the ATHENA_CORE_MODULES.
+#
+# - 'python backends.py' times each backend and the core modules in fresh
+#   interpreters, appends the run to STARTUP_BENCHMARK_FILE and exits with 1
+#   if the core import exceeds STARTUP_IMPORT_BUDGET seconds.
+# ================================================================================
@@ -0,0 +1,337 @@
+# =============================================================
+#  athena.py Pipeline - multi-site batch runner
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: batch.py ===
+
+import argparse
+import json
+import logging                                # Built-in logging module for log management
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+
+from artifact_writer import ArtifactWriter, format_report
+from auth import get_spreadsheet_client
+from config import SPREADSHEET_NAME, SHEET_LEGEND, SHEET_INPUT, SHEET_OUTPUT
+from config_pipeline import (
+    SNAPSHOT_ENABLED,
+    SNAPSHOT_DIR,
+    PREDICTION_SPOOL_FILE,
+    PARALLEL_WORKERS_DEFAULT,
+    MAX_RAM_PERCENTAGE,
+    MAX_CPU_PERCENTAGE,
+    WORKER_BASE_RAM_MB,
+    BATCH_ALGORITHMS_DEFAULT,
+    BATCH_IO_THREADS,
+    MODEL_MIN_TRAIN_ROWS,
+)
+from cost_model import plan_models
+from data_loader import load_data
+from dataset import compact_dataset
+from estimators import available_algorithms, threads_per_fit
+from imputation import impute_columns, legend_methods
+from notifier import send_telegram_notification, send_alert, flush_alerts
+from prediction_sink import PredictionSink
+from profiler import profiler, span
+from scheduler import data_size_mb, estimate_job_ram_mb, resolve_workers, run_jobs
+from shared_data import share_frames
+from sheet_snapshot import load_snapshot
+from training import train_zone
+from typed_loader import legend_dtypes
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+MAX_RETRIES = 3
+RETRY_DELAY = 5  # Seconds
+
+
+# BLOC 1 - SITE CONFIGURATION
+# One entry per installation; missing keys fall back to config.py / config_pipeline.py
+
+def load_sites(path):
+    """
+    Read the site list from a JSON or YAML file: a list of objects with
+    'title' (required), 'spreadsheet', 'sheet_legend', 'sheet_input',
+    'sheet_output', 'targets', 'algorithms' and 'output_dir'.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            raw = yaml.safe_load(f)
+        else:
+            raw = json.load(f)
+
+    sites = []
+    for entry in raw.get("sites", raw) if isinstance(raw, dict) else raw:
+        if "title" not in entry:
+            raise ValueError(f"Site without 'title' in {path}: {entry}")
+        sites.append({
+            "title": entry["title"],
+            "spreadsheet": entry.get("spreadsheet", SPREADSHEET_NAME),
+            "sheet_legend": entry.get("sheet_legend", SHEET_LEGEND),
+            "sheet_input": entry.get("sheet_input", SHEET_INPUT),
+            "sheet_output": entry.get("sheet_output", SHEET_OUTPUT),
+            "targets": [str(t) for t in entry["targets"]] if entry.get("targets") else None,
+            "algorithms": entry.get("algorithms", BATCH_ALGORITHMS_DEFAULT),
+            "output_dir": entry.get("output_dir", os.path.join("sites", entry["title"])),
+        })
+    titles = [s["title"] for s in sites]
+    if len(set(titles)) != len(titles):
+        raise ValueError(f"Duplicate site titles in {path}: {titles}")
+    return sites
+
+
+# BLOC 2 - PER-SITE DATA LOADING (shared client, I/O threads)
+# Connect, read the legend and load the input data of one site
+
+def connect_site(client, site):
+    """Open the site's spreadsheet and worksheets, retrying like athena.py."""
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            spreadsheet = client.open(site["spreadsheet"])
+            return (spreadsheet.worksheet(site["sheet_legend"]),
+                    spreadsheet.worksheet(site["sheet_input"]),
+                    spreadsheet.worksheet(site["sheet_output"]))
+        except Exception as e:
+            logger.error(f"[{site['title']}] Connection attempt {attempt}/{MAX_RETRIES} failed: {e}")
+            if attempt < MAX_RETRIES:
+                time.sleep(RETRY_DELAY)
+    raise ConnectionError(f"Unable to open spreadsheet '{site['spreadsheet']}' after {MAX_RETRIES} attempts")
+
+
+def active_codes_from_legend(legend_ws):
+    """
+    Column codes with include == YES (same rule as athena.py BLOC 7.C), and the
+    dtypes and gap-fill methods declared for them in the optional 'dtype' and
+    'interpolation' columns of the legend.
+    """
+    codes = []
+    entries = {}
+    for row in legend_ws.get_all_records():
+        code = row.get("column code", row.get("column_code"))
+        if code and str(row.get("include", "NO")).upper() == "YES":
+            codes.append(str(code))
+            entries[str(code)] = row
+    return codes, legend_dtypes(entries), legend_methods(entries)
+
+
+def prepare_site(client, site):
+    """Load everything one site needs for training. Returns the site state dict."""
+    with span("connection", site=site["title"]):
+        legend_ws, input_ws, output_ws = connect_site(client, site)
+    with span("legend", site=site["title"]):
+        active_codes, dtypes, methods = active_codes_from_legend(legend_ws)
+    if not active_codes:
+        raise ValueError("No active column codes in legend")
+
+    df = None
+    with span("data_load", site=site["title"]):
+        if SNAPSHOT_ENABLED:
+            try:
+                df = load_snapshot(input_ws, active_codes, os.path.join(SNAPSHOT_DIR, site["title"]), dtypes)
+            except Exception as e:
+                logger.warning(f"[{site['title']}] Local snapshot unavailable ({e}). Loading the full worksheet.")
+        if df is None:
+            df = load_data(input_ws, active_codes)
+    if df is None or df.empty:
+        raise ValueError("Data load failed or DataFrame is empty")
+    if methods:
+        df = impute_columns(df, methods)
+    df = compact_dataset(df, site["title"])
+
+    zones = [z for z in (site["targets"] or active_codes) if z in df.columns]
+    os.makedirs(site["output_dir"], exist_ok=True)
+    spool_path = os.path.join(site["output_dir"], PREDICTION_SPOOL_FILE)
+    logger.info(f"[{site['title']}] {len(df)} rows, zones {zones}.")
+    return {"df": df, "zones": zones, "sink": PredictionSink(output_ws, spool_path=spool_path)}
+
+
+def plan_site(site, df, algos):
+    """
+    Cost-model plan of one site (same rule as athena.py train_and_choose_modelli):
+    over-budget algorithms are dropped, unless none fits. Returns (algos, {algo: rows}).
+    """
+    features = max(df.select_dtypes(include="number").shape[1] - 1, 1)   # One column is the target
+    train_rows = {entry["algo"]: entry["rows"] for entry in plan_models(algos, len(df), features)}
+    for algo in algos:
+        if algo not in train_rows:
+            send_alert("warning", f"[{site['title']}] '{algo}' exceeds the time/RAM budget even on "
+                                  f"{MODEL_MIN_TRAIN_ROWS} rows. Skipped.")
+    if not train_rows:
+        send_alert("warning", f"[{site['title']}] No algorithm fits the time/RAM budget. Training all on all rows.")
+        return algos, train_rows
+    return [algo for algo in algos if algo in train_rows], train_rows
+
+
+# BLOC 3 - BATCH EXECUTION
+# Load all sites concurrently, train every (site, zone) in one shared worker pool, then write
+
+def run_batch(sites, workers=PARALLEL_WORKERS_DEFAULT, max_ram=MAX_RAM_PERCENTAGE, max_cpu=MAX_CPU_PERCENTAGE):
+    """Run every site in this process. Returns {title: summary dict}, in site order."""
+    start = time.time()
+    summary = {s["title"]: {"status": "pending", "zones": 0, "predictions": 0, "error": None} for s in sites}
+
+    client = get_spreadsheet_client()         # Authenticated once for all sites
+
+    # 1. Sheet I/O is network bound: all sites load at the same time
+    prepared = {}
+    with ThreadPoolExecutor(max_workers=BATCH_IO_THREADS) as io_pool:
+        futures = {s["title"]: io_pool.submit(prepare_site, client, s) for s in sites}
+        for site in sites:
+            try:
+                prepared[site["title"]] = futures[site["title"]].result()
+            except Exception as e:
+                summary[site["title"]].update(status="failed", error=f"load: {e}")
+                send_alert("error", f"[{site['title']}] Site skipped: {e}", notify=True)
+
+    # 2. One job per (site, zone), all admitted against the same RAM budget and thread budget
+    max_workers = resolve_workers(workers)
+    threads = threads_per_fit(max_workers)
+    zone_jobs = []                            # (key, estimate_mb, train_zone args without limits, train_rows)
+    for site in sites:
+        state = prepared.get(site["title"])
+        if state is None:
+            continue
+        algos, train_rows = plan_site(site, state["df"], available_algorithms(site["algorithms"]))
+        dataset_mb = data_size_mb(state["df"])
+        estimate_mb = max((estimate_job_ram_mb(a, dataset_mb) for a in algos), default=WORKER_BASE_RAM_MB)
+        for zone in state["zones"]:
+            zone_jobs.append(((site["title"], zone), estimate_mb, (zone, state["df"], algos, site["output_dir"]),
+                              train_rows))
+
+    logger.info(f"Batch: {len(zone_jobs)} zone jobs from {len(prepared)} sites, {max_workers} workers.")
+    if max_workers == 1 or len(zone_jobs) <= 1:
+        outputs = {key: train_zone(*zone_args, max_cpu, max_ram, threads, train_rows)
+                   for key, _, zone_args, train_rows in zone_jobs}
+    else:
+        # CPU admission is handled by the scheduler; worker monitors only guard RAM
+        # Each site's data is published once; all its zone jobs attach to the same segment
+        titles = [title for title in prepared if any(job[0][0] == title for job in zone_jobs)]
+        with ExitStack() as stack:
+            shared = {title: stack.enter_context(share_frames(prepared[title]["df"]))[0] for title in titles}
+            jobs = [(key, estimate_mb, train_zone,
+                     (zone_args[0], shared[key[0]], *zone_args[2:], 100, max_ram, threads, train_rows))
+                    for key, estimate_mb, zone_args, train_rows in zone_jobs]
+            outputs = run_jobs(jobs, max_workers, max_ram=max_ram, max_cpu=max_cpu)
+
+    # 3. Spool predictions in site/zone order, then flush every site's output sheet concurrently
+    for site in sites:
+        state = prepared.get(site["title"])
+        if state is None:
+            continue
+        for zone in state["zones"]:
+            output = outputs.get((site["title"], zone))
+            selection = output["selection"] if output else None
+            if not selection or selection["algo"] is None:
+                send_alert("warning", f"[{site['title']}] No valid model. No prediction written.", zone=zone)
+                continue
+            state["sink"].add(state["df"].index[-1].isoformat(), zone, selection["prediction"],
+                              {"algo": selection["algo"], "r2": selection["r2"]})
+            summary[site["title"]]["zones"] += 1
+
+    with ThreadPoolExecutor(max_workers=BATCH_IO_THREADS) as io_pool:
+        flushed = {title: io_pool.submit(state["sink"].flush) for title, state in prepared.items()}
+        for title, future in flushed.items():
+            try:
+                summary[title]["predictions"] = future.result()
+                if not summary[title]["zones"]:
+                    summary[title].update(status="failed", error="no zone produced a prediction")
+                elif not summary[title]["predictions"]:
+                    summary[title].update(status="failed", error="write failed, rows kept in the spool")
+                elif summary[title]["zones"] == len(prepared[title]["zones"]):
+                    summary[title]["status"] = "ok"
+                else:
+                    summary[title]["status"] = "partial"
+            except Exception as e:
+                summary[title].update(status="failed", error=f"write: {e}")
+
+    logger.info(f"Batch completed in {time.time() - start:.1f} seconds.")
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"Batch run {datetime.now().strftime('%Y-%m-%d %H:%M')}: {len(summary)} sites"]
+    for title, s in summary.items():
+        line = f"- {title}: {s['status']}, {s['zones']} zones, {s['predictions']} rows written"
+        if s["error"]:
+            line += f" ({s['error']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run athena training for several sites in one process.")
+    parser.add_argument("sites", help="JSON or YAML file with the site list")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes shared by all sites (0 = one per core)")
+    parser.add_argument("--max_ram_percentage", type=float, default=MAX_RAM_PERCENTAGE)
+    parser.add_argument("--max_cpu_percentage", type=float, default=MAX_CPU_PERCENTAGE)
+    parser.add_argument("--profile", action="store_true", help="Write stage timings to PROFILE_DIR (see profiler.py)")
+    args = parser.parse_args()
+    if args.profile:
+        profiler.enable(f"profile_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        handlers=[logging.StreamHandler(),
+                  logging.FileHandler(f"pipeline_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")],
+    )
+
+    artifact_writer = ArtifactWriter()
+    artifact_writer.start()                   # Before the worker pool: zone jobs queue their artifacts to it
+
+    summary = run_batch(load_sites(args.sites), args.workers, args.max_ram_percentage, args.max_cpu_percentage)
+    artifacts = artifact_writer.close()
+    report = format_summary(summary) + "\n" + format_report(artifacts)
+    if artifacts["failed"] or artifacts["pending"]:
+        details = [f"{kind} {path}: {error}" for kind, path, error in artifacts["failed"]]
+        details += [f"{path}: not completed" for path in artifacts["pending"]]
+        send_alert("error", format_report(artifacts) + "\n" + "\n".join(details), notify=True)
+    print(report)
+    logger.info(report)
+    flush_alerts()
+    send_telegram_notification(report)
+    sys.exit(0 if all(s["status"] == "ok" for s in summary.values()) else 1)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module replaces one cron entry per site with a single process:
+#
+#     python batch.py sites.json --workers 0
+#
+#     sites.json: [{"title": "plant_a", "spreadsheet": "PlantA", "targets": ["101", "102"]},
+#                  {"title": "plant_b", "spreadsheet": "PlantB", "sheet_output": "forecast"}]
+#
+# - Libraries, config and the Google client are loaded once. Each site gets its
+#   own snapshot (SNAPSHOT_DIR/<title>), output_dir (sites/<title>) and spool.
+#
+# - Zones of all sites share one worker pool, RAM budget and THREAD_BUDGET.
+#   Model dumps and SHAP plots go through one background artifact writer;
+#   its written/failed counts are appended to the summary.
+#
+# - Batch mode is non-interactive: no menus, no sensitivity analysis; it
+#   runs the 'algorithms' listed per site (default BATCH_ALGORITHMS_DEFAULT)
+#   with temporal-CV selection, like 'athena.py --zone_workers'.
+# ================================================================================
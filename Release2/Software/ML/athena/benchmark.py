@@ -0,0 +1,379 @@
+# =============================================================
+#  athena.py Pipeline - benchmark suite
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: benchmark.py ===
+
+import argparse
+import contextlib
+import csv
+import importlib.util
+import itertools
+import json
+import logging                                # Built-in logging module for log management
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import notifier
+from analysis import load_and_validate_data, analyze_velocity, analyze_sensitivity_correlation
+from cost_model import recording_to
+from config_pipeline import (
+    BENCHMARK_SIZES,
+    BENCHMARK_ZONES,
+    BENCHMARK_GAP_RATE,
+    BENCHMARK_REPEAT,
+    BENCHMARK_CASE_BUDGET,
+    BENCHMARK_CV_ALGORITHMS,
+    BENCHMARK_SHAP_ALGORITHMS,
+    BENCHMARK_SHAP_FIT_ROWS,
+    BENCHMARK_SHAP_ROWS,
+    BENCHMARK_RESULTS_FILE,
+    BENCHMARK_REGRESSION_TOLERANCE,
+    BENCHMARK_REGRESSION_MIN_SECONDS,
+)
+from estimators import available_algorithms, create_estimator
+from imputation import impute_columns, legend_methods
+from shap_engine import compute_shap_values
+from sheet_snapshot import ListWorksheet
+from training import prepare_zone_data, run_temporal_cv
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+EXTRACTOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pre-ML", "extractor.py")
+GAP_VALUE = -999                              # Written by the eBus logger for missing readings
+SAMPLES_PER_DAY = 288                         # One reading every 5 minutes
+EXTRACTOR_HEADER_ROWS = 3                     # Rows between the header and the data in db.csv (extractor ROWS_TO_SKIP)
+
+
+# BLOC 1 - SYNTHETIC EBUS DATA
+# Same layout as the real logger export: code 100 is the timestamp, states are 0/1, gaps are -999
+
+def ebus_legend(zones=BENCHMARK_ZONES):
+    """legenda.yaml 'column_codes' for the generated columns: {code: {Name, include, interpolation}}."""
+    legend = {
+        100: {"Name": "Time", "include": "YES"},
+        101: {"Name": "OutdoorTemperature", "include": "YES", "interpolation": "linear"},
+        102: {"Name": "FlowTemperature", "include": "YES", "interpolation": "linear"},
+        103: {"Name": "ReturnTemperature", "include": "YES", "interpolation": "linear"},
+        104: {"Name": "DHWTemperature", "include": "YES", "interpolation": "linear"},
+        105: {"Name": "BurnerModulation", "include": "YES", "interpolation": "ffill"},
+        106: {"Name": "HeatingPumpState", "include": "YES", "interpolation": "ffill"},
+        107: {"Name": "DHWChargeState", "include": "YES", "interpolation": "ffill"},
+    }
+    for zone in range(zones):
+        legend[110 + 2 * zone] = {"Name": f"Zone{zone + 1}RoomTemperature", "include": "YES", "interpolation": "linear"}
+        legend[111 + 2 * zone] = {"Name": f"Zone{zone + 1}ValveState", "include": "YES", "interpolation": "ffill"}
+    return legend
+
+
+def generate_ebus_frame(rows, zones=BENCHMARK_ZONES, gap_rate=BENCHMARK_GAP_RATE, seed=0):
+    """
+    Raw logger data with one column per legend code (code 100 = timestamp):
+    temperatures with daily/seasonal cycles, burner and pump states driven by heat demand,
+    one room temperature and valve state per zone, and 'gap_rate' readings set to -999.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(rows)
+
+    def noise(scale):
+        return rng.normal(0, scale, rows)
+
+    outdoor = 8 + 7 * np.sin(2 * np.pi * (t / SAMPLES_PER_DAY - 0.375)) + 6 * np.sin(2 * np.pi * t / (SAMPLES_PER_DAY * 365)) + noise(0.5)
+    demand = np.clip(18 - outdoor, 0, None)
+    heating = demand + noise(1.0) > 4
+    flow = np.where(heating, 30 + 1.8 * demand, 25) + noise(0.4)
+    dhw_charge = rng.random(rows) < 0.03
+    columns = {
+        "100": pd.date_range("2026-01-01", periods=rows, freq="5min"),
+        "101": outdoor,
+        "102": flow,
+        "103": flow - np.where(heating, 5 + 0.3 * demand, 1) + noise(0.3),
+        "104": 50 - 6 * ((t % 96) / 96) + 6 * dhw_charge + noise(0.3),
+        "105": np.where(heating, np.clip(20 + 4 * demand + noise(5), 0, 100), 0),
+        "106": heating.astype(np.int64),
+        "107": dhw_charge.astype(np.int64),
+    }
+    for zone in range(zones):
+        setpoint = 20 + rng.normal(0, 0.8)
+        room = setpoint + 0.15 * (np.roll(outdoor, 6 + zone) - 8) + 0.5 * np.sin(2 * np.pi * t / SAMPLES_PER_DAY) + noise(0.2)
+        columns[str(110 + 2 * zone)] = room
+        columns[str(111 + 2 * zone)] = (room + noise(0.3) < setpoint).astype(np.int64)
+
+    df = pd.DataFrame(columns)
+    for code in df.columns[1:]:
+        values = df[code].to_numpy()
+        if values.dtype.kind == "f":
+            values = np.round(values, 1)      # Sensor resolution
+        gaps = rng.random(rows) < gap_rate
+        df[code] = np.where(gaps, GAP_VALUE, values)
+    return df
+
+
+def clean_ebus_frame(raw, legend):
+    """The data athena reads from the sheet: gaps filled with each column's legend method, like extractor.py."""
+    return impute_columns(raw.replace(GAP_VALUE, np.nan), legend_methods(legend))
+
+
+def impute_per_column(df, methods):
+    """extractor.py fill loop before the grouped engine: the method, then interpolate().bfill(), column by column."""
+    df = df.copy()
+    for code, method in methods.items():
+        if method == "ffill":
+            df[code] = df[code].ffill()
+        else:
+            df[code] = df[code].interpolate(method="linear")
+        df[code] = df[code].interpolate(method="linear").bfill()
+    return df
+
+
+def sheet_from_frame(df):
+    """ListWorksheet holding 'df' as the Google Sheet would return it (all cells are strings)."""
+    return ListWorksheet([list(df.columns)] + df.astype(str).values.tolist())
+
+
+def write_extractor_inputs(raw, legend, directory):
+    """db.csv (logger names, 3 header rows to skip) and datacheck/legenda.yaml for extractor.py."""
+    import yaml
+
+    os.makedirs(os.path.join(directory, "datacheck"), exist_ok=True)
+    with open(os.path.join(directory, "datacheck", "legenda.yaml"), "w", encoding="utf-8") as f:
+        yaml.safe_dump({"column_codes": legend}, f)
+    names = [legend[int(code)]["Name"] for code in raw.columns]
+    with open(os.path.join(directory, "db.csv"), "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(names) + "\n")
+        for _ in range(EXTRACTOR_HEADER_ROWS):
+            f.write(",".join([""] * len(names)) + "\n")
+        raw.to_csv(f, header=False, index=False)
+
+
+def load_extractor():
+    """pre-ML/extractor.py as a module (its main() only runs as a script)."""
+    spec = importlib.util.spec_from_file_location("extractor", EXTRACTOR_PATH)
+    extractor = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(extractor)
+    return extractor
+
+
+def write_rows_iterrows(df, path):
+    """extractor.py output loop before the bulk writer: one csv.writer row per iterrows() row."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(df.columns.tolist())
+        for _, row in df.iterrows():
+            writer.writerow(row.tolist())
+
+
+def write_extractor_output(extractor, output_format, df, path):
+    with extractor.OutputWriter(output_format, path, df.columns.tolist()) as output:
+        output.write(df)
+
+
+# BLOC 2 - BENCHMARK CASES
+# Inputs are prepared outside the timed section; each case is timed best-of-N
+
+def time_case(fn, repeat=BENCHMARK_REPEAT, budget=BENCHMARK_CASE_BUDGET):
+    """Best wall time of 'fn' over up to 'repeat' runs (no new run once 'budget' seconds are used)."""
+    timings = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+            if sum(timings) >= budget:
+                break
+    return min(timings)
+
+
+def build_cases(rows, workdir, zones=BENCHMARK_ZONES):
+    """{case name: callable} for one dataset size."""
+    legend = ebus_legend(zones)
+    raw = generate_ebus_frame(rows, zones)
+    clean = clean_ebus_frame(raw, legend)
+    ws = sheet_from_frame(clean)
+    active_codes = [str(code) for code in legend]
+    snapshot_runs = itertools.count()
+
+    cases = {
+        "load_and_validate_data": lambda: load_and_validate_data(
+            ws, active_codes, snapshot_dir=os.path.join(workdir, f"snapshot_{next(snapshot_runs)}")),   # Cold sync every run
+        "analyze_velocity": lambda: analyze_velocity(clean, stats_path=None),   # Full computation, no stored state
+        "analyze_sensitivity_correlation": lambda: analyze_sensitivity_correlation(clean, ["101", "107"]),
+    }
+
+    zone = "110"
+    X, y, _, _ = prepare_zone_data(clean.drop(columns=["100"]), zone)
+    for algo in available_algorithms(BENCHMARK_CV_ALGORITHMS):
+        cases[f"temporal_cv_{algo}"] = lambda algo=algo: run_temporal_cv(algo, create_estimator(algo), X, y, zone)
+    for algo in available_algorithms(BENCHMARK_SHAP_ALGORITHMS):
+        model = create_estimator(algo).fit(X.iloc[:BENCHMARK_SHAP_FIT_ROWS], y.iloc[:BENCHMARK_SHAP_FIT_ROWS])
+        cases[f"shap_{algo}"] = lambda algo=algo, model=model: compute_shap_values(
+            model, X, algo, max_rows=BENCHMARK_SHAP_ROWS, time_budget=None, use_cache=False)
+
+    extractor_dir = os.path.join(workdir, "extractor")
+    write_extractor_inputs(raw, legend, extractor_dir)
+    cases["extractor"] = lambda: subprocess.run([sys.executable, os.path.abspath(EXTRACTOR_PATH)], cwd=extractor_dir,
+                                                check=True, capture_output=True)
+
+    # Gap filling of the raw data: old per-column loop vs one call per method group
+    gapped = raw.replace(GAP_VALUE, np.nan)
+    methods = legend_methods(legend)
+    cases["imputation_per_column"] = lambda: impute_per_column(gapped, methods)
+    cases["imputation_grouped"] = lambda: impute_columns(gapped, methods)
+
+    # Output paths of extractor.py on the same cleaned data: old per-row loop vs bulk CSV / columnar
+    extractor = load_extractor()
+    output_base = os.path.join(workdir, "db_clean")
+    cases["extractor_output_iterrows"] = lambda: write_rows_iterrows(clean, f"{output_base}_legacy.csv")
+    for output_format in extractor.OUTPUT_FORMATS:
+        cases[f"extractor_output_{output_format}"] = lambda fmt=output_format: write_extractor_output(
+            extractor, fmt, clean, f"{output_base}.{fmt}")
+    return cases
+
+
+def run_suite(sizes=BENCHMARK_SIZES, zones=BENCHMARK_ZONES, repeat=BENCHMARK_REPEAT, only=None):
+    """Run every case at every size. Returns {case: {rows: seconds}}; failing cases map to None."""
+    results = {}
+    for rows in sizes:
+        # Synthetic fits are recorded in the temporary directory, not in the production COST_MODEL_FILE
+        with tempfile.TemporaryDirectory(prefix="athena_bench_") as workdir, \
+                recording_to(os.path.join(workdir, "cost_model", "fits.jsonl")):
+            cases = build_cases(rows, workdir, zones)
+            for name, fn in cases.items():
+                if only and name not in only:
+                    continue
+                try:
+                    seconds = time_case(fn, repeat)
+                except Exception as e:
+                    logger.error(f"Benchmark case '{name}' failed at {rows} rows: {e}")
+                    seconds = None
+                results.setdefault(name, {})[str(rows)] = seconds
+                logger.info(f"{name} @ {rows} rows: {seconds}")
+    return results
+
+
+# BLOC 3 - RESULT HISTORY
+# Runs are appended to BENCHMARK_RESULTS_FILE; each case is compared with its latest previous timing
+
+def record_results(results, path=BENCHMARK_RESULTS_FILE, zones=BENCHMARK_ZONES):
+    """Append one run to the history file and return the history."""
+    history = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    history.append({"timestamp": datetime.now().isoformat(timespec="seconds"),
+                    "python": sys.version.split()[0], "cpus": os.cpu_count(), "zones": zones,
+                    "results": results})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    return history
+
+
+def previous_timing(history, case, rows):
+    """Latest timing of (case, rows) before the last run in 'history', or None."""
+    for run in reversed(history[:-1]):
+        seconds = run["results"].get(case, {}).get(rows)
+        if seconds is not None:
+            return seconds
+    return None
+
+
+def find_regressions(history, tolerance=BENCHMARK_REGRESSION_TOLERANCE, min_seconds=BENCHMARK_REGRESSION_MIN_SECONDS):
+    """[(case, rows, previous, current)] for cases of the last run that got slower."""
+    regressions = []
+    for case, timings in history[-1]["results"].items():
+        for rows, seconds in timings.items():
+            previous = previous_timing(history, case, rows)
+            if seconds is None or previous is None:
+                continue
+            if seconds > previous * tolerance and seconds - previous >= min_seconds:
+                regressions.append((case, rows, previous, seconds))
+    return regressions
+
+
+def format_results(history):
+    results = history[-1]["results"]
+    sizes = sorted({rows for timings in results.values() for rows in timings}, key=int)
+    lines = [f"{'case':<34}" + "".join(f"{int(rows):>14,}" for rows in sizes)]
+    for case, timings in results.items():
+        cells = []
+        for rows in sizes:
+            seconds, previous = timings.get(rows), previous_timing(history, case, rows)
+            cell = "n/a" if seconds is None else f"{seconds:.3f}"
+            if seconds is not None and previous:
+                cell += f" {seconds / previous - 1:+.0%}"
+            cells.append(f"{cell:>14}")
+        lines.append(f"{case:<34}" + "".join(cells))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark athena's pipeline stages on synthetic eBus data.")
+    parser.add_argument("--sizes", type=str, default=",".join(map(str, BENCHMARK_SIZES)), help="Comma-separated row counts")
+    parser.add_argument("--zones", type=int, default=BENCHMARK_ZONES, help="Heating zones in the synthetic data")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT, help="Best-of-N runs per case")
+    parser.add_argument("--cases", type=str, default="", help="Comma-separated subset of cases (default: all)")
+    parser.add_argument("--results", type=str, default=BENCHMARK_RESULTS_FILE, help="History file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    notifier.BOT_TOKEN = "<disabled during benchmarks>"   # Bias warnings on synthetic data must not reach Telegram
+    logging.getLogger("notifier").setLevel(logging.CRITICAL)
+
+    sizes = [int(rows) for rows in args.sizes.split(",") if rows]
+    only = set(args.cases.split(",")) if args.cases else None
+    results = run_suite(sizes, args.zones, args.repeat, only)
+    history = record_results(results, args.results, args.zones)
+    print(format_results(history))
+
+    regressions = find_regressions(history)
+    for case, rows, previous, seconds in regressions:
+        print(f"REGRESSION: {case} @ {rows} rows: {previous:.3f}s -> {seconds:.3f}s")
+    sys.exit(1 if regressions else 0)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module measures athena's stages without the Google Sheet.
+#
+# - 'python benchmark.py' generates eBus-like data at BENCHMARK_SIZES rows
+#   (flow/return/DHW temperatures, pump and valve states, -999 gaps, one room
+#   temperature per zone) and times: data loading (cold snapshot sync),
+#   analyze_velocity, correlation analysis, temporal CV, SHAP and extractor.py,
+#   plus extractor.py's output paths (old iterrows loop, bulk CSV, Parquet,
+#   Feather) on the same cleaned data and its gap filling (old per-column
+#   loop, grouped imputation.py).
+#
+# - Each run is appended to BENCHMARK_RESULTS_FILE. The table shows the change
+#   against the previous timing of each case; the script exits with 1 when a
+#   case is slower than BENCHMARK_REGRESSION_TOLERANCE x its previous timing.
+#
+# - Fits timed by the suite are recorded in its temporary directory, so the
+#   benchmark never calibrates the production cost model (COST_MODEL_FILE).
+#
+# - Compare runs from the same machine only. The 1M-row sizes need several GB
+#   of RAM (the fake sheet holds every cell as a string); use '--sizes' to
+#   run smaller sets, e.g. '--sizes 1000,100000'.
+# ================================================================================
@@ -20,6 +20,29 @@
 
 # === CONFIG FILE: config_pipeline.py ===
 
+# ========================
+# Input data snapshot
+# ========================
+
+SNAPSHOT_ENABLED = True           # Keep a local Arrow copy of the input sheet and fetch only new rows
+SNAPSHOT_DIR = "snapshot/input"   # Directory of the snapshot segments and sync state
+SNAPSHOT_MAX_SEGMENTS = 20        # Merge appended segments into one above this count
+SNAPSHOT_TIME_COLUMN = "100"      # Column code of the reading time, used as the index of the loaded data
+
+# ========================
+# Typed loading
+# ========================
+
+TYPED_NA_VALUES = ["-999", -999]  # Cells read as missing besides empty ones (logger error code, as text or number)
+
+# ========================
+# Prediction output
+# ========================
+
+PREDICTION_SPOOL_FILE = "predictions_spool.jsonl"  # Local spool of predictions not yet written to the output sheet
+OUTPUT_WRITE_MAX_RETRIES = 5      # Attempts for the batched output sheet write
+OUTPUT_WRITE_BACKOFF = 2          # Seconds before the first retry; doubled after each failure
+
 # ========================
 # Model performance thresholds
 # ========================
@@ -27,6 +50,7 @@
 THRESHOLD_R2_DEFAULT = 0.80        # Default R² threshold for model acceptance; must be between 0 and 1
 CV_FOLDS_DEFAULT = 5               # Number of cross-validation folds (integer >= 2)
 CV_K_DEFAULT = 1.0                 # Weighting factor for cross-validation score (float >= 0)
+TEST_SIZE_DEFAULT = 0.2            # Fraction of the most recent rows held out for final evaluation (0 < x < 1)
 
 # ========================
 # System resource thresholds
@@ -39,6 +63,43 @@ RESOURCE_MONITORING_INTERVAL = 5  # Interval (seconds) between resource usage ch
 HIGH_RESOURCE_THRESHOLD_DURATION = 10  # Seconds of sustained high usage before warning
 CRITICAL_RESOURCE_THRESHOLD_DURATION = 15  # Additional seconds before auto-interruption
 
+# ========================
+# Incremental temporal CV
+# ========================
+
+INCREMENTAL_CV_DEFAULT = True     # Continue training from the previous fold's model instead of refitting
+INCREMENTAL_CV_GROWTH = 0.2       # Estimators added per fold, as a fraction of the model's n_estimators (0 < x <= 1)
+INCREMENTAL_CV_ALGORITHMS = ["xgboost", "lightgbm", "gradient_boosting", "random_forest"]  # Others always refit
+
+# ========================
+# Model artifact cache
+# ========================
+
+MODEL_CACHE_ENABLED = True        # Reuse models/metrics when data, algorithm, parameters and config are unchanged
+MODEL_CACHE_DIR = "model_cache"   # Directory holding cached models (<hash>.joblib) and metrics (<hash>.json)
+MODEL_CACHE_MAX_MB = 500          # Evict least-recently-used entries above this total size (MB)
+MODEL_CACHE_MAX_ENTRIES = 200     # Evict least-recently-used entries above this count
+
+# ========================
+# Parallel execution
+# ========================
+
+PARALLEL_WORKERS_DEFAULT = 1      # Worker processes for algorithm evaluation (1 = sequential, 0 = one per CPU core)
+THREAD_BUDGET = 0                 # Cores shared by all concurrent fits (estimator threads + BLAS), 0 = all cores
+WORKER_BASE_RAM_MB = 150          # Fixed RAM overhead (MB) of one worker process (interpreter + libraries)
+SCHEDULER_POLL_INTERVAL = 1       # Seconds between admission checks while jobs are waiting
+
+ALGORITHM_MEMORY_MULTIPLIER = {   # Estimated peak RAM of one fit, as a multiple of the training matrix size
+    "linear_regression": 3,
+    "knn": 2,
+    "svr": 6,
+    "random_forest": 12,
+    "gradient_boosting": 4,
+    "xgboost": 6,
+    "lightgbm": 4,
+    "catboost": 8,
+}
+
 # ========================
 # Data variability thresholds
 # ========================
@@ -46,12 +107,126 @@ CRITICAL_RESOURCE_THRESHOLD_DURATION = 15  # Additional seconds before auto-inte
 VELOCITY_THRESHOLD_LOW = 0.1      # Std. deviation threshold to identify low-variance features
 VELOCITY_THRESHOLD_HIGH = 1.0     # Std. deviation threshold to identify highly variable features
 AVG_CARDINALITY_THRESHOLD = 10    # Threshold for categorical column uniqueness (avg n. of unique values)
+VELOCITY_STATS_FILE = "snapshot/velocity_stats.json"  # Persisted streaming statistics; only rows appended since the last run are read
+VELOCITY_SKETCH_PRECISION = 12    # HyperLogLog registers = 2**precision per non-numeric column (~1.6% distinct-count error)
 
 # ========================
 # Correlation sensitivity analysis
 # ========================
 
 SENSITIVITY_CORRELATION_THRESHOLD = 0.1  # Minimum absolute correlation to flag potential bias
+CORRELATION_ALERT_MAX_PAIRS = 10  # Flagged pairs listed in the single summary notification (strongest first)
+
+# ========================
+# SHAP computation budget
+# ========================
+
+SHAP_MAX_ROWS = 2000              # Rows explained per model (evenly spaced subsample), None = all rows
+SHAP_BACKGROUND_SIZE = 100        # Background sample for linear and model-agnostic explainers
+SHAP_TIME_BUDGET = 60             # Seconds per model; remaining batches are skipped, None = no limit
+SHAP_BATCH_ROWS = 200             # Rows explained per batch (budget is checked between batches)
+SHAP_PROBE_ROWS = 1               # First batch size, used to estimate the per-row cost against the budget
+SHAP_PERMUTATION_MAX_EVALS = 200  # Model evaluations per row of the permutation explainer (SVR, KNN, ...; shap default 500), None = shap default
+SHAP_CACHE_DIR = "shap_cache"     # Cached SHAP values per model artifact and explained rows
+SHAP_CACHE_MAX_ENTRIES = 100      # Least-recently-used entries are removed above this count
+
+# ========================
+# Artifact writer
+# ========================
+
+ARTIFACT_WRITER_ENABLED = True    # Render SHAP plots and dump models in a background process
+ARTIFACT_QUEUE_SIZE = 8           # Max artifacts waiting in memory; submitting blocks above this
+ARTIFACT_MODEL_COMPRESS = 3       # joblib compression level for trained model files (0 = none)
+ARTIFACT_CLOSE_TIMEOUT = 300      # Seconds to wait for pending artifacts at the end of the run
+SHAP_SUMMARY_PLOTS = True         # Queue a SHAP summary plot per trained model with R² > THRESHOLD_R2_DEFAULT - 0.05
+
+# ========================
+# Startup import benchmark
+# ========================
+
+STARTUP_BENCHMARK_FILE = "startup_benchmark.json"  # History of 'python backends.py' runs
+STARTUP_IMPORT_BUDGET = 1.5       # Max seconds for importing athena's core modules (benchmark fails above)
+
+# ========================
+# Multi-site batch runner
+# ========================
+
+BATCH_ALGORITHMS_DEFAULT = ["linear_regression", "random_forest", "xgboost", "gradient_boosting"]  # Sites without 'algorithms'
+BATCH_IO_THREADS = 4              # Sites loading data from / writing predictions to Google Sheets at once
+
+# ========================
+# Alert notifications
+# ========================
+
+TELEGRAM_API_URL = "https://api.telegram.org"  # Overridden by the TELEGRAM_API_URL environment variable
+ALERT_ASYNC_ENABLED = True        # Queue notify=True alerts on a background thread (False = send inline)
+ALERT_COALESCE_WINDOW = 10        # Seconds of alerts merged into one message (duplicates counted once)
+ALERT_RATE_LIMIT_PER_MINUTE = 20  # Max Telegram messages per minute
+ALERT_MAX_MESSAGE_CHARS = 4000    # Longer batches are split (Telegram limit: 4096)
+ALERT_SEND_RETRIES = 3            # Attempts per message before it is dropped
+ALERT_HTTP_TIMEOUT = 10           # Seconds per Telegram request
+ALERT_FLUSH_TIMEOUT = 30          # Max seconds spent sending queued alerts at exit
+
+# ========================
+# Stage profiling
+# ========================
+
+PROFILE_DIR = "profiles"          # '--profile' writes the span JSON and Chrome trace of each run here
+
+# ========================
+# Benchmark suite
+# ========================
+
+BENCHMARK_SIZES = [1_000, 100_000, 1_000_000]   # Rows of the synthetic datasets ('python benchmark.py')
+BENCHMARK_ZONES = 6               # Heating zones generated (room temperature + valve state each)
+BENCHMARK_GAP_RATE = 0.01         # Fraction of sensor readings replaced by the -999 logger gap value
+BENCHMARK_REPEAT = 3              # Best-of-N timing per case ...
+BENCHMARK_CASE_BUDGET = 30        # ... but no new repetition once a case has used this many seconds
+BENCHMARK_CV_ALGORITHMS = ["linear_regression"]                  # Temporal CV cases
+BENCHMARK_SHAP_ALGORITHMS = ["linear_regression", "random_forest"]  # SHAP cases
+BENCHMARK_SHAP_FIT_ROWS = 2_000   # SHAP models are fitted on at most this many rows (fit is not timed)
+BENCHMARK_SHAP_ROWS = 200         # Rows explained per SHAP case, without time budget (comparable across runs)
+BENCHMARK_RESULTS_FILE = "benchmark_results.json"  # History of benchmark runs
+BENCHMARK_REGRESSION_TOLERANCE = 1.25  # A case slower than previous x tolerance is a regression ...
+BENCHMARK_REGRESSION_MIN_SECONDS = 0.05  # ... if it is also slower by at least this much (timer noise)
+
+# ========================
+# Fit cost model
+# ========================
+
+COST_MODEL_FILE = "cost_model/fits.jsonl"  # Timings of previous fits (one JSON line per fit)
+COST_MODEL_MAX_OBSERVATIONS = 200  # Most recent fits kept per algorithm for calibration
+COST_MODEL_MIN_OBSERVATIONS = 5   # Fits needed (over >= 2x row range) to also learn the row exponent
+COST_MODEL_RSS_INTERVAL = 0.01    # Seconds between RSS samples while a fit runs (peak RAM per fit)
+COST_MODEL_PRIORS = {             # Before calibration: (seconds for 10,000 rows x 10 features, row exponent)
+    "linear_regression": (0.01, 1.0),
+    "knn": (0.01, 1.0),
+    "svr": (2.0, 2.0),
+    "random_forest": (4.0, 1.1),
+    "gradient_boosting": (3.0, 1.0),
+    "xgboost": (0.5, 1.0),
+    "lightgbm": (0.3, 1.0),
+    "catboost": (3.0, 1.0),
+}
+MODEL_TIME_BUDGET = 600           # Seconds per algorithm (temporal CV + final fit) for select_smart_models
+MODEL_MIN_TRAIN_ROWS = 500        # Smallest subsample select_smart_models may propose; below it the model is dropped
+
+# ========================
+# Compact dataset
+# ========================
+
+DATASET_COMPACT_ENABLED = True    # Downcast the loaded data (float32 sensors, int8 on/off, categorical text); False keeps loaded dtypes
+DATASET_FLOAT32_MAX_ABS = 1e6     # Float columns with larger magnitudes stay float64 (float32 keeps ~7 significant digits)
+DATASET_CATEGORY_MAX_UNIQUE = 50  # Text columns with at most this many distinct values become categorical
+
+# ========================
+# Shared training data
+# ========================
+
+SHARED_DATA_ENABLED = True        # Publish training data once for worker processes instead of pickling it per job
+SHARED_DATA_BACKEND = "shm"       # "shm" (multiprocessing.shared_memory) or "memmap" (files in SHARED_DATA_DIR, for small /dev/shm)
+SHARED_DATA_DIR = "shared_data"   # Segment files of the "memmap" backend
+SHARED_DATA_MIN_MB = 1.0          # Smaller data is pickled to the workers as before
 
 # ========================
 # Algorithm fallback map
@@ -0,0 +1,315 @@
+# =============================================================
+#  athena.py Pipeline - fit cost model
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: cost_model.py ===
+
+import json
+import logging                                # Built-in logging module for log management
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from backends import load_backend
+from config_pipeline import (
+    COST_MODEL_FILE,
+    COST_MODEL_MAX_OBSERVATIONS,
+    COST_MODEL_MIN_OBSERVATIONS,
+    COST_MODEL_PRIORS,
+    COST_MODEL_RSS_INTERVAL,
+    ALGORITHM_MEMORY_MULTIPLIER,
+    CV_FOLDS_DEFAULT,
+    MAX_RAM_PERCENTAGE,
+    MODEL_TIME_BUDGET,
+    MODEL_MIN_TRAIN_ROWS,
+)
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+REFERENCE_ROWS = 10_000                       # COST_MODEL_PRIORS are given for this training size ...
+REFERENCE_FEATURES = 10                       # ... and this many features (fit time is taken as linear in features)
+MIN_MEMORY_SAMPLE_MB = 1.0                    # Smaller training matrices do not calibrate the memory multiplier
+MIN_RSS_SAMPLES = 3                           # Fits sampled fewer times than this leave peak_mb unrecorded
+PEAK_SOURCE = "sampled"                       # Marks peak_mb values measured per fit (older lines used the process high-water mark)
+
+
+# BLOC 1 - FIT OBSERVATIONS
+# Every fit appends one JSON line; appends are atomic, so worker processes can record concurrently
+
+def record_fit(algo, rows, features, seconds, peak_mb=None, path=COST_MODEL_FILE):
+    """Append one observed fit (wall seconds, RAM growth in MB) to the cost model file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps({"algo": algo, "rows": int(rows), "features": int(features), "seconds": round(seconds, 6),
+                       "peak_mb": None if peak_mb is None else round(peak_mb, 3),
+                       "peak_source": None if peak_mb is None else PEAK_SOURCE,
+                       "timestamp": datetime.now().isoformat(timespec="seconds")})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+class RssSampler:
+    """
+    Highest RSS of this process while a fit runs, polled every 'interval' seconds on
+    a background thread (native fit code releases the GIL). Unlike the ru_maxrss
+    high-water mark, earlier peaks (data loading, previous fits) do not count.
+    """
+
+    def __init__(self, interval=COST_MODEL_RSS_INTERVAL):
+        self.interval = interval
+        self.process = load_backend("psutil").Process()
+        self.rss_before = None
+        self.peak = None
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fit-rss-sampler", daemon=True)
+
+    def _sample(self):
+        rss = self.process.memory_info().rss
+        self.peak = max(self.peak, rss)
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.rss_before = self.peak = self.process.memory_info().rss
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def growth_mb(self):
+        """Peak RSS minus the RSS before the fit (MB), or None if the fit was too short to sample or freed-memory reuse hid the growth."""
+        if self.samples < MIN_RSS_SAMPLES or self.peak <= self.rss_before:
+            return None
+        return (self.peak - self.rss_before) / 1024**2
+
+
+def _start_sampler():
+    try:
+        return RssSampler().start()
+    except Exception:                         # psutil missing or process info unavailable: time only
+        return None
+
+
+_record_path = COST_MODEL_FILE                # Where measured_fit() records; see recording_to()
+
+
+@contextmanager
+def recording_to(path):
+    """Record the fits of the 'with' block in 'path' instead of COST_MODEL_FILE (benchmarks, tests)."""
+    global _record_path
+    previous, _record_path = _record_path, path
+    try:
+        yield
+    finally:
+        _record_path = previous
+
+
+@contextmanager
+def measured_fit(algo, X):
+    """
+    Time the fit in the 'with' block and record it, with its RAM growth (peak RSS
+    sampled during the fit minus the RSS before it, see RssSampler; None when it
+    could not be measured). Nothing is recorded if the fit raises.
+    """
+    sampler = _start_sampler()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if sampler is not None:
+            sampler.stop()
+    peak_mb = sampler.growth_mb() if sampler is not None else None
+    try:
+        record_fit(algo, X.shape[0], X.shape[1], seconds, peak_mb, path=_record_path)
+    except OSError as e:
+        logger.warning(f"Could not record fit timing for {algo}: {e}")
+
+
+def load_observations(path=COST_MODEL_FILE):
+    """{algo: [observation, ...]} with the COST_MODEL_MAX_OBSERVATIONS most recent fits per algorithm."""
+    observations = {}
+    if not os.path.exists(path):
+        return observations
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                obs = json.loads(line)
+            except ValueError:
+                continue                      # Partially written line
+            observations.setdefault(obs["algo"], []).append(obs)
+    return {algo: obs[-COST_MODEL_MAX_OBSERVATIONS:] for algo, obs in observations.items()}
+
+
+# BLOC 2 - COST MODEL
+# fit seconds = a * (rows / 10k) ** b * (features / 10); peak MB = multiplier * training matrix MB
+
+class CostModel:
+    """
+    Per-algorithm fit time and peak RAM predictions:
+    - no observations: COST_MODEL_PRIORS and ALGORITHM_MEMORY_MULTIPLIER
+    - a few observations: prior exponent, scale 'a' calibrated (median ratio)
+    - COST_MODEL_MIN_OBSERVATIONS over a 2x row range: 'a' and 'b' by log-log least squares
+    """
+
+    def __init__(self, observations=None):
+        self.observations = observations if observations is not None else load_observations()
+        self.time_params = {}
+        self.memory_params = {}
+
+    def _time_params(self, algo):
+        if algo not in self.time_params:
+            a, b = COST_MODEL_PRIORS.get(algo, max(COST_MODEL_PRIORS.values()))
+            obs = [o for o in self.observations.get(algo, []) if o["rows"] > 0 and o["features"] > 0 and o["seconds"] > 0]
+            if obs:
+                log_rows = np.log([o["rows"] / REFERENCE_ROWS for o in obs])
+                log_time = np.log([o["seconds"] / (o["features"] / REFERENCE_FEATURES) for o in obs])
+                if len(obs) >= COST_MODEL_MIN_OBSERVATIONS and np.ptp(log_rows) >= np.log(2):
+                    (b, _), *_ = np.linalg.lstsq(np.column_stack([log_rows, np.ones_like(log_rows)]), log_time, rcond=None)
+                    b = float(np.clip(b, 0.5, 2.5))
+                    log_a = float(np.median(log_time - b * log_rows))
+                else:
+                    log_a = float(np.median(log_time - b * log_rows))
+                a = float(np.exp(log_a))
+            self.time_params[algo] = (a, b)
+        return self.time_params[algo]
+
+    def memory_multiplier(self, algo):
+        """Peak RAM as a multiple of the training matrix size (90th percentile of observed fits)."""
+        if algo not in self.memory_params:
+            multiplier = ALGORITHM_MEMORY_MULTIPLIER.get(algo, max(ALGORITHM_MEMORY_MULTIPLIER.values()))
+            ratios = [o["peak_mb"] / _matrix_mb(o["rows"], o["features"]) for o in self.observations.get(algo, [])
+                      if o.get("peak_mb") is not None and o.get("peak_source") == PEAK_SOURCE
+                      and _matrix_mb(o["rows"], o["features"]) >= MIN_MEMORY_SAMPLE_MB]
+            if ratios:
+                multiplier = max(float(np.percentile(ratios, 90)), 1.0)
+            self.memory_params[algo] = multiplier
+        return self.memory_params[algo]
+
+    def fit_seconds(self, algo, rows, features):
+        a, b = self._time_params(algo)
+        return a * (rows / REFERENCE_ROWS) ** b * (features / REFERENCE_FEATURES)
+
+    def peak_mb(self, algo, rows, features):
+        return self.memory_multiplier(algo) * _matrix_mb(rows, features)
+
+    def training_seconds(self, algo, rows, features, cv_folds=CV_FOLDS_DEFAULT):
+        """Temporal CV (expanding windows of k/(folds+1) of the rows) plus the final fit on all rows."""
+        _, b = self._time_params(algo)
+        windows = sum((k / (cv_folds + 1)) ** b for k in range(1, cv_folds + 1))
+        return self.fit_seconds(algo, rows, features) * (1 + windows)
+
+    def rows_within(self, algo, rows, features, time_budget, ram_budget_mb, cv_folds=CV_FOLDS_DEFAULT):
+        """Largest row count <= 'rows' whose predicted training time and peak RAM fit the budgets."""
+        _, b = self._time_params(algo)
+        scale = 1.0
+        seconds = self.training_seconds(algo, rows, features, cv_folds)
+        if time_budget is not None and seconds > time_budget:
+            scale = min(scale, (time_budget / seconds) ** (1 / b))
+        peak = self.peak_mb(algo, rows, features)
+        if ram_budget_mb is not None and peak > ram_budget_mb:
+            scale = min(scale, ram_budget_mb / peak)
+        return int(rows * scale)
+
+
+def _matrix_mb(rows, features):
+    return rows * features * 8 / 1024**2     # float64 training matrix
+
+
+_cached_model = None
+_cached_mtime = None
+
+
+def get_cost_model(path=COST_MODEL_FILE):
+    """Shared CostModel, reloaded when the observation file changed."""
+    global _cached_model, _cached_mtime
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if _cached_model is None or mtime != _cached_mtime:
+        _cached_model = CostModel(load_observations(path))
+        _cached_mtime = mtime
+    return _cached_model
+
+
+# BLOC 3 - BUDGETED MODEL SELECTION
+# Keep every candidate that fits the budgets, on a recent-rows subsample if needed
+
+def ram_budget_mb(max_ram=MAX_RAM_PERCENTAGE):
+    """RAM (MB) left before system usage reaches 'max_ram' percent (same rule as the scheduler)."""
+    vm = load_backend("psutil").virtual_memory()
+    return max(vm.total * max_ram / 100 - (vm.total - vm.available), 0) / 1024**2
+
+
+def plan_models(candidates, rows, features, time_budget=MODEL_TIME_BUDGET, ram_budget=None,
+                cv_folds=CV_FOLDS_DEFAULT, min_rows=MODEL_MIN_TRAIN_ROWS):
+    """
+    Training plan for 'candidates' (priority order kept):
+    [{'algo', 'rows', 'seconds', 'peak_mb'}]; 'rows' < the full row count means
+    the algorithm should train on that many most recent rows. Candidates that
+    do not fit even with 'min_rows' rows are left out.
+    """
+    model = get_cost_model()
+    if ram_budget is None:
+        ram_budget = ram_budget_mb()
+
+    plan = []
+    for algo in candidates:
+        train_rows = model.rows_within(algo, rows, features, time_budget, ram_budget, cv_folds)
+        if train_rows < min(min_rows, rows):
+            logger.info(f"{algo}: predicted {model.training_seconds(algo, rows, features, cv_folds):.0f}s / "
+                        f"{model.peak_mb(algo, rows, features):.0f} MB exceeds the budget even on {min_rows} rows. Skipped.")
+            continue
+        plan.append({
+            "algo": algo,
+            "rows": train_rows,
+            "seconds": model.training_seconds(algo, train_rows, features, cv_folds),
+            "peak_mb": model.peak_mb(algo, train_rows, features),
+        })
+    return plan
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module predicts training cost per algorithm from rows x features.
+#
+# - training.py records every cold fit (temporal CV folds, final fit) in
+#   COST_MODEL_FILE; the model calibrates itself from these timings. Delete the
+#   file after a hardware change to start again from COST_MODEL_PRIORS.
+#
+# - Fit RAM is sampled on a thread during each fit (COST_MODEL_RSS_INTERVAL).
+#   Fits too short to sample, or whose RSS did not grow, record no peak_mb;
+#   peak_mb lines written before per-fit sampling are ignored.
+#
+# - select_smart_models (athena.py) keeps the algorithms whose predicted
+#   CV + final fit time stays within MODEL_TIME_BUDGET seconds and whose peak
+#   RAM fits the free RAM up to MAX_RAM_PERCENTAGE, proposing a subsample of the
+#   most recent rows (at least MODEL_MIN_TRAIN_ROWS) when the full set does not.
+#   train_and_choose_modelli passes the proposed rows to training.train_zone.
+#
+# - scheduler.py uses the calibrated memory multipliers for its job estimates.
+# ================================================================================
@@ -0,0 +1,114 @@
+# =============================================================
+#  athena.py Pipeline - compact dataset module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: dataset.py ===
+
+import logging                                # Built-in logging module for log management
+
+import numpy as np
+import pandas as pd
+
+from config_pipeline import DATASET_COMPACT_ENABLED, DATASET_FLOAT32_MAX_ABS, DATASET_CATEGORY_MAX_UNIQUE
+from profiler import peak_rss_mb
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - COMPACT DTYPES
+# Sensors -> float32, on/off and small integers -> int8/int16, repeated text -> categorical
+
+def frame_memory_mb(df):
+    """Memory held by 'df' (values, index and object contents), in MB."""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def _compact_column(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype(np.int8)
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer")   # 0/1 states -> int8
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        finite = values[np.isfinite(values)]
+        if finite.size == len(values) and np.isin(finite, (0.0, 1.0)).all():
+            return series.astype(np.int8)     # On/off states read as float, no gaps
+        if not finite.size or np.abs(finite).max() <= DATASET_FLOAT32_MAX_ABS:
+            return series.astype(np.float32)
+        return series
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        if series.nunique(dropna=True) <= DATASET_CATEGORY_MAX_UNIQUE:
+            return series.astype("category")
+    return series
+
+
+def compact_dtypes(df):
+    """New DataFrame with the smallest lossless-enough dtype per column (same columns and index)."""
+    return pd.DataFrame({col: _compact_column(df[col]) for col in df.columns}, index=df.index)
+
+
+def compact_dataset(df, label="dataset"):
+    """compact_dtypes() with the memory use logged before and after (no-op if DATASET_COMPACT_ENABLED is False)."""
+    if df is None or not DATASET_COMPACT_ENABLED:
+        return df
+    before = frame_memory_mb(df)
+    compact = compact_dtypes(df)
+    after = frame_memory_mb(compact)
+    dtypes = compact.dtypes.astype(str).value_counts().to_dict()
+    peak = peak_rss_mb()
+    logger.info(f"{label}: {len(df)} rows, {before:.1f} MB -> {after:.1f} MB {dtypes}"
+                + ("" if peak is None else f" (process peak RSS {peak:.0f} MB)"))
+    return compact
+
+
+# BLOC 2 - READ-ONLY VIEWS
+# Analysis stages share the loaded columns instead of receiving df.copy()
+
+def read_only_view(df):
+    """
+    DataFrame over the same memory as 'df' whose numeric columns cannot be written:
+    in-place edits raise ValueError instead of silently changing the shared data.
+    Column assignment and other operations that build new data still work.
+    """
+    columns = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, np.dtype) and df[col].dtype.kind in "biuf":
+            values = df[col].to_numpy().view()
+            values.flags.writeable = False
+            columns[col] = values
+        else:
+            columns[col] = df[col]
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module shrinks the training data kept in memory for the whole run.
+#
+# - compact_dataset() is applied once after loading: float64 sensors become
+#   float32 (DATASET_FLOAT32_MAX_ABS keeps larger magnitudes in float64),
+#   gap-free whole-number columns (pump/valve states) int8, and text columns
+#   with at most DATASET_CATEGORY_MAX_UNIQUE values categorical.
+#
+# - Pass read_only_view(df) to analysis stages instead of df.copy(). A stage
+#   that needs to modify values must make its own copy of those columns.
+#
+# - Set DATASET_COMPACT_ENABLED = False to keep the loaded dtypes (e.g. to
+#   compare results with an older run bit for bit).
+# ================================================================================
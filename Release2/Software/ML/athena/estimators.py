@@ -0,0 +1,132 @@
+# =============================================================
+#  athena.py Pipeline - estimator registry
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: estimators.py ===
+
+import importlib.util
+import logging                                # Built-in logging module for log management
+import os
+
+from backends import load_module
+from config_pipeline import THREAD_BUDGET
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - REGISTRY
+# One entry per algorithm: where the class lives, default parameters and its thread parameter
+#   "threads": name of the constructor argument that sets the number of threads,
+#              None for estimators that only use BLAS/OpenMP internally (limited separately)
+
+ESTIMATORS = {
+    "linear_regression": {"module": "sklearn.linear_model", "class": "LinearRegression", "params": {}, "threads": None},
+    "random_forest": {"module": "sklearn.ensemble", "class": "RandomForestRegressor", "params": {}, "threads": "n_jobs"},
+    "xgboost": {"module": "xgboost", "class": "XGBRegressor", "params": {}, "threads": "n_jobs"},
+    "gradient_boosting": {"module": "sklearn.ensemble", "class": "GradientBoostingRegressor", "params": {}, "threads": None},
+    "lightgbm": {"module": "lightgbm", "class": "LGBMRegressor", "params": {"verbose": -1}, "threads": "n_jobs"},
+    "svr": {"module": "sklearn.svm", "class": "SVR", "params": {}, "threads": None},
+    "knn": {"module": "sklearn.neighbors", "class": "KNeighborsRegressor", "params": {}, "threads": "n_jobs"},
+    "catboost": {"module": "catboost", "class": "CatBoostRegressor", "params": {"verbose": 0}, "threads": "thread_count"},
+}
+
+
+def is_available(algo):
+    """True if 'algo' is registered and its library is installed (checked without importing it)."""
+    if algo not in ESTIMATORS:
+        return False
+    return importlib.util.find_spec(ESTIMATORS[algo]["module"].split(".")[0]) is not None
+
+
+def available_algorithms(algos):
+    """Keep the registered, installed algorithms of 'algos' (order preserved)."""
+    kept = [algo for algo in algos if is_available(algo)]
+    skipped = [algo for algo in algos if algo not in kept]
+    if skipped:
+        logger.info(f"Algorithms not available and skipped: {skipped}")
+    return kept
+
+
+def estimator_class(algo):
+    """Estimator class for 'algo', or None if not registered. Raises ImportError if not installed."""
+    spec = ESTIMATORS.get(algo)
+    if spec is None:
+        return None
+    return getattr(load_module(spec["module"]), spec["class"])
+
+
+# BLOC 2 - THREAD BUDGET
+# THREAD_BUDGET cores are split between the fits that run at the same time
+
+def thread_budget():
+    """Total cores available to model fitting (THREAD_BUDGET, 0 = all cores)."""
+    return THREAD_BUDGET if THREAD_BUDGET and THREAD_BUDGET > 0 else (os.cpu_count() or 1)
+
+
+def threads_per_fit(concurrent_fits=1):
+    """Threads each fit may use when 'concurrent_fits' fits share the budget (at least 1)."""
+    return max(thread_budget() // max(int(concurrent_fits), 1), 1)
+
+
+def create_estimator(algo, threads=None, **params):
+    """
+    New unfitted estimator for 'algo' with the registry defaults, 'params' on top,
+    and its thread parameter set to 'threads' (default: the whole budget).
+    Returns None if 'algo' is not registered.
+    """
+    estimator = estimator_class(algo)
+    if estimator is None:
+        return None
+    spec = ESTIMATORS[algo]
+    kwargs = dict(spec["params"])
+    if spec["threads"] is not None:
+        kwargs[spec["threads"]] = threads if threads is not None else threads_per_fit(1)
+    kwargs.update(params)
+    return estimator(**kwargs)
+
+
+def limit_native_threads(threads):
+    """
+    Cap BLAS/OpenMP thread pools of this process at 'threads' (numpy, scipy, sklearn).
+    Returns the threadpoolctl limiter, or None if threadpoolctl is not installed.
+    """
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)        # Inherited by processes started later
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return None
+    return threadpool_limits(limits=threads)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module is the only place where estimators are constructed.
+#
+# - To add an algorithm, add an ESTIMATORS entry. Set "threads" to the
+#   constructor argument that controls threading (n_jobs, thread_count, ...).
+#
+# - THREAD_BUDGET (0 = all cores) is divided by the number of concurrent fits:
+#   '--workers 4' on 8 cores gives each worker 2 threads for the estimator and
+#   2 BLAS/OpenMP threads (limit_native_threads in the worker initializer).
+#
+# - Thread parameters are left out of the model cache key, and THREAD_BUDGET
+#   is not one of model_cache.CONFIG_KEY_CONSTANTS: changing THREAD_BUDGET or
+#   the worker count still reuses cached models.
+# ================================================================================
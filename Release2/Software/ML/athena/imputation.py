@@ -0,0 +1,141 @@
+# =============================================================
+#  athena.py Pipeline - grouped imputation module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: imputation.py ===
+
+import logging                                # Built-in logging module for log management
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+LINEAR = ("linear",)
+MEAN = ("mean",)
+FFILL = ("ffill",)
+BFILL = ("bfill",)
+
+
+# BLOC 1 - IMPUTATION PLAN
+# Columns grouped by legend method; each group is filled with one call on its column block
+
+def legend_methods(entries):
+    """{code: interpolation method} for the legend entries ({code: fields}) that declare one."""
+    return {str(code): str(fields["interpolation"]) for code, fields in entries.items()
+            if isinstance(fields, dict) and str(fields.get("interpolation", "")).strip()}
+
+
+def imputation_plan(methods):
+    """
+    Group the columns of 'methods' ({column: legenda.yaml method}) by fill:
+    {LINEAR: [...], MEAN: [...], FFILL: [...], BFILL: [...], ("value", 7.0): [...]}.
+    Returns (plan, {column: warning}) - a method that is not understood gets only
+    the final gap fill, i.e. the LINEAR group.
+    """
+    plan = {}
+    problems = {}
+    for column, method in methods.items():
+        name = method.lower()
+        if name == "linear":
+            key = LINEAR
+        elif name == "mean":
+            key = MEAN
+        elif name == "ffill":
+            key = FFILL
+        elif name == "bfill":
+            key = BFILL
+        elif name.startswith("value:"):
+            try:
+                key = ("value", float(method.split(":")[1].strip()))
+            except ValueError:
+                key = LINEAR
+                problems[column] = f"Invalid interpolation value for column '{column}'."
+        else:
+            key = LINEAR
+            problems[column] = f"Interpolation method '{method}' not recognized for column '{column}'."
+        plan.setdefault(key, []).append(column)
+    return plan, problems
+
+
+# BLOC 2 - GROUPED FILL
+# The legend method and the final gap fill (linear, then bfill) merged into one pass per group:
+#   linear -> interpolation, ends held at the nearest value    ffill -> ffill, then bfill
+#   bfill  -> bfill, then ffill                                 mean / value:x -> fillna
+
+def _as_float(block):
+    """Nullable integer/boolean columns as float64: linear, mean and value fills can be fractional."""
+    return block.astype({col: "float64" for col, dtype in block.dtypes.items() if not isinstance(dtype, np.dtype)
+                         and (pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype))})
+
+
+def impute(df, plan, column_means=None):
+    """
+    New DataFrame with the gaps of every planned column filled (other columns unchanged).
+    'column_means' ({column: mean}) overrides the block mean used by the MEAN group.
+    Gives the same values as each method followed by interpolate(method='linear').bfill()
+    column by column; a column without any value stays empty.
+    """
+    filled = {}
+    for key, columns in plan.items():
+        columns = [col for col in columns if col in df.columns]
+        if not columns:
+            continue
+        block = df[columns]
+        if key == LINEAR:
+            block = _as_float(block).interpolate(method="linear", limit_direction="both")
+        elif key == MEAN:
+            block = _as_float(block)
+            means = block.mean() if column_means is None else pd.Series({col: column_means[col] for col in columns})
+            block = block.fillna(means)
+        elif key == FFILL:
+            block = block.ffill().bfill()
+        elif key == BFILL:
+            block = block.bfill().ffill()
+        else:
+            block = _as_float(block).fillna(key[1])
+        for col in columns:
+            filled[col] = block[col]
+    return pd.DataFrame({col: filled.get(col, df[col]) for col in df.columns}, index=df.index)
+
+
+def impute_columns(df, methods, column_means=None):
+    """impute() for {column: legend method}; methods that are not understood are logged."""
+    plan, problems = imputation_plan({col: method for col, method in methods.items() if col in df.columns})
+    for message in problems.values():
+        logger.warning(message)
+    return impute(df, plan, column_means)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module fills data gaps with the legend's per-column methods (linear,
+# mean, ffill, bfill, value:<x>). It is shared by pre-ML/extractor.py and
+# athena's data loading (legend 'interpolation' column).
+#
+# - Columns are grouped by method and each group is filled with one call on
+#   its column block, so the cost grows with the number of methods, not the
+#   number of columns.
+#
+# - The result matches the former per-column loop of extractor.py: the method,
+#   then interpolate(method='linear').bfill() over every column.
+#
+# - Integer columns with gaps become float64 for linear, mean and value fills;
+#   ffill/bfill keep the column dtype.
+# ================================================================================
@@ -0,0 +1,218 @@
+# =============================================================
+#  athena.py Pipeline - model cache module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: model_cache.py ===
+
+import hashlib                                # Content hashing of data, parameters and config
+import json
+import logging                                # Built-in logging module for log management
+import os
+import shutil
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import config_pipeline
+from config_pipeline import MODEL_CACHE_DIR, MODEL_CACHE_MAX_MB, MODEL_CACHE_MAX_ENTRIES
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - CACHE KEY
+# sha256 over the training/test data, algorithm, parameters, library version and thresholds
+
+def _update_with_data(digest, obj):
+    if obj is None:
+        digest.update(b"none")
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        names = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+        digest.update(json.dumps([str(n) for n in names]).encode())
+        digest.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    else:
+        arr = np.ascontiguousarray(obj)
+        digest.update(str((arr.dtype, arr.shape)).encode())
+        digest.update(arr.tobytes())
+
+
+# config_pipeline constants that change the fitted model or its metrics; the others
+# (alerts, cache, threads, profiling, benchmark, ...) only change how a run is carried out
+CONFIG_KEY_CONSTANTS = [
+    "THRESHOLD_R2_DEFAULT",
+    "CV_FOLDS_DEFAULT",
+    "CV_K_DEFAULT",
+    "TEST_SIZE_DEFAULT",
+    "INCREMENTAL_CV_DEFAULT",
+    "INCREMENTAL_CV_GROWTH",
+    "INCREMENTAL_CV_ALGORITHMS",
+]
+
+
+def _config_snapshot():
+    """The CONFIG_KEY_CONSTANTS of config_pipeline.py (thresholds, test split and CV settings)."""
+    return {k: getattr(config_pipeline, k, None) for k in CONFIG_KEY_CONSTANTS}
+
+
+# Thread counts change speed, not the fitted model
+THREAD_PARAMS = {"n_jobs", "nthread", "num_threads", "thread_count"}
+
+
+def _model_params(model):
+    return {k: v for k, v in model.get_params().items() if k not in THREAD_PARAMS}
+
+
+def _library_version(model):
+    module = sys.modules.get(type(model).__module__.split(".")[0])
+    return getattr(module, "__version__", "unknown")
+
+
+def compute_cache_key(algo, model, X, y, X_test=None, y_test=None):
+    """Content address of one (data slice, algorithm, parameters, config) combination."""
+    digest = hashlib.sha256()
+    header = {
+        "algo": algo,
+        "estimator": type(model).__name__,
+        "version": _library_version(model),
+        "params": _model_params(model),
+        "config": _config_snapshot(),
+    }
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+    for obj in (X, y, X_test, y_test):
+        _update_with_data(digest, obj)
+    return digest.hexdigest()
+
+
+# BLOC 2 - LOOKUP AND STORE
+# Each entry is <key>.joblib (fitted model) + <key>.json (metrics)
+
+def _paths(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.joblib"), os.path.join(cache_dir, f"{key}.json")
+
+
+def _to_builtin(value):
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def lookup(key, cache_dir=MODEL_CACHE_DIR):
+    """Return the cached metrics for 'key' (and refresh its LRU position), or None."""
+    model_file, metrics_file = _paths(key, cache_dir)
+    if not (os.path.exists(model_file) and os.path.exists(metrics_file)):
+        return None
+    try:
+        with open(metrics_file, "r", encoding="utf-8") as f:
+            metrics = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable model cache entry {key}: {e}")
+        return None
+    try:
+        for path in (model_file, metrics_file):
+            os.utime(path)                    # mtime is the LRU clock
+    except FileNotFoundError:                 # Evicted meanwhile by another worker process
+        return None
+    return metrics
+
+
+def load_model(key, cache_dir=MODEL_CACHE_DIR):
+    return joblib.load(_paths(key, cache_dir)[0])
+
+
+def restore_model(key, model_path, cache_dir=MODEL_CACHE_DIR):
+    """Copy the cached model file to the usual '{zone}_{algo}_trained_model.joblib' path."""
+    shutil.copyfile(_paths(key, cache_dir)[0], model_path)
+
+
+def store(key, model, metrics, cache_dir=MODEL_CACHE_DIR):
+    """Save a fitted model and its metrics, then evict old entries."""
+    os.makedirs(cache_dir, exist_ok=True)
+    model_file, metrics_file = _paths(key, cache_dir)
+    try:
+        joblib.dump(model, model_file)
+        with open(metrics_file, "w", encoding="utf-8") as f:
+            json.dump({k: _to_builtin(v) for k, v in metrics.items()}, f)
+    except Exception as e:
+        logger.warning(f"Could not store model cache entry {key}: {e}")
+        for path in (model_file, metrics_file):
+            if os.path.exists(path):
+                os.remove(path)
+        return
+    evict(cache_dir)
+
+
+# BLOC 3 - EVICTION
+# Least-recently-used entries go first, until both the size and entry limits are met
+
+def evict(cache_dir=MODEL_CACHE_DIR, max_mb=MODEL_CACHE_MAX_MB, max_entries=MODEL_CACHE_MAX_ENTRIES):
+    """Remove least-recently-used entries above 'max_mb' or 'max_entries'. Returns the removed keys."""
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = {}
+    for name in os.listdir(cache_dir):
+        key, ext = os.path.splitext(name)
+        if ext not in (".joblib", ".json"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:             # Evicted meanwhile by another worker process
+            continue
+        size, mtime = entries.get(key, (0, 0))
+        entries[key] = (size + stat.st_size, max(mtime, stat.st_mtime))
+
+    total_mb = sum(size for size, _ in entries.values()) / 1024**2
+    removed = []
+    for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+        if total_mb <= max_mb and len(entries) - len(removed) <= max_entries:
+            break
+        for path in _paths(key, cache_dir):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total_mb -= size / 1024**2
+        removed.append(key)
+
+    if removed:
+        logger.info(f"Model cache: evicted {len(removed)} entries ({total_mb:.1f} MB kept).")
+    return removed
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module lets unchanged cron runs skip temporal CV and the final fit.
+#
+# - The key covers: training and test data (values, index, column names),
+#   algorithm, estimator parameters and library version, and the
+#   CONFIG_KEY_CONSTANTS of config_pipeline.py (R² threshold, test split, CV
+#   settings). Changing any of them is a miss; other config edits are not.
+#
+# - Entries live in MODEL_CACHE_DIR and are evicted least-recently-used first
+#   once MODEL_CACHE_MAX_MB or MODEL_CACHE_MAX_ENTRIES is exceeded.
+#
+# - Several processes ('--workers', '--zone_workers') may store and evict in
+#   the same directory: entries removed by another process are skipped.
+#
+# - Deleting MODEL_CACHE_DIR is always safe; the next run simply retrains.
+# ================================================================================
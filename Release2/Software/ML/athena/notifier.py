@@ -8,7 +8,7 @@
 #                 unless prior written authorization is granted by the author.
 #  Author       : Cmod777
 #  Created      : April 2025
-#  Last Update  : May 2025
+#  Last Update  : October 2026
 #  Python       : 3.10+
 # =============================================================
 #  DISCLAIMER
@@ -20,19 +20,253 @@
 
 # === CONFIG FILE: notifier.py ===
 
+import atexit
+import json
 import logging                                # Built-in logging module for log management
-from notifier import send_telegram_notification  # External function to send Telegram messages
+import multiprocessing
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from config_pipeline import (
+    TELEGRAM_API_URL,
+    ALERT_ASYNC_ENABLED,
+    ALERT_COALESCE_WINDOW,
+    ALERT_RATE_LIMIT_PER_MINUTE,
+    ALERT_MAX_MESSAGE_CHARS,
+    ALERT_SEND_RETRIES,
+    ALERT_HTTP_TIMEOUT,
+    ALERT_FLUSH_TIMEOUT,
+)
 
 
 logger = logging.getLogger(__name__)          # Logger instance for this module
 
+BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "<YOUR_TELEGRAM_BOT_TOKEN>")
+CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "<YOUR_CHAT_ID>")
+API_URL = os.environ.get("TELEGRAM_API_URL", TELEGRAM_API_URL)   # Point at a local stub server for tests
+
+
+# BLOC 1 - TELEGRAM TRANSPORT
+# One HTTP POST per message; returns the wait requested by a 429 so callers can back off
+
+def _post_telegram(text):
+    """
+    Send one message. Returns (ok, retry_after_seconds).
+    retry_after is only set when the API answered 429 Too Many Requests.
+    """
+    if BOT_TOKEN.startswith("<") or CHAT_ID.startswith("<"):
+        logger.warning("Telegram credentials not configured. Message not sent.")
+        return False, None
+
+    url = f"{API_URL}/bot{BOT_TOKEN}/sendMessage"
+    data = urllib.parse.urlencode({"chat_id": CHAT_ID, "text": text}).encode()
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=ALERT_HTTP_TIMEOUT):
+            return True, None
+    except urllib.error.HTTPError as e:
+        retry_after = None
+        if e.code == 429:
+            try:
+                retry_after = json.loads(e.read().decode()).get("parameters", {}).get("retry_after")
+            except ValueError:
+                pass
+            retry_after = retry_after or 1
+        logger.error(f"Telegram send error {e.code}: {e.reason}")
+        return False, retry_after
+    except (urllib.error.URLError, OSError) as e:
+        logger.error(f"Telegram send error: {e}")
+        return False, None
+
+
+def send_telegram_notification(text):
+    """Send 'text' right away (blocking). Prefer send_alert(..., notify=True) inside the pipeline."""
+    ok, _ = _post_telegram(text)
+    return ok
+
+
+# BLOC 2 - ALERT DISPATCHER
+# Background thread: collect alerts for ALERT_COALESCE_WINDOW seconds, merge them, send under a rate limit
+
+class AlertDispatcher:
+    """
+    Queue behind send_alert(notify=True):
+    - identical alerts in the same window are sent once with a repeat count
+    - alerts are grouped per zone/algorithm and each window becomes one message
+      (split only above ALERT_MAX_MESSAGE_CHARS)
+    - at most ALERT_RATE_LIMIT_PER_MINUTE messages per minute (token bucket),
+      honouring Telegram's retry_after on 429
+    - flush() sends everything pending immediately; it runs automatically at exit
+    """
+
+    def __init__(self, sender=_post_telegram, window=ALERT_COALESCE_WINDOW,
+                 rate_per_minute=ALERT_RATE_LIMIT_PER_MINUTE, max_chars=ALERT_MAX_MESSAGE_CHARS):
+        self.sender = sender
+        self.window = window
+        self.rate_per_minute = rate_per_minute
+        self.max_chars = max_chars
+        self.sent_messages = 0
+        self.dropped_messages = 0
+        self._pending = {}                    # (zone, algo) -> {(level, message): count}
+        self._first_at = None
+        self._flush_requested = False
+        self._sending = False
+        self._stopped = False
+        self._tokens = float(rate_per_minute)
+        self._refilled_at = time.monotonic()
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, level, message, zone=None, algo=None):
+        with self._cond:
+            group = self._pending.setdefault((zone, algo), {})
+            group[(level, message)] = group.get((level, message), 0) + 1
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            self._cond.notify_all()
+
+    def flush(self, timeout=ALERT_FLUSH_TIMEOUT):
+        """Send all pending alerts now. Returns True if the queue drained within 'timeout'."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while (self._pending or self._sending) and self._thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("Alert flush timed out with messages still pending.")
+                    return False
+                self._cond.wait(remaining)
+            if not self._pending and not self._sending:
+                self._flush_requested = False     # Nothing left: later alerts wait for their window again
+        return True
+
+    def close(self, timeout=ALERT_FLUSH_TIMEOUT):
+        drained = self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        return drained
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Keep collecting until the window closes, unless a flush was requested
+                while not (self._flush_requested or self._stopped):
+                    remaining = self._first_at + self.window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending, self._first_at = self._pending, {}, None
+                self._sending = True
+
+            for text in self._format(batch):
+                self._send_limited(text)
+
+            with self._cond:
+                self._sending = False
+                if not self._pending:
+                    self._flush_requested = False
+                self._cond.notify_all()
+
+    def _format(self, batch):
+        """One message per batch, grouped by zone/algorithm; split on line boundaries if too long."""
+        total = sum(sum(group.values()) for group in batch.values())
+        lines = [f"ATHENA alerts ({total}):"]
+        for (zone, algo), group in batch.items():
+            header = "".join(f"[{part}]" for part in (zone, algo) if part) or "[general]"
+            lines.append(header)
+            for (level, message), count in group.items():
+                repeat = f" (x{count})" if count > 1 else ""
+                lines.append(f"- {level.upper()}: {message}{repeat}")
+
+        messages, current = [], ""
+        for line in lines:
+            line = line[:self.max_chars]
+            if current and len(current) + 1 + len(line) > self.max_chars:
+                messages.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        messages.append(current)
+        return messages
+
+    def _take_token(self):
+        """Block until the token bucket allows one more message."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.rate_per_minute, self._tokens + (now - self._refilled_at) * self.rate_per_minute / 60)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            time.sleep((1 - self._tokens) * 60 / self.rate_per_minute)
+
+    def _send_limited(self, text):
+        for attempt in range(1, ALERT_SEND_RETRIES + 1):
+            self._take_token()
+            ok, retry_after = self.sender(text)
+            if ok:
+                self.sent_messages += 1
+                return
+            if retry_after:
+                time.sleep(retry_after)
+        self.dropped_messages += 1
+        logger.error(f"Alert message dropped after {ALERT_SEND_RETRIES} attempts: {text[:80]}")
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+_import_pid = os.getpid()                     # Process that imported this module first (forked children inherit it)
+
+
+def _in_main_process():
+    """
+    False in pool workers and other multiprocessing children (fork or spawn). They exit
+    without running atexit, so a dispatcher created there would lose its queued alerts.
+    """
+    return os.getpid() == _import_pid and multiprocessing.parent_process() is None
+
+
+def get_dispatcher():
+    """
+    The process-wide dispatcher, started on first use. None (send inline) if
+    ALERT_ASYNC_ENABLED is False or outside the main process.
+    """
+    global _dispatcher
+    if not ALERT_ASYNC_ENABLED or not _in_main_process():
+        return None
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher()
+        return _dispatcher
+
+
+def flush_alerts(timeout=ALERT_FLUSH_TIMEOUT):
+    """Send every queued alert now (call before the final notification)."""
+    if _dispatcher is not None and _dispatcher._pid == os.getpid():
+        return _dispatcher.flush(timeout)
+    return True
+
+
+# BLOC 3 - ALERT ENTRY POINT
 
 def send_alert(level, message, zone=None, algo=None, notify=False):
     """
     Centralized alert handler:
     - Logs the message based on severity
     - Prints it to stdout
-    - Optionally sends a Telegram notification
+    - Optionally queues a Telegram notification (sent in the background, see AlertDispatcher)
     """
 
     prefix = ""                               # Prefix to contextualize the alert
@@ -54,7 +288,11 @@ def send_alert(level, message, zone=None, algo=None, notify=False):
     print(full_message)                       # Also show in CLI output
 
     if notify:                                # Optional Telegram alert
-        send_telegram_notification(full_message)
+        dispatcher = get_dispatcher()
+        if dispatcher is not None:
+            dispatcher.submit(level, message, zone, algo)
+        else:
+            send_telegram_notification(full_message)
 
 
 # === INSTRUCTIONS AND SAFE USAGE ===============================================
@@ -67,6 +305,15 @@ def send_alert(level, message, zone=None, algo=None, notify=False):
 #
 # - Use 'notify=True' only when real-time attention is required.
 #   Avoid flooding the Telegram channel with debug or trace outputs.
+#   Notifications are queued: identical alerts within ALERT_COALESCE_WINDOW
+#   seconds are merged, and at most ALERT_RATE_LIMIT_PER_MINUTE messages are sent.
+#   Call flush_alerts() before a final summary so it arrives last.
+#   Worker processes (scheduler.py pools) send their alerts inline instead:
+#   they exit without the atexit flush of the queue.
+#
+# - Credentials come from TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID (environment)
+#   or the BOT_TOKEN / CHAT_ID placeholders above. TELEGRAM_API_URL can point
+#   at a local stub HTTP server to test delivery without Telegram.
 #
 # - You may extend this handler in the future to:
 #   * Save alerts to JSON or external logs
@@ -0,0 +1,164 @@
+# =============================================================
+#  athena.py Pipeline - prediction sink module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: prediction_sink.py ===
+
+import json
+import logging                                # Built-in logging module for log management
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from config_pipeline import PREDICTION_SPOOL_FILE, OUTPUT_WRITE_MAX_RETRIES, OUTPUT_WRITE_BACKOFF
+from notifier import send_alert
+from profiler import span
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+def _row_key(timestamp, zone):
+    """(time, zone) of an output row; times compare as instants whatever the sheet's display format."""
+    try:
+        timestamp = pd.Timestamp(str(timestamp)).isoformat()
+    except ValueError:
+        timestamp = str(timestamp)
+    return timestamp, str(zone)
+
+
+def _to_cell(value):
+    """Convert numpy scalars and None into values accepted by the Sheets API."""
+    if value is None:
+        return ""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class PredictionSink:
+    """
+    Buffered writer for the output worksheet:
+    - add() appends one row to a local spool file (JSON lines) right away
+    - flush() sends every spooled row in a single append_rows() call,
+      retrying with exponential backoff; the spool is cleared only on success.
+      Before a retry, rows already found at the end of the sheet (same timestamp
+      and zone) are dropped: a failed call may have been stored by the server.
+    Rows left over from a failed run are sent with the next flush.
+    """
+
+    def __init__(self, output_ws, spool_path=PREDICTION_SPOOL_FILE,
+                 max_retries=OUTPUT_WRITE_MAX_RETRIES, backoff=OUTPUT_WRITE_BACKOFF):
+        self.output_ws = output_ws
+        self.spool_path = spool_path
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+
+    def add(self, timestamp, zone, prediction, extra=None):
+        """Spool one prediction row: [timestamp, zone, prediction, extra (JSON)]."""
+        extra_cell = json.dumps({k: _to_cell(v) for k, v in extra.items()}) if extra else ""
+        row = [timestamp, zone, _to_cell(prediction), extra_cell]
+        with self._lock:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+                f.flush()
+                os.fsync(f.fileno())          # The row survives a crash before flush()
+
+    def pending_rows(self):
+        if not os.path.exists(self.spool_path):
+            return []
+        rows = []
+        with open(self.spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping corrupt spool line: {line[:80]}")
+        return rows
+
+    def _unwritten(self, rows):
+        """'rows' without those already among the last len(rows) rows of the output sheet."""
+        try:
+            tail = (self.output_ws.get("A:B") or [])[-len(rows):]
+        except Exception as e:
+            logger.warning(f"Could not read back the output sheet ({e}). Retrying all {len(rows)} rows.")
+            return rows
+        written = {_row_key(*row[:2]) for row in tail if len(row) >= 2}
+        remaining = [row for row in rows if _row_key(row[0], row[1]) not in written]
+        if len(remaining) < len(rows):
+            logger.info(f"Prediction sink: {len(rows) - len(remaining)} rows were stored by a failed attempt.")
+        return remaining
+
+    def flush(self):
+        """Write all spooled rows in one batch. Returns the number of rows written."""
+        with self._lock:
+            rows = self.pending_rows()
+            if not rows:
+                return 0
+
+            delay = self.backoff
+            remaining = rows
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    if attempt > 1:
+                        remaining = self._unwritten(remaining)
+                    if remaining:
+                        with span("output_write", rows=len(remaining), attempt=attempt):
+                            self.output_ws.append_rows(remaining, value_input_option="USER_ENTERED")
+                    os.remove(self.spool_path)
+                    logger.info(f"Prediction sink: {len(rows)} rows written in one batch (attempt {attempt}).")
+                    print(f"Predictions written: {len(rows)} rows.")
+                    return len(rows)
+                except Exception as e:
+                    logger.warning(f"Prediction write attempt {attempt}/{self.max_retries} failed: {e}")
+                    if attempt < self.max_retries:
+                        time.sleep(delay)
+                        delay *= 2
+
+            send_alert(
+                "error",
+                f"Could not write {len(rows)} predictions after {self.max_retries} attempts. Kept in '{self.spool_path}' for the next run.",
+                notify=True
+            )
+            return 0
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module replaces per-zone writes to the output worksheet.
+#
+# - Call add() for every zone, then flush() once at the end of the run.
+#   A crash between the two loses nothing: rows stay in PREDICTION_SPOOL_FILE.
+#
+# - Retries: OUTPUT_WRITE_MAX_RETRIES attempts, waiting OUTPUT_WRITE_BACKOFF
+#   seconds after the first failure and doubling each time.
+#
+# - append_rows() is not idempotent: a call that times out may still have
+#   been stored. Before each retry the last rows of the sheet are read back
+#   and rows with the same timestamp and zone are not sent again. If that read
+#   fails, all rows are retried and duplicates are possible.
+#
+# - Do not delete the spool file by hand unless the rows are no longer needed.
+# ================================================================================
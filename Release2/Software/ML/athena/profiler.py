@@ -0,0 +1,238 @@
+# =============================================================
+#  athena.py Pipeline - stage profiler
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: profiler.py ===
+
+import atexit
+import functools
+import inspect
+import json
+import logging                                # Built-in logging module for log management
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from backends import load_backend
+from config_pipeline import PROFILE_DIR
+
+try:
+    import resource                           # Not available on Windows
+except ImportError:
+    resource = None
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - MEASUREMENTS
+# Wall time (perf_counter), process CPU time (all threads, incl. native fit threads), peak RSS
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unavailable)."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024   # bytes on macOS, KB on Linux
+    try:
+        return load_backend("psutil").Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+# BLOC 2 - SPAN RECORDER
+# One record per finished span; nesting is tracked per thread
+
+class Profiler:
+    """
+    Records named, timed spans of the pipeline:
+    - span("data_load", zone=...) as a context manager, traced("final_fit", "zone", "algo") as a decorator
+    - each span keeps wall seconds, CPU seconds, peak RSS (MB), pid/tid, parent span and attributes
+    - export_json() / export_chrome_trace() write the run (chrome://tracing, Perfetto)
+    Disabled by default: span() then costs one attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.output_prefix = None
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._exit_registered = False
+
+    def enable(self, output_prefix=None):
+        """Start recording. With 'output_prefix', both exports are written at exit."""
+        self.enabled = True
+        self.output_prefix = output_prefix
+        if output_prefix and not self._exit_registered:
+            atexit.register(self.export)
+            self._exit_registered = True
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, **attrs):
+        if not self.enabled:
+            yield None
+            return
+
+        stack = self._stack()
+        record = {
+            "name": name,
+            "parent": stack[-1]["name"] if stack else None,
+            "depth": len(stack),
+            "start": time.time(),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "process": multiprocessing.current_process().name,
+            "attrs": {k: v for k, v in attrs.items() if v is not None},
+        }
+        stack.append(record)
+        rss_before = peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record                      # Callers may add attributes to record["attrs"]
+        except BaseException as e:
+            record["attrs"]["error"] = type(e).__name__
+            raise
+        finally:
+            record["wall_s"] = time.perf_counter() - wall_start
+            record["cpu_s"] = time.process_time() - cpu_start
+            record["rss_peak_mb"] = peak_rss_mb()
+            if rss_before is not None and record["rss_peak_mb"] is not None:
+                record["rss_growth_mb"] = record["rss_peak_mb"] - rss_before
+            stack.pop()
+            with self._lock:
+                self.spans.append(record)
+
+    def traced(self, name, *arg_names):
+        """Decorator: run the function inside span(name); 'arg_names' arguments become attributes."""
+        def decorator(fn):
+            signature = inspect.signature(fn)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                attrs = {arg: bound[arg] for arg in arg_names if isinstance(bound.get(arg), (str, int, float))}
+                with self.span(name, **attrs):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def drain(self):
+        """Return and forget the recorded spans (used to ship a worker's spans to the parent)."""
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def merge(self, spans):
+        """Add spans recorded in another process."""
+        if spans:
+            with self._lock:
+                self.spans.extend(spans)
+
+    # BLOC 3 - EXPORT
+    # JSON (records + per-stage summary) and Chrome trace events ("X" = complete event, times in µs)
+
+    def summary(self):
+        """{name: {'count', 'wall_s', 'cpu_s', 'rss_peak_mb'}} over all recorded spans."""
+        stages = {}
+        for s in self.spans:
+            stage = stages.setdefault(s["name"], {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "rss_peak_mb": None})
+            stage["count"] += 1
+            stage["wall_s"] += s["wall_s"]
+            stage["cpu_s"] += s["cpu_s"]
+            if s["rss_peak_mb"] is not None:
+                stage["rss_peak_mb"] = max(stage["rss_peak_mb"] or 0.0, s["rss_peak_mb"])
+        return stages
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"spans": self.spans, "summary": self.summary()}, f, indent=2, default=str)
+        return path
+
+    def export_chrome_trace(self, path):
+        events = []
+        processes = {}
+        for s in self.spans:
+            processes.setdefault(s["pid"], s["process"])
+            args = dict(s["attrs"], cpu_s=round(s["cpu_s"], 6), rss_peak_mb=s["rss_peak_mb"])
+            events.append({
+                "name": s["name"], "cat": "athena", "ph": "X",
+                "ts": s["start"] * 1e6, "dur": s["wall_s"] * 1e6,
+                "pid": s["pid"], "tid": s["tid"], "args": args,
+            })
+        for pid, process in processes.items():
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": process}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return path
+
+    def format_summary(self):
+        lines = [f"{'stage':<20}{'count':>7}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}"]
+        for name, stage in sorted(self.summary().items(), key=lambda item: -item[1]["wall_s"]):
+            peak = "" if stage["rss_peak_mb"] is None else f"{stage['rss_peak_mb']:.0f}"
+            lines.append(f"{name:<20}{stage['count']:>7}{stage['wall_s']:>10.2f}{stage['cpu_s']:>10.2f}{peak:>10}")
+        return "\n".join(lines)
+
+    def export(self):
+        """Write '<prefix>.json' and '<prefix>.trace.json' in PROFILE_DIR. Returns the paths."""
+        if not self.enabled or not self.output_prefix or not self.spans:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, self.output_prefix)
+        paths = self.export_json(f"{base}.json"), self.export_chrome_trace(f"{base}.trace.json")
+        logger.info(f"Profile written to {paths[0]} and {paths[1]}:\n{self.format_summary()}")
+        return paths
+
+
+profiler = Profiler()                         # One recorder per process
+span = profiler.span
+traced = profiler.traced
+
+
+def run_profiled(fn, *args):
+    """Worker-side job wrapper: returns (fn(*args), spans recorded by this job)."""
+    profiler.drain()                          # Drop spans inherited from the parent at fork
+    profiler.enabled = True
+    return fn(*args), profiler.drain()
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module times the pipeline stages when athena.py runs with '--profile'.
+#
+# - Stages: connection, legend, data_load, correlation, shap, cv_fold,
+#   final_fit, artifact_write, output_write. Spans carry zone/algo attributes.
+#
+# - Output: PROFILE_DIR/profile_<title>_<timestamp>.json (spans and per-stage
+#   totals) and .trace.json (open in chrome://tracing or ui.perfetto.dev).
+#   Worker and artifact-writer spans are shipped back and appear as their own
+#   processes in the trace.
+#
+# - cpu_s is process CPU time, so concurrent threads in the same process are
+#   included; rss_peak_mb is the process high-water mark at the end of the span.
+# ================================================================================
@@ -0,0 +1,244 @@
+# =============================================================
+#  athena.py Pipeline - resource monitor module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: resource_monitor.py ===
+
+import logging                                # Built-in logging module for log management
+import threading                              # Background sampler thread and cancel flag
+
+from config_pipeline import (
+    MAX_RAM_PERCENTAGE,
+    MAX_CPU_PERCENTAGE,
+    RESOURCE_MONITORING_INTERVAL,
+    HIGH_RESOURCE_THRESHOLD_DURATION,
+    CRITICAL_RESOURCE_THRESHOLD_DURATION,
+)
+from notifier import send_alert
+from backends import load_backend
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+class FitCancelled(Exception):
+    """Raised when the resource monitor interrupts a running fit."""
+
+
+# BLOC 1 - BACKGROUND SAMPLER
+# Sample CPU/RAM every RESOURCE_MONITORING_INTERVAL seconds and escalate
+
+class ResourceMonitor:
+    """
+    Background CPU/RAM sampler:
+    - Samples psutil on a daemon thread at a fixed interval
+    - Warns after HIGH_RESOURCE_THRESHOLD_DURATION seconds of sustained usage
+    - Requests cancellation after CRITICAL_RESOURCE_THRESHOLD_DURATION more seconds
+    """
+
+    def __init__(self, max_cpu=MAX_CPU_PERCENTAGE, max_ram=MAX_RAM_PERCENTAGE,
+                 interval=RESOURCE_MONITORING_INTERVAL, zone=None, algo=None):
+        self.max_cpu = max_cpu
+        self.max_ram = max_ram
+        self.interval = interval
+        self.zone = zone
+        self.algo = algo
+
+        self.high_resource_counter = 0
+        self.critical_resource_counter = 0
+        self.peak_cpu = 0.0
+        self.peak_ram = 0.0
+
+        self._cancel_event = threading.Event()    # Set when the critical threshold is reached
+        self._stop_event = threading.Event()      # Set to terminate the sampler thread
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def start(self):
+        """Start the sampler thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        load_backend("psutil").cpu_percent()      # Prime the counter: first call always returns 0.0
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="athena-resource-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the sampler thread and wait for it to exit."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def set_context(self, zone=None, algo=None):
+        """Attach the monitor to a new zone/algorithm and reset escalation state."""
+        with self._lock:
+            self.zone = zone
+            self.algo = algo
+            self.high_resource_counter = 0
+            self.critical_resource_counter = 0
+            self._cancel_event.clear()
+
+    def check(self):
+        """Raise FitCancelled if cancellation has been requested."""
+        if self._cancel_event.is_set():
+            raise FitCancelled(f"Resource limits exceeded for '{self.algo}'")
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Resource sampling error: {e}")
+
+    def sample(self, cpu_percent=None, ram_percent=None):
+        """Take one sample and apply the high/critical escalation logic."""
+        psutil = load_backend("psutil")
+        if cpu_percent is None:
+            cpu_percent = psutil.cpu_percent()
+        if ram_percent is None:
+            ram_percent = psutil.virtual_memory().percent
+
+        with self._lock:
+            zone, algo = self.zone, self.algo
+            self.peak_cpu = max(self.peak_cpu, cpu_percent)
+            self.peak_ram = max(self.peak_ram, ram_percent)
+            logger.info(f"{zone} - {algo}: CPU Usage = {cpu_percent}%, RAM Usage = {ram_percent}%")
+
+            if cpu_percent <= self.max_cpu and ram_percent <= self.max_ram:
+                self.high_resource_counter = 0
+                self.critical_resource_counter = 0
+                return
+
+            self.high_resource_counter += self.interval
+            if self.high_resource_counter < HIGH_RESOURCE_THRESHOLD_DURATION:
+                return
+
+            self.critical_resource_counter += self.interval
+            critical = (self.critical_resource_counter >= CRITICAL_RESOURCE_THRESHOLD_DURATION
+                        and not self._cancel_event.is_set())
+            if critical:
+                self._cancel_event.set()
+
+        send_alert(
+            "warning",
+            f"High resource usage (CPU > {self.max_cpu}%, RAM > {self.max_ram}%) for {HIGH_RESOURCE_THRESHOLD_DURATION} seconds. Potential saturation risk.",
+            zone=zone,
+            algo=algo,
+            notify=True
+        )
+        if critical:
+            send_alert(
+                "error",
+                f"Critical resource usage exceeded for {CRITICAL_RESOURCE_THRESHOLD_DURATION + HIGH_RESOURCE_THRESHOLD_DURATION} seconds. Stopping current algorithm '{algo}'.",
+                zone=zone,
+                algo=algo,
+                notify=True
+            )
+
+
+# BLOC 2 - COOPERATIVE CANCELLATION
+# Hook the monitor into each estimator family's own iteration callback
+
+def _xgboost_cancel_callback(monitor):
+    import xgboost as xgb
+
+    class _CancelCallback(xgb.callback.TrainingCallback):
+        def after_iteration(self, model, epoch, evals_log):
+            return monitor.cancelled              # True stops boosting
+
+    return _CancelCallback()
+
+
+def _lightgbm_cancel_callback(monitor):
+    def _callback(env):
+        monitor.check()                           # Exception propagates out of LGBMRegressor.fit
+    _callback.order = 0
+    return _callback
+
+
+class _CatBoostCancelCallback:
+    def __init__(self, monitor):
+        self.monitor = monitor
+
+    def after_iteration(self, info):
+        return not self.monitor.cancelled         # False stops boosting
+
+
+def fit_with_cancel(model, X, y, monitor=None, **fit_params):
+    """
+    Fit 'model' while allowing the resource monitor to interrupt it.
+    Iterative estimators stop at the next boosting round; the others are
+    checked before and after the fit. Raises FitCancelled on interruption.
+    Extra keyword arguments are passed to model.fit().
+    """
+    if monitor is None:
+        return model.fit(X, y, **fit_params)
+
+    monitor.check()
+    family = type(model).__module__.split(".")[0]
+    name = type(model).__name__
+
+    if name == "GradientBoostingRegressor":
+        model.fit(X, y, monitor=lambda i, est, env: monitor.cancelled, **fit_params)
+    elif family == "lightgbm":
+        model.fit(X, y, callbacks=[_lightgbm_cancel_callback(monitor)], **fit_params)
+    elif family == "xgboost":
+        model.set_params(callbacks=[_xgboost_cancel_callback(monitor)])
+        try:
+            model.fit(X, y, **fit_params)
+        finally:
+            model.set_params(callbacks=None)
+    elif family == "catboost":
+        model.fit(X, y, callbacks=[_CatBoostCancelCallback(monitor)], **fit_params)
+    else:
+        model.fit(X, y, **fit_params)
+
+    monitor.check()
+    return model
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module replaces the per-fold time.sleep() polling of the training loop.
+#
+# - Start one ResourceMonitor per run and call set_context(zone, algo) before
+#   each algorithm; counters and the cancel flag are reset on every call.
+#
+# - Use fit_with_cancel() instead of model.fit() inside the CV and final fit.
+#   On FitCancelled, treat the algorithm as 'exceeded_resources'.
+#
+# - Escalation timings come from config_pipeline.py:
+#   HIGH_RESOURCE_THRESHOLD_DURATION, CRITICAL_RESOURCE_THRESHOLD_DURATION,
+#   RESOURCE_MONITORING_INTERVAL
+#
+# - RandomForest, SVR, KNN and linear models cannot be interrupted mid-fit;
+#   they are cancelled at the next fold boundary instead.
+# ================================================================================
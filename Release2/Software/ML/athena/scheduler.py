@@ -0,0 +1,240 @@
+# =============================================================
+#  athena.py Pipeline - scheduler module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: scheduler.py ===
+
+import logging                                # Built-in logging module for log management
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+from config_pipeline import (
+    MAX_RAM_PERCENTAGE,
+    MAX_CPU_PERCENTAGE,
+    WORKER_BASE_RAM_MB,
+    SCHEDULER_POLL_INTERVAL,
+    MODEL_CACHE_ENABLED,
+)
+from notifier import send_alert
+from backends import load_backend
+from estimators import threads_per_fit, limit_native_threads
+from profiler import profiler, run_profiled
+from cost_model import get_cost_model
+from shared_data import share_frames
+from training import evaluate_algorithm, train_zone
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+_worker_thread_limit = None                   # threadpoolctl limiter set in each worker process
+
+
+# BLOC 1 - MEMORY ESTIMATES
+# Predict the peak RAM of one job from the size of its training data
+
+def data_size_mb(*arrays):
+    """Total in-memory size (MB) of the given DataFrames/Series/arrays."""
+    total = 0
+    for a in arrays:
+        if a is None:
+            continue
+        if hasattr(a, "memory_usage"):
+            usage = a.memory_usage(deep=True)
+            total += int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        else:
+            total += getattr(a, "nbytes", 0)
+    return total / 1024**2
+
+
+def estimate_job_ram_mb(algo, dataset_mb):
+    """Estimated peak RAM (MB) of one worker evaluating 'algo' (multiplier calibrated by cost_model.py)."""
+    multiplier = get_cost_model().memory_multiplier(algo)
+    return WORKER_BASE_RAM_MB + multiplier * dataset_mb
+
+
+def resolve_workers(workers):
+    """Translate the CLI/config worker count (0 = one per core) into a positive integer."""
+    if not workers or workers < 1:
+        return os.cpu_count() or 1
+    return int(workers)
+
+
+# BLOC 2 - ADMISSION CONTROL
+# Admit jobs while estimated RAM stays within MAX_RAM_PERCENTAGE and CPU is below MAX_CPU_PERCENTAGE
+
+class RamBudgetScheduler:
+    """
+    Admission control for worker jobs:
+    - RAM budget = MAX_RAM_PERCENTAGE of total memory minus what was in use at start
+    - A job is admitted if its estimate fits in the remaining budget and live
+      CPU/RAM usage are below the configured limits
+    - One job is always allowed to run, so an oversized job runs alone instead of never
+    """
+
+    def __init__(self, max_workers, max_ram=MAX_RAM_PERCENTAGE, max_cpu=MAX_CPU_PERCENTAGE):
+        vm = load_backend("psutil").virtual_memory()
+        self.max_workers = max_workers
+        self.max_ram = max_ram
+        self.max_cpu = max_cpu
+        self.budget_mb = max(vm.total * max_ram / 100 - (vm.total - vm.available), 0) / 1024**2
+        self.reserved_mb = 0.0
+        self.running = 0
+
+    def can_admit(self, estimate_mb):
+        if self.running == 0:
+            return True
+        if self.running >= self.max_workers:
+            return False
+        if self.reserved_mb + estimate_mb > self.budget_mb:
+            return False
+        psutil = load_backend("psutil")
+        if psutil.virtual_memory().percent > self.max_ram:
+            return False
+        return psutil.cpu_percent() <= self.max_cpu
+
+    def admit(self, estimate_mb):
+        self.reserved_mb += estimate_mb
+        self.running += 1
+
+    def release(self, estimate_mb):
+        self.reserved_mb -= estimate_mb
+        self.running -= 1
+
+
+def _init_worker(threads):
+    """Worker process initializer: cap BLAS/OpenMP pools at this worker's thread share."""
+    global _worker_thread_limit
+    _worker_thread_limit = limit_native_threads(threads)
+
+
+def run_jobs(jobs, max_workers, max_ram=MAX_RAM_PERCENTAGE, max_cpu=MAX_CPU_PERCENTAGE):
+    """
+    Run jobs in a process pool under RAM-budget admission control.
+    'jobs' is an ordered list of (key, estimate_mb, fn, args) tuples.
+    Each worker gets max_workers-th of THREAD_BUDGET for its native thread pools.
+    Returns {key: result}; failed jobs map to None.
+    """
+    scheduler = RamBudgetScheduler(max_workers, max_ram=max_ram, max_cpu=max_cpu)
+    logger.info(f"Scheduler: {max_workers} workers, RAM budget {scheduler.budget_mb:.0f} MB for {len(jobs)} jobs.")
+    print(f"Scheduler: {max_workers} workers, RAM budget {scheduler.budget_mb:.0f} MB for {len(jobs)} jobs.")
+
+    pending = list(jobs)
+    in_flight = {}
+    results = {}
+    load_backend("psutil").cpu_percent()      # Prime the counter: first call always returns 0.0
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(threads_per_fit(max_workers),)) as pool:
+        while pending or in_flight:
+            while pending and scheduler.can_admit(pending[0][1]):
+                key, estimate_mb, fn, fn_args = pending.pop(0)
+                scheduler.admit(estimate_mb)
+                if profiler.enabled:           # The job's spans come back with its result
+                    in_flight[pool.submit(run_profiled, fn, *fn_args)] = (key, estimate_mb)
+                else:
+                    in_flight[pool.submit(fn, *fn_args)] = (key, estimate_mb)
+                logger.info(f"Scheduler: started '{key}' (estimated {estimate_mb:.0f} MB).")
+
+            done, _ = wait(in_flight, timeout=SCHEDULER_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, estimate_mb = in_flight.pop(future)
+                scheduler.release(estimate_mb)
+                try:
+                    results[key] = future.result()
+                    if profiler.enabled:
+                        results[key], spans = results[key]
+                        profiler.merge(spans)
+                except Exception as e:
+                    send_alert("error", f"Worker job '{key}' failed: {e}")
+                    results[key] = None
+
+    return results
+
+
+# BLOC 3 - PARALLEL ALGORITHM EVALUATION
+# One job per algorithm: temporal CV + final fit (see training.evaluate_algorithm)
+
+def run_algorithms_parallel(algos, X, y, X_test, y_test, zone, output_dir, workers,
+                            max_ram=MAX_RAM_PERCENTAGE, max_cpu=MAX_CPU_PERCENTAGE):
+    """Evaluate several algorithms concurrently; returns {algo: metrics} in input order."""
+    dataset_mb = data_size_mb(X, y, X_test, y_test)
+    max_workers = min(resolve_workers(workers), len(algos)) or 1
+
+    threads = threads_per_fit(max_workers)
+    logger.info(f"{zone}: {max_workers} concurrent fits, {threads} threads each.")
+
+    # CPU admission is handled here; worker monitors only guard RAM
+    with share_frames(X, y, X_test, y_test) as shared:
+        jobs = [
+            (algo, estimate_job_ram_mb(algo, dataset_mb), evaluate_algorithm,
+             (algo, *shared, zone, output_dir, 100, max_ram, MODEL_CACHE_ENABLED, threads))
+            for algo in algos
+        ]
+        results = run_jobs(jobs, max_workers, max_ram=max_ram, max_cpu=max_cpu)
+    return {algo: results[algo] for algo in algos if results.get(algo) is not None}
+
+
+# BLOC 4 - PARALLEL ZONE TRAINING
+# One job per zone: every algorithm runs sequentially inside the zone's worker
+
+def run_zones_parallel(zones, df, algos, output_dir, workers,
+                       max_ram=MAX_RAM_PERCENTAGE, max_cpu=MAX_CPU_PERCENTAGE, train_rows=None):
+    """
+    Train and select models for several zones concurrently.
+    'train_rows' ({algo: rows}, see train_zone) limits algorithms to their most recent rows.
+    Returns {zone: train_zone() output} ordered as 'zones'; failed zones are omitted.
+    """
+    dataset_mb = data_size_mb(df)
+    max_workers = min(resolve_workers(workers), len(zones)) or 1
+    zone_estimate_mb = max((estimate_job_ram_mb(algo, dataset_mb) for algo in algos), default=WORKER_BASE_RAM_MB)
+
+    threads = threads_per_fit(max_workers)
+    if max_workers == 1:
+        results = {zone: train_zone(zone, df, algos, output_dir, max_cpu, max_ram, threads, train_rows) for zone in zones}
+    else:
+        # CPU admission is handled here; worker monitors only guard RAM
+        with share_frames(df) as (shared_df,):
+            jobs = [
+                (zone, zone_estimate_mb, train_zone, (zone, shared_df, algos, output_dir, 100, max_ram, threads, train_rows))
+                for zone in zones
+            ]
+            results = run_jobs(jobs, max_workers, max_ram=max_ram, max_cpu=max_cpu)
+
+    return {zone: results[zone] for zone in zones if results.get(zone) is not None}
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module runs independent training jobs in worker processes.
+#
+# - Enabled with '--workers N' (N > 1, or 0 for one worker per CPU core).
+#   PARALLEL_WORKERS_DEFAULT = 1 keeps the sequential, interactive loop.
+#
+# - Per-job RAM estimates = WORKER_BASE_RAM_MB + multiplier x data size,
+#   with multipliers in ALGORITHM_MEMORY_MULTIPLIER (config_pipeline.py) until
+#   cost_model.py has observed fits of the algorithm, then calibrated from them.
+#
+# - Zone jobs ('--zone_workers') run their algorithms sequentially; do not
+#   combine them with '--workers' on small machines.
+#
+# - The training data is published once per job batch (shared_data.py);
+#   workers attach to it instead of receiving a pickled copy per job.
+#
+# - Results are always returned in the submitted job order, so a parallel run
+#   selects the same models as a sequential one.
+# ================================================================================
@@ -0,0 +1,300 @@
+# =============================================================
+#  athena.py Pipeline - SHAP engine module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: shap_engine.py ===
+
+import logging                                # Built-in logging module for log management
+import os
+import time
+
+import joblib
+import numpy as np
+
+from backends import load_backend
+from profiler import traced
+from config_pipeline import (
+    SHAP_MAX_ROWS,
+    SHAP_BACKGROUND_SIZE,
+    SHAP_TIME_BUDGET,
+    SHAP_BATCH_ROWS,
+    SHAP_PROBE_ROWS,
+    SHAP_PERMUTATION_MAX_EVALS,
+    SHAP_CACHE_DIR,
+    SHAP_CACHE_MAX_ENTRIES,
+)
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+TREE_ALGORITHMS = {"random_forest", "gradient_boosting", "xgboost", "lightgbm", "catboost"}
+LINEAR_ALGORITHMS = {"linear_regression", "ridge"}
+
+
+# BLOC 1 - ROW SELECTION
+# Explain an evenly spaced subsample (keeps the whole time range), use a small background set
+
+def subsample_rows(X, max_rows):
+    """Return at most 'max_rows' evenly spaced rows of X (all rows if already small)."""
+    if max_rows is None or len(X) <= max_rows:
+        return X
+    positions = np.unique(np.linspace(0, len(X) - 1, max_rows).astype(int))
+    return X.iloc[positions]
+
+
+def explainer_kind(model, algo):
+    """'tree', 'linear' or 'model-agnostic' for the given estimator."""
+    if algo in TREE_ALGORITHMS or hasattr(model, "estimators_") or hasattr(model, "get_booster") or hasattr(model, "booster_"):
+        return "tree"
+    if algo in LINEAR_ALGORITHMS or hasattr(model, "coef_"):
+        return "linear"
+    return "model-agnostic"
+
+
+def build_explainer(model, X, algo, background_size=SHAP_BACKGROUND_SIZE):
+    """
+    Pick the cheapest exact-enough explainer:
+    - tree models: TreeExplainer with the tree-path algorithm (no background data needed)
+    - linear models: LinearExplainer on a sampled background
+    - others (SVR, KNN, ...): permutation explainer on model.predict with a sampled background
+    """
+    shap = load_backend("shap")
+
+    kind = explainer_kind(model, algo)
+    if kind == "tree":
+        return shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+
+    background = shap.utils.sample(X, min(background_size, len(X)), random_state=0)
+    if kind == "linear":
+        return shap.LinearExplainer(model, background)
+    return shap.Explainer(model.predict, background, algorithm="permutation")
+
+
+def explain_options(model, X, algo, max_evals=SHAP_PERMUTATION_MAX_EVALS):
+    """Keyword arguments of the explainer call: the permutation explainer gets a capped 'max_evals'."""
+    if max_evals is None or explainer_kind(model, algo) != "model-agnostic":
+        return {}
+    return {"max_evals": max(int(max_evals), 2 * X.shape[1] + 1), "silent": True}   # shap needs >= 2 x features + 1
+
+
+_permutation_compiled = False
+
+
+def warm_up_permutation():
+    """
+    Compile the numba kernels of the permutation explainer once per process (about 10 s,
+    whatever the model) on a two-feature toy function, so SHAP_TIME_BUDGET measures
+    the model and not shap's first-call compilation.
+    """
+    global _permutation_compiled
+    if _permutation_compiled:
+        return
+    shap = load_backend("shap")
+
+    start = time.perf_counter()
+    toy = np.arange(8, dtype=np.float64).reshape(4, 2)
+    shap.Explainer(lambda rows: np.asarray(rows).sum(axis=1), toy, algorithm="permutation")(toy[:1], max_evals=5, silent=True)
+    _permutation_compiled = True
+    logger.info(f"SHAP permutation explainer compiled in {time.perf_counter() - start:.2f} seconds (once per process).")
+
+
+def fit_probe_options(model, X, options, background_size, remaining):
+    """
+    Permutation explainer: one row costs about max_evals predictions of the background.
+    Time one background prediction and lower 'max_evals' so the probe row fits in half
+    of 'remaining' seconds (the single timing is a rough estimate). Returns the options,
+    or None if not even the minimum fits.
+    """
+    if "max_evals" not in options:
+        return options
+    shap = load_backend("shap")
+
+    background = shap.utils.sample(X, min(background_size, len(X)), random_state=0)
+    start = time.perf_counter()
+    model.predict(background)
+    per_eval = time.perf_counter() - start
+    remaining -= per_eval
+    if per_eval <= 0:
+        return options
+    max_evals = min(options["max_evals"], int(remaining / 2 / per_eval))
+    if max_evals < 2 * X.shape[1] + 1:
+        return None
+    return dict(options, max_evals=max_evals)
+
+
+# BLOC 2 - SHAP CACHE
+# Values are stored per (model artifact, explained rows, budget) as compressed .npz
+
+def shap_cache_key(model, X_explain, background_size, time_budget=None, options=None):
+    """
+    A budget-truncated result is cached too (its row count is in the file): the same
+    model and budget would truncate again, so the next run reuses it instead of paying
+    the budget once more. Another budget is another key.
+    """
+    return joblib.hash((_model_fingerprint(model), joblib.hash(X_explain), background_size, time_budget,
+                        sorted((options or {}).items())))
+
+
+def _model_fingerprint(model):
+    """
+    joblib.hash of the model, with sklearn neighbor trees hashed by their arrays only:
+    their query counters change at every predict(), which would make every lookup a miss.
+    """
+    state = getattr(model, "__dict__", None)
+    if not state:
+        return joblib.hash(model)
+    return joblib.hash((type(model).__name__, {
+        name: value.get_arrays() if hasattr(value, "get_arrays") and hasattr(value, "get_n_calls") else value
+        for name, value in state.items()
+    }))
+
+
+def _cache_path(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.npz")
+
+
+def _load_cached(key, cache_dir):
+    shap = load_backend("shap")
+
+    path = _cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            explanation = shap.Explanation(
+                values=data["values"],
+                base_values=data["base_values"],
+                data=data["data"],
+                feature_names=list(data["feature_names"]),
+            )
+    except Exception as e:
+        logger.warning(f"Unreadable SHAP cache entry {key}: {e}")
+        return None
+    os.utime(path)                            # mtime is the LRU clock
+    return explanation
+
+
+def _store_cached(key, explanation, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez_compressed(
+        _cache_path(key, cache_dir),
+        values=explanation.values,
+        base_values=np.asarray(explanation.base_values, dtype=np.float64),
+        data=np.asarray(explanation.data, dtype=np.float64),
+        feature_names=np.asarray(explanation.feature_names, dtype=str),
+    )
+    entries = sorted((os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".npz")),
+                     key=os.path.getmtime)
+    for path in entries[:max(len(entries) - SHAP_CACHE_MAX_ENTRIES, 0)]:
+        os.remove(path)
+
+
+# BLOC 3 - BUDGETED COMPUTATION
+# Explain the subsample in batches and stop once the time budget is spent
+
+@traced("shap", "algo")
+def compute_shap_values(model, X, algo, max_rows=SHAP_MAX_ROWS, time_budget=SHAP_TIME_BUDGET,
+                        background_size=SHAP_BACKGROUND_SIZE, cache_dir=SHAP_CACHE_DIR, use_cache=True):
+    """
+    Return a shap.Explanation for (a subsample of) X.
+    explanation.data holds the rows actually explained; it may be shorter than
+    'max_rows' if the time budget ran out, and empty if building the explainer
+    alone used the whole budget.
+    """
+    shap = load_backend("shap")
+
+    X_explain = subsample_rows(X, max_rows)
+    options = explain_options(model, X, algo)
+    key = None
+    if use_cache:
+        key = shap_cache_key(model, X_explain, background_size, time_budget, options)
+        cached = _load_cached(key, cache_dir)
+        if cached is not None:
+            logger.info(f"{algo}: SHAP cache hit ({len(cached.values)}/{len(X_explain)} rows).")
+            return cached
+
+    if "max_evals" in options:
+        warm_up_permutation()
+    start = time.perf_counter()               # The budget covers the explainer construction too
+    explainer = build_explainer(model, X, algo, background_size)
+    explain_start = time.perf_counter()
+    batches = []
+    done = 0
+    batch_rows = min(SHAP_PROBE_ROWS, SHAP_BATCH_ROWS)   # Small first batch measures the per-row cost
+    if time_budget is not None:
+        options = fit_probe_options(model, X, options, background_size, time_budget - (explain_start - start))
+        if options is None or time.perf_counter() - start >= time_budget:
+            batch_rows = 0
+        explain_start = time.perf_counter()
+    while done < len(X_explain) and batch_rows >= 1:
+        batches.append(explainer(X_explain.iloc[done:done + batch_rows], **options))
+        done += len(batches[-1].values)
+        if time_budget is None:
+            batch_rows = SHAP_BATCH_ROWS
+            continue
+        # Size the next batch so it fits in the remaining budget
+        now = time.perf_counter()
+        per_row = (now - explain_start) / done
+        remaining = time_budget - (now - start)
+        batch_rows = SHAP_BATCH_ROWS if per_row <= 0 else min(SHAP_BATCH_ROWS, int(remaining / per_row))
+    if done < len(X_explain):
+        logger.warning(f"{algo}: SHAP time budget ({time_budget}s) reached after "
+                       f"{done}/{len(X_explain)} rows.")
+
+    n_features = X.shape[1]
+    values = np.vstack([b.values for b in batches]) if batches else np.empty((0, n_features))
+    base_values = np.concatenate([np.broadcast_to(np.asarray(b.base_values, dtype=np.float64).reshape(-1), (len(b.values),))
+                                  for b in batches] + [np.empty(0)])
+    explanation = shap.Explanation(
+        values=values,
+        base_values=base_values,
+        data=X_explain.iloc[:len(values)].to_numpy(dtype=np.float64),
+        feature_names=[str(c) for c in X.columns],
+    )
+    logger.info(f"{algo}: SHAP values for {len(values)} rows in {time.perf_counter() - start:.2f} seconds "
+                f"({explainer_kind(model, algo)} explainer).")
+
+    if key is not None:
+        _store_cached(key, explanation, cache_dir)
+    return explanation
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module replaces shap.Explainer(model, X)(X) over the full training set.
+#
+# - SHAP_MAX_ROWS bounds the rows explained (evenly spaced over time),
+#   SHAP_BACKGROUND_SIZE the background sample of the non-tree explainers,
+#   SHAP_TIME_BUDGET (seconds) the wall time; set either to None to disable.
+#
+# - SHAP_TIME_BUDGET includes building the explainer. The first batch is
+#   SHAP_PROBE_ROWS rows (default one). The permutation explainer (SVR,
+#   KNN, ...) is capped at SHAP_PERMUTATION_MAX_EVALS evaluations per row, and
+#   lowered further when one timed background prediction shows that the probe
+#   would not fit in the remaining budget (nothing is explained if even the
+#   minimum of 2 x features + 1 does not fit). shap compiles the permutation
+#   explainer once per process (about 10 s) before the first budget starts.
+#
+# - Results are cached in SHAP_CACHE_DIR keyed by the pickled model, the
+#   explained rows, the background size, the time budget and the explainer
+#   options, so re-runs on the same model artifact skip the computation.
+#   Budget-truncated results are cached as well. Delete the directory to clear it.
+#
+# - Consumers must use explanation.data (not the original X) to align rows
+#   with explanation.values.
+# ================================================================================
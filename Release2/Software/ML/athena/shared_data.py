@@ -0,0 +1,239 @@
+# =============================================================
+#  athena.py Pipeline - shared training data module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: shared_data.py ===
+
+import logging                                # Built-in logging module for log management
+import os
+import uuid
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backends import load_backend
+from config_pipeline import SHARED_DATA_ENABLED, SHARED_DATA_BACKEND, SHARED_DATA_DIR, SHARED_DATA_MIN_MB
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+ALIGNMENT = 64                                # Column buffers start on cache-line boundaries
+SHAREABLE_KINDS = "biufmM"                    # bool, integers, floats, timedelta/datetime (numpy dtypes only)
+SEGMENT_PREFIX = "athena_"
+
+_attached = {}                                # Worker side: location -> open segment (keeps the views valid)
+
+
+# BLOC 1 - HANDLES
+# What a worker receives instead of a pickled DataFrame: segment location + column layout
+
+def _shareable(values):
+    return isinstance(values, np.ndarray) and values.dtype.kind in SHAREABLE_KINDS
+
+
+class SharedFrame:
+    """
+    Picklable handle of a DataFrame or Series published by share_frames().
+    Numeric/datetime columns (and the index, if numeric/datetime) live in the shared
+    segment; other columns (categoricals, text) travel inside the handle.
+    attach() rebuilds the object in the worker over the segment without copying.
+    """
+
+    def __init__(self, backend, location, is_series, name, columns, index_layout, column_layout):
+        self.backend = backend
+        self.location = location
+        self.is_series = is_series
+        self.name = name
+        self.columns = columns
+        self.index_layout = index_layout      # ("shared", name, dtype, offset, length) or ("object", index)
+        self.column_layout = column_layout    # Same per column, ("object", array) for non-shared columns
+
+    def attach(self):
+        buffer = _open_segment(self.backend, self.location)
+        index = _rebuild(buffer, self.index_layout)
+        if self.index_layout[0] == "shared":
+            index = pd.Index(index, name=self.index_layout[1], copy=False)
+        values = [_rebuild(buffer, layout) for layout in self.column_layout]
+
+        if self.is_series:
+            return pd.Series(values[0], index=index, name=self.name, copy=False)
+        frame = pd.DataFrame(dict(enumerate(values)), index=index, copy=False)
+        frame.columns = self.columns
+        return frame
+
+
+def _rebuild(buffer, layout):
+    if layout[0] == "object":
+        return layout[1]
+    _, _, dtype, offset, length = layout
+    values = np.frombuffer(buffer, dtype=np.dtype(dtype), count=length, offset=offset)
+    values.flags.writeable = False            # Shared by every worker: never written in place
+    return values
+
+
+def _open_segment(backend, location):
+    if location not in _attached:
+        if backend == "shm":
+            segment = shared_memory.SharedMemory(name=location)
+            _attached[location] = (segment, segment.buf)
+        else:
+            segment = np.memmap(location, dtype=np.uint8, mode="r")
+            _attached[location] = (segment, segment)
+    return _attached[location][1]
+
+
+def materialize(obj):
+    """DataFrame/Series for a SharedFrame handle; anything else is returned unchanged."""
+    return obj.attach() if isinstance(obj, SharedFrame) else obj
+
+
+# BLOC 2 - PUBLISHING
+# The parent copies the data into one segment, hands out handles and removes the segment afterwards
+
+def _plan(objects):
+    """Column layouts for every object and the segment size they need."""
+    size = 0
+    plans = []
+
+    def place(values, name=None):
+        nonlocal size
+        offset = size
+        size += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+        return ("shared", name, values.dtype.str, offset, len(values)), values
+
+    for obj in objects:
+        frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+        index_values = frame.index.to_numpy() if not isinstance(frame.index, pd.RangeIndex) else None
+        if _shareable(index_values) and frame.index.nlevels == 1:
+            index_layout = place(index_values, frame.index.name)
+        else:
+            index_layout = (("object", frame.index), None)
+        column_layouts = []
+        for i in range(frame.shape[1]):
+            column = frame.iloc[:, i]
+            values = column.to_numpy() if isinstance(column.dtype, np.dtype) else None
+            column_layouts.append(place(values) if _shareable(values) else (("object", column.array), None))
+        plans.append((obj, index_layout, column_layouts))
+    return plans, max(size, 1)
+
+
+def _create_segment(backend, size):
+    if backend == "shm":
+        segment = shared_memory.SharedMemory(create=True, size=size, name=f"{SEGMENT_PREFIX}{uuid.uuid4().hex[:16]}")
+        return segment, segment.buf, segment.name
+    os.makedirs(SHARED_DATA_DIR, exist_ok=True)
+    path = os.path.join(SHARED_DATA_DIR, f"{SEGMENT_PREFIX}{os.getpid()}_{uuid.uuid4().hex[:16]}.bin")
+    segment = np.memmap(path, dtype=np.uint8, mode="w+", shape=(size,))
+    return segment, segment, path
+
+
+def _release_segment(backend, segment, location):
+    try:
+        if backend == "shm":
+            segment.close()
+            segment.unlink()
+        else:
+            segment._mmap.close()
+            os.remove(location)
+    except (OSError, BufferError) as e:
+        logger.warning(f"Could not remove shared data segment {location}: {e}")
+
+
+def remove_stale_segments(directory=SHARED_DATA_DIR):
+    """Delete memmap segments left by runs that died before cleaning up (owner pid no longer alive)."""
+    if not os.path.isdir(directory):
+        return 0
+    psutil = load_backend("psutil")
+    removed = 0
+    for name in os.listdir(directory):
+        if not name.startswith(SEGMENT_PREFIX):
+            continue
+        try:
+            pid = int(name[len(SEGMENT_PREFIX):].split("_")[0])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not psutil.pid_exists(pid):
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+
+@contextmanager
+def share_frames(*objects, backend=SHARED_DATA_BACKEND):
+    """
+    Publish DataFrames/Series once for worker processes; yields one SharedFrame per object.
+    Pass the handles as job arguments and call materialize() in the worker.
+    The segment is removed when the block exits (also on errors). Yields the
+    objects unchanged if sharing is disabled, they are below SHARED_DATA_MIN_MB,
+    or the segment cannot be created (they are then pickled to workers as before).
+    """
+    if not SHARED_DATA_ENABLED:
+        yield list(objects)
+        return
+    plans, size = _plan(objects)
+    if size / 1024**2 < SHARED_DATA_MIN_MB:
+        yield list(objects)
+        return
+
+    if backend != "shm":
+        removed = remove_stale_segments()
+        if removed:
+            logger.info(f"Removed {removed} stale shared data segment(s) from {SHARED_DATA_DIR}.")
+    try:
+        segment, buffer, location = _create_segment(backend, size)
+    except OSError as e:
+        logger.warning(f"Shared data segment of {size / 1024**2:.0f} MB unavailable ({e}). Workers receive copies.")
+        yield list(objects)
+        return
+
+    try:
+        handles = []
+        for obj, (index_layout, index_values), column_layouts in plans:
+            for layout, values in [(index_layout, index_values)] + column_layouts:
+                if values is not None:
+                    _, _, dtype, offset, length = layout
+                    np.frombuffer(buffer, dtype=np.dtype(dtype), count=length, offset=offset)[:] = values
+            frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+            handles.append(SharedFrame(backend, location, isinstance(obj, pd.Series), getattr(obj, "name", None),
+                                       frame.columns, index_layout, [layout for layout, _ in column_layouts]))
+        logger.info(f"Shared {len(objects)} object(s) with workers: {size / 1024**2:.1f} MB in {location}.")
+        yield handles
+    finally:
+        _release_segment(backend, segment, location)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module publishes the training data once for all worker processes.
+#
+# - scheduler.py (algorithm and zone jobs) and batch.py (site/zone jobs) wrap
+#   their jobs in share_frames(); training.py materializes the handles. CV
+#   folds then slice the shared columns without copies, so the data part of
+#   the memory stays flat as the worker count grows.
+#
+# - SHARED_DATA_BACKEND = "shm" uses multiprocessing.shared_memory (/dev/shm).
+#   In containers with a small /dev/shm, use "memmap" (files in SHARED_DATA_DIR).
+#
+# - Cleanup: segments are removed when the job batch ends, also on errors. If
+#   the process is killed, the multiprocessing resource tracker unlinks "shm"
+#   segments; stale "memmap" files are removed by the next run.
+#
+# - Shared columns are read-only in the workers: copy before modifying them.
+# ================================================================================
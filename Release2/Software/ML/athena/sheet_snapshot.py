@@ -0,0 +1,242 @@
+# =============================================================
+#  athena.py Pipeline - sheet snapshot module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: sheet_snapshot.py ===
+
+import json
+import logging                                # Built-in logging module for log management
+import os
+import re
+
+import pandas as pd
+
+from config_pipeline import SNAPSHOT_DIR, SNAPSHOT_MAX_SEGMENTS, SNAPSHOT_TIME_COLUMN
+from typed_loader import read_typed_rows
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+STATE_FILE = "state.json"
+
+
+# BLOC 1 - WORKSHEET ACCESS
+# Only two worksheet calls are used: row_values(1) and get("A<start>:<col><end>")
+
+def _column_letter(n):
+    """1 -> 'A', 27 -> 'AA' (A1 notation)."""
+    letters = ""
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _fetch_rows(ws, first_row, width, last_row=None):
+    """Fetch sheet rows [first_row, last_row] (1-based), padded to 'width' cells."""
+    range_name = f"A{first_row}:{_column_letter(width)}{last_row or ''}"
+    rows = ws.get(range_name) or []
+    return [list(row) + [""] * (width - len(row)) for row in rows]
+
+
+class ListWorksheet:
+    """
+    In-memory stand-in for a gspread worksheet (tests, offline replays).
+    'rows' is a list of lists; rows[0] is the header.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def row_values(self, row):
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def get(self, range_name):
+        match = re.fullmatch(r"A(\d+):[A-Z]+(\d*)", range_name)
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) else len(self.rows)
+        return [list(r) for r in self.rows[first - 1:last]]
+
+
+# BLOC 2 - TYPE COERCION
+# Sheet values arrive as strings: parsed like a CSV file (typed_loader.py), declared dtypes first
+
+def _typed_state(dtypes):
+    return {code: str(dtype) for code, dtype in (dtypes or {}).items()}
+
+
+# BLOC 3 - SNAPSHOT STATE
+# state.json: header, number of synced data rows, segment files, last synced row
+
+def _state_path(snapshot_dir):
+    return os.path.join(snapshot_dir, STATE_FILE)
+
+
+def _load_state(snapshot_dir):
+    try:
+        with open(_state_path(snapshot_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(snapshot_dir, state):
+    tmp_path = _state_path(snapshot_dir) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, _state_path(snapshot_dir))   # Atomic: a crash never leaves a half-written state
+
+
+def _reset(snapshot_dir):
+    if os.path.isdir(snapshot_dir):
+        for name in os.listdir(snapshot_dir):
+            if name.endswith(".arrow") or name == STATE_FILE:
+                os.remove(os.path.join(snapshot_dir, name))
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+
+# BLOC 4 - SEGMENT I/O
+# Each sync appends one Arrow IPC (Feather v2) segment; segments are memory-mapped on read
+
+def _write_segment(snapshot_dir, index, df):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    name = f"segment_{index:05d}.arrow"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, os.path.join(snapshot_dir, name), compression="uncompressed")
+    return name
+
+
+def _read_segments(snapshot_dir, segments, columns=None):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    tables = [feather.read_table(os.path.join(snapshot_dir, name), columns=columns, memory_map=True)
+              for name in segments]
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
+
+def _compact(snapshot_dir, state):
+    """Merge all segments into one once SNAPSHOT_MAX_SEGMENTS is exceeded."""
+    df = _read_segments(snapshot_dir, state["segments"])
+    old_segments = state["segments"]
+    state["segments"] = [_write_segment(snapshot_dir, state["next_segment"], df)]
+    state["next_segment"] += 1
+    _save_state(snapshot_dir, state)
+    for name in old_segments:
+        os.remove(os.path.join(snapshot_dir, name))
+    logger.info(f"Snapshot compacted: {len(old_segments)} segments -> 1 ({len(df)} rows).")
+
+
+# BLOC 5 - INCREMENTAL SYNC
+# Fetch only the rows after the synced-row watermark and append them as a new segment
+
+def sync_snapshot(ws, snapshot_dir=SNAPSHOT_DIR, dtypes=None):
+    """
+    Bring the local snapshot up to date with worksheet 'ws'.
+    'dtypes' ({column: dtype}, from the legend) types the new rows at parse time.
+    A full rebuild happens when the header or the dtypes changed, or the last synced
+    row no longer matches (rows edited or deleted). Returns the number of new rows.
+    """
+    header = [str(h) for h in ws.row_values(1)]
+    state = _load_state(snapshot_dir)
+
+    if state is not None and state.get("header") != header:
+        logger.info("Snapshot header changed. Rebuilding.")
+        state = None
+
+    if state is not None and state.get("dtypes", {}) != _typed_state(dtypes):
+        logger.info("Snapshot column dtypes changed. Rebuilding.")
+        state = None
+
+    if state is not None and state["synced_rows"] > 0:
+        # Sheet row synced_rows + 1 is the last data row we stored (row 1 is the header)
+        check_row = state["synced_rows"] + 1
+        current = _fetch_rows(ws, check_row, len(header), check_row)
+        if not current or current[0] != state["last_row"]:
+            logger.info("Snapshot watermark row changed. Rebuilding.")
+            state = None
+
+    if state is None:
+        _reset(snapshot_dir)
+        state = {"header": header, "synced_rows": 0, "segments": [], "next_segment": 0, "last_row": None,
+                 "dtypes": _typed_state(dtypes)}
+
+    first_row = state["synced_rows"] + 2
+    new_rows = _fetch_rows(ws, first_row, len(header))
+    while new_rows and all(cell == "" for cell in new_rows[-1]):
+        new_rows.pop()                        # Trailing blank rows are not data yet
+
+    if new_rows:
+        df_new = read_typed_rows(new_rows, header, dtypes)
+        state["segments"].append(_write_segment(snapshot_dir, state["next_segment"], df_new))
+        state["next_segment"] += 1
+        state["synced_rows"] += len(new_rows)
+        state["last_row"] = new_rows[-1]
+        _save_state(snapshot_dir, state)
+        logger.info(f"Snapshot: appended {len(new_rows)} rows (total {state['synced_rows']}).")
+
+    if len(state["segments"]) > SNAPSHOT_MAX_SEGMENTS:
+        _compact(snapshot_dir, state)
+
+    return len(new_rows)
+
+
+def load_snapshot(ws, active_codes, snapshot_dir=SNAPSHOT_DIR, dtypes=None, time_column=SNAPSHOT_TIME_COLUMN):
+    """
+    Sync the snapshot, then load only the active columns from the memory-mapped segments,
+    indexed by the parsed 'time_column' like data_loader.load_data().
+    Raises ValueError if the sheet has no such column or a time cell cannot be parsed.
+    """
+    sync_snapshot(ws, snapshot_dir, dtypes)
+    state = _load_state(snapshot_dir)
+    if time_column not in state["header"]:
+        raise ValueError(f"Time column '{time_column}' not found in the input sheet header.")
+    wanted = set(map(str, active_codes)) | {time_column}
+    columns = [col for col in state["header"] if col in wanted]
+    df = _read_segments(snapshot_dir, state["segments"], columns=columns)
+    index = pd.DatetimeIndex(pd.to_datetime(df[time_column]), name=time_column)
+    if index.isna().any():
+        raise ValueError(f"Time column '{time_column}' has empty or unparsable cells.")
+    return df.drop(columns=[time_column]).set_axis(index)
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module keeps a local Arrow copy of the input worksheet so each run only
+# downloads the rows appended since the previous one.
+#
+# - Requires 'pyarrow'. Without it athena falls back to data_loader.load_data().
+#
+# - The snapshot assumes the sheet is append-only. Edits to the last synced
+#   row, deleted rows or header changes are detected and trigger a rebuild;
+#   edits to older rows are NOT detected: delete SNAPSHOT_DIR to force one.
+#
+# - New rows are typed at parse time (typed_loader.py): legend dtypes for the
+#   declared columns, TYPED_NA_VALUES (-999) read as missing. Changing a dtype
+#   in the legend rebuilds the snapshot.
+#
+# - The loaded frame is indexed by SNAPSHOT_TIME_COLUMN (code 100, the reading
+#   time), parsed as datetimes; the column itself is not part of the data.
+#
+# - Any object exposing row_values(1) and get("A<n>:<col>") can be synced,
+#   e.g. ListWorksheet for tests or offline data.
+# ================================================================================
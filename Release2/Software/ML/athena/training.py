@@ -0,0 +1,414 @@
+# =============================================================
+#  athena.py Pipeline - training module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: training.py ===
+
+import logging                                # Built-in logging module for log management
+import os
+import time
+
+import joblib
+import numpy as np
+
+from config_pipeline import (
+    MAX_RAM_PERCENTAGE,
+    MAX_CPU_PERCENTAGE,
+    TEST_SIZE_DEFAULT,
+    INCREMENTAL_CV_DEFAULT,
+    INCREMENTAL_CV_GROWTH,
+    INCREMENTAL_CV_ALGORITHMS,
+    MODEL_CACHE_ENABLED,
+    THRESHOLD_R2_DEFAULT,
+    SHAP_SUMMARY_PLOTS,
+)
+from notifier import send_alert
+from artifact_writer import ArtifactWriter, get_writer
+import model_cache
+from estimators import create_estimator
+from profiler import span, traced
+from cost_model import measured_fit
+from resource_monitor import ResourceMonitor, FitCancelled, fit_with_cancel
+from shared_data import materialize
+from shap_engine import compute_shap_values
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+
+# BLOC 1 - MODEL CONSTRUCTION
+# Map an algorithm name to a fresh, unfitted estimator
+
+def build_model(algo, threads=None):
+    """
+    Return a new estimator for 'algo', or None if the name is not recognized.
+    'threads' is this fit's share of THREAD_BUDGET (see estimators.py).
+    """
+    return create_estimator(algo, threads)
+
+
+# BLOC 2 - INCREMENTAL (WARM-START) FITTING
+# Each expanding window extends the previous one: continue training instead of refitting
+
+def supports_incremental_cv(algo):
+    return algo in INCREMENTAL_CV_ALGORITHMS
+
+
+def incremental_fit(algo, model, X, y, fold_index, increment, monitor=None):
+    """
+    Fit 'model' on the current window, continuing from the previous fold's state:
+    - fold 0 is a normal fit
+    - then 'increment' estimators are added, trained on the extended window
+    """
+    if fold_index == 0:
+        return fit_with_cancel(model, X, y, monitor)
+
+    if algo in ("gradient_boosting", "random_forest"):
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + increment)
+        return fit_with_cancel(model, X, y, monitor)
+    elif algo == "xgboost":
+        booster = model.get_booster()
+        model.set_params(n_estimators=increment)
+        return fit_with_cancel(model, X, y, monitor, xgb_model=booster)
+    elif algo == "lightgbm":
+        booster = model.booster_
+        model.set_params(n_estimators=increment)
+        return fit_with_cancel(model, X, y, monitor, init_model=booster)
+    return fit_with_cancel(model, X, y, monitor)
+
+
+def _base_estimators(model):
+    return model.get_params().get("n_estimators") or 100   # XGBoost 2.x leaves it as None (= 100)
+
+
+# BLOC 3 - TEMPORAL CROSS-VALIDATION
+# Expanding-window validation: train on [0, (i+1)*fold), predict the next fold
+
+def run_temporal_cv(algo, model, X, y, zone, monitor=None, num_cycles=5, incremental=INCREMENTAL_CV_DEFAULT):
+    """
+    Run the rolling-window temporal CV for one algorithm.
+    With 'incremental', supported boosters/forests continue from the previous fold
+    on a clone, so 'model' itself is left unfitted for the final training.
+    Returns the CV metrics dict; raises FitCancelled if the monitor stops it.
+    """
+    from sklearn.base import clone
+    from sklearn.metrics import mean_squared_error
+
+    total_rows = len(X)
+    fold_size = total_rows // (num_cycles + 1)
+    cycle_performances = []
+
+    incremental = incremental and supports_incremental_cv(algo)
+    if incremental:
+        model = clone(model)
+        increment = max(int(_base_estimators(model) * INCREMENTAL_CV_GROWTH), 1)
+
+    start_time_cv = time.time()
+
+    for i in range(num_cycles):
+        train_start = 0
+        train_end = (i + 1) * fold_size
+        predict_start = train_end
+        predict_end = min((i + 2) * fold_size, total_rows)
+
+        if predict_start >= total_rows:
+            break
+
+        X_train_temp = X[train_start:train_end]
+        y_train_temp = y[train_start:train_end]
+        X_predict_temp = X[predict_start:predict_end]
+        y_true_temp = y[predict_start:predict_end]
+
+        try:
+            with span("cv_fold", zone=zone, algo=algo, fold=i + 1, rows=train_end):
+                if incremental and i > 0:
+                    incremental_fit(algo, model, X_train_temp, y_train_temp, i, increment, monitor)
+                else:
+                    with measured_fit(algo, X_train_temp):   # Cold fits calibrate the cost model
+                        fit_with_cancel(model, X_train_temp, y_train_temp, monitor)
+                predictions_temp = model.predict(X_predict_temp)
+
+            rmse = np.sqrt(mean_squared_error(y_true_temp, predictions_temp))
+            cycle_performances.append(rmse)
+            logger.info(f"{zone} - {algo}: Temporal CV Cycle {i+1} RMSE = {rmse:.4f}")
+            print(f"  {algo}: Temporal CV Cycle {i+1} RMSE = {rmse:.4f}")
+
+        except FitCancelled:
+            raise
+
+        except Exception as e:
+            send_alert(
+                "error",
+                f"{zone} - {algo}: Error during temporal CV cycle {i+1}: {e}",
+                zone=zone,
+                algo=algo
+            )
+            print(f"  {algo}: Error during temporal CV cycle {i+1}: {e}")
+            cycle_performances.append(np.nan)
+
+    cv_time = time.time() - start_time_cv
+    mean_rmse = np.nanmean(cycle_performances) if cycle_performances else np.nan
+    logger.info(f"{zone} - {algo}: Temporal CV completed in {cv_time:.2f} seconds. Mean RMSE = {mean_rmse:.4f}")
+    print(f"  {algo}: Temporal CV completed in {cv_time:.2f} seconds. Mean RMSE = {mean_rmse:.4f}")
+
+    return {
+        "temporal_cv_rmse_mean": mean_rmse,
+        "temporal_cv_rmse_cycles": cycle_performances,
+        "temporal_cv_time": cv_time,
+        "temporal_cv_incremental": incremental
+    }
+
+
+# BLOC 4 - FINAL TRAINING AND EVALUATION
+# Fit on the full training set, score on the hold-out set and save the model
+
+@traced("final_fit", "zone", "algo")
+def final_fit_and_evaluate(algo, model, X, y, X_test, y_test, zone, output_dir, monitor=None, writer=None):
+    """
+    Fit 'model' on (X, y), evaluate on the test set and dump it. Raises FitCancelled.
+    The dump is queued to the background ArtifactWriter ('writer', default get_writer()),
+    or written inline if none was started.
+    """
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    logger.info(f"{zone} - {algo}: Starting final training and evaluation.")
+    print(f"  Starting final training and evaluation for '{algo}'.")
+    start_time = time.time()
+    with measured_fit(algo, X):
+        fit_with_cancel(model, X, y, monitor)
+    training_time = time.time() - start_time
+    logger.info(f"{zone} - {algo}: Training completed in {training_time:.2f} seconds.")
+    print(f"    Training completed in {training_time:.2f} seconds.")
+
+    y_pred = model.predict(X_test)
+    r2 = r2_score(y_test, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+
+    logger.info(f"{zone} - {algo}: R² = {r2:.4f}, RMSE = {rmse:.4f}")
+    print(f"    R² on test set: {r2:.4f}")
+    print(f"    RMSE on test set: {rmse:.4f}")
+
+    model_path = os.path.join(output_dir, f"{zone}_{algo}_trained_model.joblib")
+    writer = writer or get_writer()
+    if writer is not None:
+        writer.submit_model(model_path, model)
+        logger.info(f"{zone} - {algo}: Trained model queued for {model_path}")
+    else:
+        joblib.dump(model, model_path)
+        logger.info(f"{zone} - {algo}: Trained model saved to {model_path}")
+    print(f"    Trained model saved to {model_path}")
+
+    return {"r2": r2, "rmse": rmse, "prediction": y_pred[-1], "training_time": training_time, "model_path": model_path}
+
+
+def queue_shap_summary(algo, model, X, zone, r2, output_dir, threshold_r2=THRESHOLD_R2_DEFAULT, writer=None):
+    """
+    Explain a freshly trained model (budgeted, see shap_engine.py) and queue its SHAP
+    summary plot when R² > threshold_r2 - 0.05 (rule of athena.py BLOC 5.B).
+    Returns the plot path, or None if no plot was queued.
+    """
+    if not SHAP_SUMMARY_PLOTS or r2 is None or r2 <= threshold_r2 - 0.05:
+        return None
+    try:
+        shap_values = compute_shap_values(model, X, algo)
+    except Exception as e:
+        logger.error(f"SHAP error for {algo} - zone {zone}: {e}")
+        return None
+    if len(shap_values.values) == 0:
+        return None
+
+    path = os.path.join(output_dir, f"shap_summary_{zone}_{algo}.png")
+    writer = writer or get_writer() or ArtifactWriter(enabled=False)   # Disabled writer renders inline
+    writer.submit_shap_summary(path, shap_values, f"{zone} - SHAP Summary Plot ({algo})")
+    logger.info(f"{zone} - {algo}: SHAP summary plot queued for {path}")
+    return path
+
+
+# BLOC 5 - MODEL CACHE
+# Skip CV and the final fit when the same data/algorithm/config was already trained (see model_cache.py)
+
+def load_cached_result(algo, model, X, y, X_test, y_test, zone, output_dir):
+    """
+    Return (cache_key, metrics). On a hit the cached model is copied to the usual
+    model path and its metrics are returned; on a miss metrics is None.
+    """
+    cache_key = model_cache.compute_cache_key(algo, model, X, y, X_test, y_test)
+    metrics = model_cache.lookup(cache_key)
+    if metrics is None:
+        return cache_key, None
+
+    model_path = os.path.join(output_dir, f"{zone}_{algo}_trained_model.joblib")
+    try:
+        model_cache.restore_model(cache_key, model_path)
+    except FileNotFoundError:                 # Evicted by another worker process since the lookup
+        return cache_key, None
+    metrics["model_path"] = model_path
+    metrics["cache_hit"] = True
+    logger.info(f"{zone} - {algo}: Model cache hit ({cache_key[:12]}). Skipping CV and final fit.")
+    print(f"  {algo}: Model cache hit. Reusing stored model and metrics.")
+    return cache_key, metrics
+
+
+def store_cached_result(cache_key, model, metrics):
+    """Store a fitted model and its metrics under 'cache_key' (no-op without a key)."""
+    if cache_key is not None and not metrics.get("exceeded_resources"):
+        model_cache.store(cache_key, model, metrics)
+
+
+# BLOC 6 - NON-INTERACTIVE ALGORITHM EVALUATION
+# Single entry point used by worker processes (see scheduler.py)
+
+def evaluate_algorithm(algo, X, y, X_test, y_test, zone, output_dir,
+                       max_cpu=MAX_CPU_PERCENTAGE, max_ram=MAX_RAM_PERCENTAGE, use_cache=MODEL_CACHE_ENABLED,
+                       threads=None):
+    """
+    Run temporal CV and the final fit for one algorithm. The data may be
+    SharedFrame handles (see shared_data.py) when called in a worker.
+    Returns the metrics dict stored in results[zone][algo], or None if skipped.
+    """
+    X, y, X_test, y_test = (materialize(data) for data in (X, y, X_test, y_test))
+    model = build_model(algo, threads)
+    if model is None:
+        send_alert("warning", f"Unrecognized algorithm '{algo}'. Skipping.", zone=zone)
+        return None
+
+    cache_key = None
+    if use_cache:
+        cache_key, cached_metrics = load_cached_result(algo, model, X, y, X_test, y_test, zone, output_dir)
+        if cached_metrics is not None:
+            return cached_metrics
+
+    metrics = {}
+    with ResourceMonitor(max_cpu=max_cpu, max_ram=max_ram, zone=zone, algo=algo) as monitor:
+        try:
+            metrics.update(run_temporal_cv(algo, model, X, y, zone, monitor))
+            metrics.update(final_fit_and_evaluate(algo, model, X, y, X_test, y_test, zone, output_dir, monitor))
+        except FitCancelled:
+            logger.info(f"{zone}: Skipping algorithm '{algo}' due to resource issues.")
+            print(f"  Skipping algorithm '{algo}' due to resource issues.")
+            metrics["exceeded_resources"] = True
+
+    if not metrics.get("exceeded_resources"):
+        shap_path = queue_shap_summary(algo, model, X, zone, metrics.get("r2"), output_dir)
+        if shap_path is not None:
+            metrics["shap_summary_path"] = shap_path
+
+    store_cached_result(cache_key, model, metrics)
+    return metrics
+
+
+# BLOC 7 - MODEL SELECTION
+# Pick the algorithm with the lowest mean temporal CV RMSE, falling back to the best R²
+
+def select_by_temporal_cv(algo_results):
+    """Return (best_algo, best_rmse) over algorithms with temporal CV metrics."""
+    best_algo = None
+    best_rmse = float('inf')
+
+    for algo, metrics in algo_results.items():
+        if "temporal_cv_rmse_mean" in metrics:
+            rmse = metrics["temporal_cv_rmse_mean"]
+            if rmse < best_rmse:
+                best_rmse = rmse
+                best_algo = algo
+
+    return best_algo, best_rmse
+
+
+def select_by_r2(algo_results):
+    """Return (best_algo, best_r2) over algorithms with a test-set R²."""
+    best_algo = None
+    best_r2 = -float('inf')
+
+    for algo, metrics in algo_results.items():
+        if metrics.get("r2") is not None and metrics["r2"] > best_r2:
+            best_r2 = metrics["r2"]
+            best_algo = algo
+
+    return best_algo, best_r2
+
+
+# BLOC 8 - PER-ZONE TRAINING
+# Everything needed to train and select a model for one zone (target column)
+
+def prepare_zone_data(df, zone, test_size=TEST_SIZE_DEFAULT):
+    """
+    Split 'df' into features and target for 'zone'.
+    The most recent 'test_size' fraction of rows is held out (no shuffling).
+    """
+    X_all = df.drop(columns=[zone]).select_dtypes(include='number')
+    y_all = df[zone]
+    split = max(int(len(df) * (1 - test_size)), 1)
+    return X_all.iloc[:split], y_all.iloc[:split], X_all.iloc[split:], y_all.iloc[split:]
+
+
+def train_zone(zone, df, algos, output_dir, max_cpu=MAX_CPU_PERCENTAGE, max_ram=MAX_RAM_PERCENTAGE, threads=None,
+               train_rows=None):
+    """
+    Evaluate 'algos' for one zone and select the final model.
+    'df' may be a SharedFrame handle (see shared_data.py) when called in a worker.
+    'train_rows' ({algo: rows}, from athena.select_smart_models) trains an algorithm on
+    its most recent rows only when that is fewer than the training split; the test set is unchanged.
+    Returns {"results": {algo: metrics}, "selection": {"algo", "prediction", "r2"}}.
+    """
+    X, y, X_test, y_test = prepare_zone_data(materialize(df), zone)
+    zone_results = {}
+
+    for algo in algos:
+        logger.info(f"Attempting algorithm: {algo}")
+        print(f"  [{zone}] Attempting algorithm: {algo}")
+        rows = (train_rows or {}).get(algo)
+        X_algo, y_algo = X, y
+        if rows and rows < len(X):
+            X_algo, y_algo = X.iloc[-rows:], y.iloc[-rows:]
+            logger.info(f"{zone} - {algo}: Training on the last {rows} of {len(X)} rows (cost model budget).")
+        metrics = evaluate_algorithm(algo, X_algo, y_algo, X_test, y_test, zone, output_dir, max_cpu, max_ram,
+                                     threads=threads)
+        if metrics is not None:
+            zone_results[algo] = metrics
+
+    final_algo, best_rmse = select_by_temporal_cv(zone_results)
+    if final_algo is not None and "r2" in zone_results[final_algo]:
+        logger.info(f"{zone}: Selected algorithm '{final_algo}' based on temporal CV (mean RMSE = {best_rmse:.4f}).")
+    else:
+        final_algo, _ = select_by_r2(zone_results)
+        send_alert("warning", f"No algorithm selected via temporal CV. Using best available (R²): {final_algo}", zone=zone)
+
+    selection = {"algo": final_algo, "prediction": None, "r2": None}
+    if final_algo is not None:
+        selection["prediction"] = zone_results[final_algo].get("prediction")
+        selection["r2"] = zone_results[final_algo].get("r2")
+
+    return {"results": zone_results, "selection": selection}
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module holds the training steps shared by the sequential loop in
+# athena.py and the worker processes started by scheduler.py.
+#
+# - Keep it free of module-level side effects (no CLI parsing, no spreadsheet
+#   access): worker processes import it directly.
+#
+# - evaluate_algorithm() never prompts the user; resource overruns skip the
+#   algorithm and are reported with 'exceeded_resources' in the metrics.
+#
+# - Model dumps and SHAP summary plots go to artifact_writer.get_writer(),
+#   including from worker processes; the caller starts the writer before
+#   training and reports its completion counts.
+# ================================================================================
@@ -0,0 +1,134 @@
+# =============================================================
+#  athena.py Pipeline - typed loading module
+# =============================================================
+#  Version      : 1.4
+#  Status       : In Development / Maintenance
+#  License      : Creative Commons Attribution - NonCommercial 4.0
+#                 WITH supplemental clause: commercial use prohibited
+#                 unless prior written authorization is granted by the author.
+#  Author       : Cmod777
+#  Created      : October 2026
+#  Last Update  : October 2026
+#  Python       : 3.10+
+# =============================================================
+#  DISCLAIMER
+#  This script is provided for educational and non-commercial use only.
+#  Commercial reproduction, resale, or integration in proprietary tools
+#  is strictly forbidden without explicit authorization.
+#  Use at your own risk. No warranty is provided.
+# =============================================================
+
+# === CONFIG FILE: typed_loader.py ===
+
+import csv
+import io
+import logging                                # Built-in logging module for log management
+
+import numpy as np
+import pandas as pd
+
+from config_pipeline import TYPED_NA_VALUES
+
+
+logger = logging.getLogger(__name__)          # Logger instance for this module
+
+DTYPE_ALIASES = {
+    "float": "float64",
+    "int": "Int64",
+    "integer": "Int64",
+    "bool": "boolean",
+    "str": "string",
+    "text": "string",
+    "datetime": "datetime64[ns]",
+}
+
+
+# BLOC 1 - LEGEND DTYPES
+# Optional 'dtype' per column code (legenda.yaml entry or legend worksheet column)
+
+def resolve_dtype(name):
+    """
+    pandas dtype for a legend 'dtype' value (any pandas dtype name or an alias of DTYPE_ALIASES).
+    numpy integer and bool dtypes become their nullable versions: cells can always be missing.
+    Raises TypeError for an unknown name.
+    """
+    name = str(name).strip()
+    dtype = pd.api.types.pandas_dtype(DTYPE_ALIASES.get(name.lower(), name))
+    if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+        return pd.api.types.pandas_dtype(f"{'UInt' if dtype.kind == 'u' else 'Int'}{dtype.itemsize * 8}")
+    if isinstance(dtype, np.dtype) and dtype.kind == "b":
+        return pd.BooleanDtype()
+    return dtype
+
+
+def legend_dtypes(entries):
+    """{code: dtype} for the legend entries ({code: fields}) that declare a 'dtype'; invalid ones are skipped."""
+    dtypes = {}
+    for code, fields in entries.items():
+        name = fields.get("dtype") if isinstance(fields, dict) else None
+        if name in (None, ""):
+            continue
+        try:
+            dtypes[str(code)] = resolve_dtype(name)
+        except TypeError:
+            logger.warning(f"Unknown dtype '{name}' for column code {code}. The type is inferred.")
+    return dtypes
+
+
+# BLOC 2 - ONE-PASS TYPED PARSE
+# Column pruning, dtypes and NA detection are all done by the C parser
+
+def read_typed_csv(source, columns, dtypes=None, na_values=TYPED_NA_VALUES, **read_options):
+    """
+    Read only 'columns' ({CSV column label or position: output name}) from 'source'
+    (path or buffer) in one read_csv() pass, in the order of 'columns'.
+    'dtypes' ({output name: dtype}, see legend_dtypes) types the declared columns at
+    parse time, datetime columns included; the others are inferred. Cells equal to one
+    of 'na_values' (text or number, e.g. -999 and -999.0) are read as missing.
+    Other keyword arguments (header, skiprows, names, ...) go to read_csv().
+    """
+    dtypes = dtypes or {}
+    keys = list(columns)
+    dtype = {}
+    parse_dates = []
+    for key in keys:
+        declared = dtypes.get(columns[key])
+        if declared is None:
+            continue
+        if isinstance(declared, np.dtype) and declared.kind == "M":
+            parse_dates.append(key)           # read_csv only builds datetimes through parse_dates
+        else:
+            dtype[key] = declared
+
+    df = pd.read_csv(source, usecols=keys, dtype=dtype or None, na_values=na_values,
+                     parse_dates=parse_dates or None, **read_options)
+    df = df[keys]
+    df.columns = [columns[key] for key in keys]
+    return df
+
+
+def read_typed_rows(rows, header, dtypes=None, na_values=TYPED_NA_VALUES):
+    """DataFrame of text rows (worksheet values) parsed like a CSV file by read_typed_csv()."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    columns = dict(enumerate(header))         # By position: worksheet headers may repeat or be empty
+    return read_typed_csv(buffer, columns, dtypes, na_values, header=None, names=list(range(len(header))))
+
+
+# === INSTRUCTIONS AND SAFE USAGE ===============================================
+# This module reads tabular input with its types decided at parse time. It is
+# shared by pre-ML/extractor.py (db.csv, typed from legenda.yaml) and
+# sheet_snapshot.py (worksheet rows, typed from the legend worksheet).
+#
+# - Declare a type with a 'dtype' field per column code, e.g. "float32",
+#   "Int8", "category", "string", "datetime". Columns without it are inferred.
+#
+# - Integer types are nullable (Int8, Int64, ...), so gaps stay missing. Use a
+#   float type for columns filled with 'linear' or 'mean': those fills are
+#   fractional.
+#
+# - TYPED_NA_VALUES (default -999, the logger error code) are read as missing
+#   in text and numeric cells alike. A declared type that a cell does not fit
+#   (e.g. text in a float32 column) raises ValueError.
+# ================================================================================
@@ -4,14 +4,33 @@
 # Extracts columns with "include: YES" from legenda.yaml (skipping rows 2-4 of db.csv),
 # handles -999 values by converting them to NaN, and applies the interpolation
 # specified in legenda.yaml for each column.
-# Writes the result with numerical headers to db_clean.csv.
+# Column selection, the optional "dtype" of each legend entry and the -999 check
+# are applied while parsing (typed_loader.py), the interpolation by method group
+# (imputation.py); both modules are shared with athena.
+# Writes the result with numerical headers to db_clean.csv (or, with --format,
+# to db_clean.parquet / db_clean.feather).
+# With --stream, db.csv is processed in chunks of --chunk-rows rows, so memory use
+# does not grow with the size of the file (see "Streaming mode" below).
+# With --incremental, only the rows appended to db.csv since the previous run are
+# processed and appended to db_clean.csv (see "Incremental mode" below).
 
+import argparse
 import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
 import yaml
 from pathlib import Path
 import numpy as np
 import pandas as pd
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "athena"))   # Shared loaders
+from imputation import imputation_plan, impute
+from typed_loader import legend_dtypes, read_typed_csv
+
 # === Paths ===
 CSV_INPUT_PATH = Path("db.csv")
 YAML_PATH = Path("datacheck/legenda.yaml")
@@ -19,121 +38,520 @@ CSV_OUTPUT_PATH = Path("db_clean.csv")
 
 # === Value to replace with NaN ===
 VALUE_TO_REPLACE = "-999"
+NA_VALUES = [VALUE_TO_REPLACE, int(VALUE_TO_REPLACE)]  # Text and numeric cells (-999, -999.0)
 
 # === Number of rows to skip AFTER the header ===
 ROWS_TO_SKIP = 3
 
-# === Load YAML legend ===
-try:
-    with open(YAML_PATH, "r", encoding="utf-8") as f:
-        legend_data = yaml.safe_load(f)
-except FileNotFoundError:
-    print(f"Error: The file '{YAML_PATH}' was not found.")
-    exit(1)
-except yaml.YAMLError as e:
-    print(f"Error reading YAML file '{YAML_PATH}': {e}")
-    exit(1)
-
-column_legend = legend_data.get("column_codes", {})
-
-# === Build code → column info map ===
-code_to_info_map = {str(k): v for k, v in column_legend.items()}
-
-# === Read headers from the first row of the CSV ===
-try:
-    with open(CSV_INPUT_PATH, "r", encoding="utf-8") as infile:
-        reader = csv.reader(infile)
-        csv_headers = next(reader)
-        print("CSV Headers read:", csv_headers) # <--- ADDED FOR DEBUGGING
-except FileNotFoundError:
-    print(f"Error: The file '{CSV_INPUT_PATH}' was not found.")
-    exit(1)
-
-# === Load data using pandas, skipping rows after the header ===
-try:
-    df = pd.read_csv(CSV_INPUT_PATH, skiprows=ROWS_TO_SKIP + 1, header=None) # +1 because we already read the header
-except FileNotFoundError:
-    print(f"Error: The file '{CSV_INPUT_PATH}' was not found.")
-    exit(1)
-except pd.errors.EmptyDataError:
-    print(f"Error: The file '{CSV_INPUT_PATH}' is empty after skipping rows.")
-    exit(1)
-except pd.errors.ParserError:
-    print(f"Error: Could not parse the CSV file '{CSV_INPUT_PATH}'. Check the formatting.")
-    exit(1)
-
-# === Build CSV column name → index map ===
-csv_name_to_index_map = {name: i for i, name in enumerate(csv_headers)}
-
-# === Identify columns to include and their interpolation logic ===
-columns_to_include_indices = {}
-legend_name_to_code_map = {v["Name"]: str(k) for k, v in column_legend.items()}
-legend_name_to_code_include_map = {v["Name"]: str(k) for k, v in column_legend.items() if str(v.get("include", "")).strip().upper() == "YES" or str(k) == "100"}
-
-indices_to_select = []
-output_column_codes = []
-
-for legend_column_name, code in legend_name_to_code_include_map.items():
-    if legend_column_name in csv_name_to_index_map:
-        csv_index = csv_name_to_index_map[legend_column_name]
-        indices_to_select.append(csv_index)
-        output_column_codes.append(code)
-    elif code == "100" and legend_column_name in csv_name_to_index_map:
-        csv_index = csv_name_to_index_map[legend_column_name]
-        indices_to_select.append(csv_index)
-        output_column_codes.append(code)
-    elif legend_column_name in csv_name_to_index_map:
-        pass # If it's in the CSV but not "include: YES" and not "100", don't include it
-    else:
-        print(f"Warning: Column '{legend_column_name}' defined in legend not found in CSV.")
-
-# Select only the desired columns
-df_filtered = df.iloc[:, indices_to_select].copy()
-df_filtered.columns = output_column_codes
-
-# === Replace the specific value with NaN ===
-df_filtered.replace(VALUE_TO_REPLACE, np.nan, inplace=True)
-
-# === Apply specific interpolation for each column ===
-df_interpolated = df_filtered.copy()
-for column_code in df_interpolated.columns:
-    column_info = code_to_info_map.get(column_code)
-    if column_info and "interpolation" in column_info:
-        interpolation_method = column_info["interpolation"]
-        if interpolation_method.lower() == "linear":
-            df_interpolated[column_code] = df_interpolated[column_code].interpolate(method='linear')
-        elif interpolation_method.lower() == "mean":
-            df_interpolated[column_code] = df_interpolated[column_code].fillna(df_interpolated[column_code].mean())
-        elif interpolation_method.lower() == "ffill":
-            df_interpolated[column_code] = df_interpolated[column_code].ffill()
-        elif interpolation_method.lower() == "bfill":
-            df_interpolated[column_code] = df_interpolated[column_code].bfill()
-        elif interpolation_method.lower().startswith("value:"):
-            try:
-                value = float(interpolation_method.split(":")[1].strip())
-                df_interpolated[column_code] = df_interpolated[column_code].fillna(value=value)
-            except ValueError:
-                print(f"Warning: Invalid interpolation value for column '{column_code}'.")
+# === Output formats ===
+OUTPUT_FORMATS = ("csv", "parquet", "feather")
+COLUMNAR_COMPRESSION = {"parquet": "zstd", "feather": "uncompressed"}  # Uncompressed Feather can be memory-mapped by readers
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"  # Same text as str(Timestamp) for whole-second times, in every block
+
+# === Streaming mode ===
+STREAM_CHUNK_ROWS = 100_000        # Rows of db.csv read per chunk with --stream
+STREAM_MAX_PENDING_ROWS = 500_000  # Rows held back waiting for the end of a gap; a longer gap is filled as if the file ended there
+
+# === Incremental mode ===
+EXTRACT_STATE_PATH = Path("db_clean_state.json")  # Offset, last written row and 'mean' sums of the previous run
+STATE_VERSION = 1
+STATE_TAIL_BYTES = 4096            # Bytes before the stored offset that must be unchanged to continue
+
+
+def load_legend():
+    """Return the 'column_codes' section of legenda.yaml."""
+    try:
+        with open(YAML_PATH, "r", encoding="utf-8") as f:
+            legend_data = yaml.safe_load(f)
+    except FileNotFoundError:
+        print(f"Error: The file '{YAML_PATH}' was not found.")
+        exit(1)
+    except yaml.YAMLError as e:
+        print(f"Error reading YAML file '{YAML_PATH}': {e}")
+        exit(1)
+    return legend_data.get("column_codes", {})
+
+
+def read_headers():
+    """Read headers from the first row of the CSV."""
+    try:
+        with open(CSV_INPUT_PATH, "r", encoding="utf-8") as infile:
+            reader = csv.reader(infile)
+            csv_headers = next(reader)
+            print("CSV Headers read:", csv_headers) # <--- ADDED FOR DEBUGGING
+    except FileNotFoundError:
+        print(f"Error: The file '{CSV_INPUT_PATH}' was not found.")
+        exit(1)
+    return csv_headers
+
+
+def select_columns(csv_headers, column_legend):
+    """CSV positions of the columns to include and their output codes (code 100 = time is always included)."""
+    # === Build CSV column name → index map ===
+    csv_name_to_index_map = {name: i for i, name in enumerate(csv_headers)}
+
+    # === Identify columns to include and their interpolation logic ===
+    legend_name_to_code_include_map = {v["Name"]: str(k) for k, v in column_legend.items() if str(v.get("include", "")).strip().upper() == "YES" or str(k) == "100"}
+
+    indices_to_select = []
+    output_column_codes = []
+
+    for legend_column_name, code in legend_name_to_code_include_map.items():
+        if legend_column_name in csv_name_to_index_map:
+            csv_index = csv_name_to_index_map[legend_column_name]
+            indices_to_select.append(csv_index)
+            output_column_codes.append(code)
+        else:
+            print(f"Warning: Column '{legend_column_name}' defined in legend not found in CSV.")
+
+    return indices_to_select, output_column_codes
+
+
+def open_csv(columns, dtypes=None):
+    """Read the 'columns' ({CSV position: code}) of all data rows of db.csv, typed and with NA_VALUES as NaN."""
+    try:
+        return read_typed_csv(CSV_INPUT_PATH, columns, dtypes, NA_VALUES,
+                              skiprows=ROWS_TO_SKIP + 1, header=None) # +1 because we already read the header
+    except FileNotFoundError:
+        print(f"Error: The file '{CSV_INPUT_PATH}' was not found.")
+        exit(1)
+    except pd.errors.EmptyDataError:
+        print(f"Error: The file '{CSV_INPUT_PATH}' is empty after skipping rows.")
+        exit(1)
+    except pd.errors.ParserError:
+        print(f"Error: Could not parse the CSV file '{CSV_INPUT_PATH}'. Check the formatting.")
+        exit(1)
+    except ValueError as e:
+        print(f"Error: A column of '{CSV_INPUT_PATH}' does not match its legend dtype: {e}")
+        exit(1)
+
+
+def interpolate_columns(df, code_to_info_map, column_means=None, warn=True):
+    """
+    Apply each column's legenda.yaml interpolation, then fill any remaining NaNs
+    (linear, then bfill). Columns are filled in one call per method (imputation.py).
+    'column_means' overrides the column mean used by 'mean'.
+    """
+    methods = {column_code: str(code_to_info_map[column_code]["interpolation"]) for column_code in df.columns
+               if code_to_info_map.get(column_code) and "interpolation" in code_to_info_map[column_code]}
+    plan, problems = imputation_plan(methods)
+    if warn:
+        for column_code in df.columns:
+            if column_code in problems:
+                print(f"Warning: {problems[column_code]}")
+            elif column_code not in methods and column_code != "100" and str(code_to_info_map.get(column_code, {}).get("include", "")).strip().upper() == "YES":
+                print(f"Warning: No interpolation method specified for column with code '{column_code}'.")
+    return impute(df, plan, column_means)
+
+
+class OutputWriter:
+    """
+    Writes the cleaned data, one block of rows per write() call:
+    - csv: one bulk to_csv() per block (same text as csv.writer: CRLF, 'nan' for missing values,
+      times as CSV_DATE_FORMAT even when a block holds only midnights)
+    - parquet / feather: one row group / record batch per block
+    The first block fixes the column dtypes of every format (integer columns become float64,
+    a later block may contain gaps), so a column is written the same way in every block.
+    Column names are the legend codes.
+    """
+
+    def __init__(self, output_format, path, columns, append=False):
+        self.output_format = output_format
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._dtypes = None
+        self._schema = None
+        if output_format == "csv":
+            self._file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+            if not append:
+                csv.writer(self._file).writerow(columns)   # Header row (codes)
+
+    def _typed(self, df):
+        """'df' with the column dtypes of the first block written."""
+        if self._dtypes is None:
+            df = df.astype({col: "float64" for col in df.columns if pd.api.types.is_integer_dtype(df[col])})
+            self._dtypes = df.dtypes.to_dict()
+            return df
+        return df.astype(self._dtypes)
+
+    def _arrow_table(self, df):
+        import pyarrow as pa
+
+        if self._schema is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            return table
+        return pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+    def write(self, df):
+        df = self._typed(df)
+        if self.output_format == "csv":
+            df.to_csv(self._file, header=False, index=False, lineterminator="\r\n", na_rep="nan",
+                      date_format=CSV_DATE_FORMAT)
         else:
-            print(f"Warning: Interpolation method '{interpolation_method}' not recognized for column '{column_code}'.")
-        # Force interpolation to fill any remaining NaNs
-        df_interpolated[column_code] = df_interpolated[column_code].interpolate(method='linear').bfill()
-    elif column_code != "100" and str(code_to_info_map.get(column_code, {}).get("include", "")).strip().upper() == "YES":
-        print(f"Warning: No interpolation method specified for column with code '{column_code}'.")
-
-# === Write the output to db_clean.csv ===
-try:
-    with open(CSV_OUTPUT_PATH, "w", newline="", encoding="utf-8") as outfile:
-        writer = csv.writer(outfile)
-        # Write the header row (codes)
-        writer.writerow(df_interpolated.columns.tolist())
-        # Write all data rows from the interpolated DataFrame
-        for index, row in df_interpolated.iterrows():
-            writer.writerow(row.tolist())
+            table = self._arrow_table(df)
+            if self._writer is None:
+                self._writer = _open_columnar_writer(self.output_format, self.path, table.schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._writer is not None:
+            self._writer.close()
+        elif self.output_format != "csv":
+            self.write(pd.DataFrame(columns=self.columns))   # No rows: still write a readable empty file
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_columnar_writer(output_format, path, schema):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    compression = COLUMNAR_COMPRESSION[output_format]
+    if output_format == "parquet":
+        return pq.ParquetWriter(path, schema, compression=compression)
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "uncompressed" else compression)
+    return pa.ipc.new_file(path, schema, options=options)   # Feather V2 = Arrow IPC file format
+
+
+def output_path(output_format):
+    return CSV_OUTPUT_PATH if output_format == "csv" else CSV_OUTPUT_PATH.with_suffix(f".{output_format}")
+
+
+# === Streaming mode ===
+# A row is written once no later row can change its filled values. Gaps that are
+# filled from the next valid value (linear, bfill and the final linear/bfill pass)
+# stay pending until that value arrives; the pending rows are carried into the
+# next chunk. The last written row is prepended to each chunk as context, so
+# ffill and linear continue exactly where the previous chunk stopped.
+# Rows are read by byte offset, so the same state lets a later run (--incremental)
+# continue from the first row it has not written yet.
+
+def data_start_offset():
+    """Byte offset of the first data row of db.csv (after the header and the ROWS_TO_SKIP rows)."""
+    try:
+        with open(CSV_INPUT_PATH, "rb") as f:
+            for _ in range(ROWS_TO_SKIP + 1):
+                f.readline()
+            return f.tell()
+    except FileNotFoundError:
+        print(f"Error: The file '{CSV_INPUT_PATH}' was not found.")
+        exit(1)
+
+
+def data_end_offset():
+    """Byte offset just after the last complete line of db.csv (a row still being appended is left out)."""
+    with open(CSV_INPUT_PATH, "rb") as f:
+        end = f.seek(0, 2)
+        while end > 0:
+            f.seek(max(end - 65536, 0))
+            block = f.read(end - max(end - 65536, 0))
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                return end - len(block) + newline + 1
+            end -= len(block)
+    return 0
+
+
+def read_chunks(start, end, chunk_rows, columns, dtypes=None):
+    """Data rows of db.csv between byte offsets 'start' and 'end', in chunks indexed by the byte offset of each row."""
+    with open(CSV_INPUT_PATH, "rb") as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                return
+            ends = position + np.cumsum(np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)))
+            keep = int(np.searchsorted(ends, end, side="right"))   # 'end' is a line boundary
+            lines = lines[:keep]
+            offsets = np.concatenate(([position], ends[:keep - 1]))
+            blank = np.fromiter((not line.strip() for line in lines), dtype=bool, count=len(lines))
+            if blank.any():                    # Blank lines are skipped, as by read_csv
+                lines = [line for line, b in zip(lines, blank) if not b]
+                offsets = offsets[~blank]
+            position = int(ends[keep - 1])
+            if lines:
+                chunk = read_typed_csv(io.BytesIO(b"".join(lines)), columns, dtypes, NA_VALUES, header=None)
+                chunk.index = offsets
+                yield chunk
+
+
+def _is_forward_only(interpolation_method):
+    """True if, once a first valid value was seen, the method fills gaps from earlier values only."""
+    method = interpolation_method.lower()
+    if method in ("ffill", "mean"):
+        return True
+    if method.startswith("value:"):
+        try:
+            float(method.split(":")[1].strip())
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def resolved_row_count(frame, offset, code_to_info_map):
+    """Number of rows of frame[offset:] before the first gap that is still open."""
+    resolved = len(frame) - offset
+    for column_code in frame.columns:
+        column_info = code_to_info_map.get(column_code)
+        if not column_info or "interpolation" not in column_info:
+            continue
+        valid = np.flatnonzero(frame[column_code].notna().to_numpy())
+        if valid.size == 0:
+            resolved = 0                       # Leading gap: filled from the first valid value
+        elif not _is_forward_only(column_info["interpolation"]):
+            resolved = min(resolved, max(valid[-1] + 1 - offset, 0))
+    return resolved
+
+
+def mean_columns(indices_to_select, output_column_codes, code_to_info_map):
+    """(CSV position, code) of the columns filled with 'mean'."""
+    return [(i, code) for i, code in zip(indices_to_select, output_column_codes)
+            if str(code_to_info_map.get(code, {}).get("interpolation", "")).lower() == "mean"]
+
+
+def column_sums(df, codes):
+    """{code: [sum, count]} of the valid values of each column."""
+    sums = {}
+    for code in codes:
+        values = pd.to_numeric(df[code])
+        sums[code] = [float(values.sum()), int(values.count())]
+    return sums
+
+
+def add_sums(total, sums, sign=1):
+    for code, (value_sum, count) in sums.items():
+        previous = total.get(code, [0.0, 0])
+        total[code] = [previous[0] + sign * value_sum, previous[1] + sign * count]
+    return total
+
+
+def stream_extract(indices_to_select, output_column_codes, code_to_info_map, output, start, end,
+                   chunk_rows=STREAM_CHUNK_ROWS, max_pending_rows=STREAM_MAX_PENDING_ROWS,
+                   context=None, sums=None, hold_open_gaps=False, dtypes=None):
+    """
+    Process the rows of db.csv between byte offsets 'start' and 'end' chunk by chunk and
+    write the filled rows as soon as they are final. 'context' (last row written before
+    'start') and 'sums' (running sums of the 'mean' columns over the rows before 'start')
+    continue an earlier run. With 'hold_open_gaps', rows at the end whose gap is still open
+    are not written. Returns the state to continue from: rows written, offset of the first
+    row not written, context and sums.
+    """
+    # First pass: the 'mean' columns are filled with the mean of every row up to 'end'
+    sums = add_sums({}, sums or {})
+    means_at = mean_columns(indices_to_select, output_column_codes, code_to_info_map)
+    if means_at:
+        for chunk in read_chunks(start, end, chunk_rows, dict(means_at), dtypes):
+            add_sums(sums, column_sums(chunk, chunk.columns))
+    mean_codes = [code for _, code in means_at]
+    means = {code: sums[code][0] / sums[code][1] if sums.get(code, [0, 0])[1] else np.nan for code in mean_codes}
+
+    pending = None                             # Rows read but not written yet (raw values)
+    written = 0
+    first_chunk = True
+
+    def write_rows(resolved):
+        nonlocal context, pending, written, first_chunk
+        frame = pending if context is None else pd.concat([context, pending])
+        offset = 0 if context is None else 1
+        filled = interpolate_columns(frame, code_to_info_map, means, warn=first_chunk)
+        first_chunk = False
+        output.write(filled.iloc[offset:offset + resolved])
+        context = filled.iloc[offset + resolved - 1:offset + resolved]
+        pending = pending.iloc[resolved:]
+        written += int(resolved)
+
+    for chunk in read_chunks(start, end, chunk_rows, dict(zip(indices_to_select, output_column_codes)), dtypes):
+        pending = chunk if pending is None else pd.concat([pending, chunk])
+        frame = pending if context is None else pd.concat([context, pending])
+        offset = 0 if context is None else 1
+
+        resolved = resolved_row_count(frame, offset, code_to_info_map)
+        if resolved == 0 and len(pending) < max_pending_rows:
+            continue
+        if len(pending) >= max_pending_rows and resolved < len(pending):
+            print(f"Warning: Gap longer than {max_pending_rows} rows; filled as if the file ended at row {written + len(pending)}.")
+            resolved = len(pending)
+        write_rows(resolved)
+
+    if pending is not None and len(pending) and not hold_open_gaps:
+        write_rows(len(pending))
+
+    held = pending is not None and len(pending) > 0
+    if held:
+        add_sums(sums, column_sums(pending, mean_codes), sign=-1)   # Read again by the next run
+    return {
+        "rows": written,
+        "offset": int(pending.index[0]) if held else end,
+        "context": context,
+        "sums": {code: sums[code] for code in mean_codes if code in sums},
+    }
+
+
+# === Incremental mode ===
+# The stream state (offset of the first row not written, last written row, sums of
+# the 'mean' columns) is kept in EXTRACT_STATE_PATH between runs. A later run reads
+# only the rows from that offset and appends them to db_clean.csv. Everything is
+# rebuilt when legenda.yaml or the CSV header changed, or when db.csv / db_clean.csv
+# no longer match the state (rewritten, truncated or edited).
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def tail_hash(offset):
+    """Hash of the bytes of db.csv just before 'offset' (the last rows already processed)."""
+    start = max(offset - STATE_TAIL_BYTES, 0)
+    with open(CSV_INPUT_PATH, "rb") as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def _json_value(value):
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return str(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def load_extract_state(legend_hash, csv_headers, output_column_codes, dtypes=None):
+    """Return (state, None) if the previous run can be continued, else (None, reason for a full rebuild)."""
+    try:
+        with open(EXTRACT_STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None, "no previous state"
+    if state.get("version") != STATE_VERSION:
+        return None, "state from another version"
+    if state.get("legend_hash") != legend_hash:
+        return None, f"'{YAML_PATH}' changed"
+    if state.get("headers") != csv_headers or state.get("columns") != output_column_codes:
+        return None, f"columns of '{CSV_INPUT_PATH}' changed"
+    if not CSV_OUTPUT_PATH.exists() or CSV_OUTPUT_PATH.stat().st_size != state.get("output_bytes"):
+        return None, f"'{CSV_OUTPUT_PATH}' was modified"
+    if CSV_INPUT_PATH.stat().st_size < state["offset"] or tail_hash(state["offset"]) != state.get("tail_hash"):
+        return None, f"'{CSV_INPUT_PATH}' was rewritten"
+    context = None
+    if state.get("context") is not None:
+        context = pd.DataFrame([state["context"]], columns=output_column_codes).astype(dtypes or {})
+    state["context"] = context
+    return state, None
+
+
+def save_extract_state(legend_hash, csv_headers, output_column_codes, result, rows):
+    context = result["context"]
+    state = {
+        "version": STATE_VERSION,
+        "legend_hash": legend_hash,
+        "headers": csv_headers,
+        "columns": output_column_codes,
+        "offset": result["offset"],
+        "tail_hash": tail_hash(result["offset"]),
+        "rows": rows,
+        "context": None if context is None else [_json_value(v) for v in context.iloc[0].tolist()],
+        "sums": result["sums"],
+        "output_bytes": CSV_OUTPUT_PATH.stat().st_size,
+    }
+    tmp_path = EXTRACT_STATE_PATH.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, EXTRACT_STATE_PATH)
+
+
+def incremental_extract(csv_headers, indices_to_select, output_column_codes, code_to_info_map, chunk_rows, dtypes=None):
+    """Append the rows added to db.csv since the last run to db_clean.csv (full rebuild if needed)."""
+    legend_hash = file_hash(YAML_PATH)
+    state, reason = load_extract_state(legend_hash, csv_headers, output_column_codes, dtypes)
+    append = state is not None
+    if state is None:
+        print(f"Full rebuild of '{CSV_OUTPUT_PATH}': {reason}.")
+        state = {"offset": data_start_offset(), "context": None, "sums": {}, "rows": 0}
+
+    with OutputWriter("csv", CSV_OUTPUT_PATH, output_column_codes, append=append) as output:
+        result = stream_extract(indices_to_select, output_column_codes, code_to_info_map, output,
+                                state["offset"], data_end_offset(), chunk_rows,
+                                context=state["context"], sums=state["sums"], hold_open_gaps=True, dtypes=dtypes)
+    save_extract_state(legend_hash, csv_headers, output_column_codes, result, state["rows"] + result["rows"])
+    return result["rows"], state["rows"] + result["rows"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and interpolate the legend columns of db.csv into db_clean.csv.")
+    parser.add_argument("--stream", action="store_true", help="Process db.csv in chunks (bounded memory)")
+    parser.add_argument("--incremental", action="store_true", help="Process only the rows appended since the last run (csv output, chunked)")
+    parser.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS, help="Rows per chunk with --stream / --incremental")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Output file: db_clean.csv, .parquet or .feather")
+    args = parser.parse_args()
+
+    column_legend = load_legend()
+
+    # === Build code → column info map ===
+    code_to_info_map = {str(k): v for k, v in column_legend.items()}
+
+    csv_headers = read_headers()
+    indices_to_select, output_column_codes = select_columns(csv_headers, column_legend)
+    dtypes = {code: dtype for code, dtype in legend_dtypes(column_legend).items() if code in output_column_codes}
+    output_file = output_path(args.format)
+
+    if args.incremental:
+        if args.format != "csv":
+            print("Error: --incremental appends to db_clean.csv; use it with --format csv.")
+            exit(1)
+        try:
+            added, total = incremental_extract(csv_headers, indices_to_select, output_column_codes, code_to_info_map,
+                                               args.chunk_rows, dtypes)
+            print(f"File '{output_file}' updated: {added} new data rows appended ({total} in total).")
+        except Exception as e:
+            print(f"Error during writing to file '{output_file}': {e}")
+        return
+
+    if args.stream:
+        try:
+            with OutputWriter(args.format, output_file, output_column_codes) as output:
+                result = stream_extract(indices_to_select, output_column_codes, code_to_info_map, output,
+                                        data_start_offset(), data_end_offset(), args.chunk_rows, dtypes=dtypes)
+            rows = result["rows"]
+            if rows == 0:
+                print("Warning: The interpolated DataFrame is empty, no data written.")
+            else:
+                print(f"File '{output_file}' generated successfully with {rows} data rows and {len(output_column_codes)} columns (streamed in chunks of {args.chunk_rows} rows).")
+        except Exception as e:
+            print(f"Error during writing to file '{output_file}': {e}")
+        return
+
+    # === Load the selected columns (typed, -999 as NaN), skipping rows after the header ===
+    df_filtered = open_csv(dict(zip(indices_to_select, output_column_codes)), dtypes)
+
+    # === Apply specific interpolation for each column ===
+    df_interpolated = interpolate_columns(df_filtered, code_to_info_map)
+
+    # === Write the output (header row = codes, then all data rows in one bulk write) ===
+    try:
+        with OutputWriter(args.format, output_file, df_interpolated.columns.tolist()) as output:
+            output.write(df_interpolated)
         if df_interpolated.empty:
             print("Warning: The interpolated DataFrame is empty, no data written.")
         else:
-            print(f"File '{CSV_OUTPUT_PATH}' generated successfully with {len(df_interpolated)} data rows and {len(df_interpolated.columns)} columns (values -999 replaced and specific interpolation applied).")
+            print(f"File '{output_file}' generated successfully with {len(df_interpolated)} data rows and {len(df_interpolated.columns)} columns (values -999 replaced and specific interpolation applied).")
+
+    except Exception as e:
+        print(f"Error during writing to file '{output_file}': {e}")
+
 
-except Exception as e:
-    print(f"Error during writing to file '{CSV_OUTPUT_PATH}': {e}")
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,45 @@
 #!/usr/bin/env python3
 # Script: importDB.py
 # Purpose: Downloads the "Data" sheet from Google Sheets and saves it locally as "db.csv",
-#          correctly escaping newline characters within cells
+#          correctly escaping newline characters within cells.
+#          After the first run only the rows appended since the last sync are fetched
+#          and appended to "db.csv" (watermark stored in "db_sync.json").
 
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import csv
+import json
+import os
 
 # === CONFIGURATION ===
 SPREADSHEET_ID = 'YOUR_SPREADSHEET_ID'  # Replace with your Google Sheets ID
 TAB_NAME = 'Data'
 OUTPUT_FILE = 'db.csv'
+STATE_FILE = 'db_sync.json'             # Synced row count, header and file size of OUTPUT_FILE
 CREDENTIALS_FILE = 'your_credentials.json' # Replace with your credentials file name
 
+
+def escape_row(row):
+    return [cell.replace('\n', '\\n') for cell in row]
+
+
+def load_state():
+    """Return the previous sync state if it still matches OUTPUT_FILE, else None."""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(OUTPUT_FILE) or os.path.getsize(OUTPUT_FILE) != state.get("bytes"):
+        return None  # db.csv was edited or removed outside this script
+    return state
+
+
+def save_state(rows, header):
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"rows": rows, "header": header, "bytes": os.path.getsize(OUTPUT_FILE)}, f)
+
+
 # === AUTHENTICATION ===
 scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
 creds = ServiceAccountCredentials.from_json_keyfile_name(CREDENTIALS_FILE, scope)
@@ -20,12 +47,28 @@ client = gspread.authorize(creds)
 
 # === ACCESSING THE SHEET ===
 sheet = client.open_by_key(SPREADSHEET_ID).worksheet(TAB_NAME)
-all_rows = sheet.get_all_values()
+header = sheet.row_values(1)
+state = load_state()
 
-# === WRITING TO CSV FILE (CORRECT ESCAPING OF NEWLINES) ===
-with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-    for row in all_rows:
-        writer.writerow([cell.replace('\n', '\\n') for cell in row])
+if state is not None and state.get("header") == header:
+    # === INCREMENTAL SYNC: only rows after the last synced one ===
+    last_col = gspread.utils.rowcol_to_a1(1, len(header))[:-1]  # e.g. 'AB1' -> 'AB'
+    new_rows = sheet.get(f"A{state['rows'] + 1}:{last_col}") or []
+    with open(OUTPUT_FILE, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        for row in new_rows:
+            row = list(row) + [''] * (len(header) - len(row))  # The API trims trailing empty cells
+            writer.writerow(escape_row(row))
+    save_state(state['rows'] + len(new_rows), header)
+    print(f"[OK] Appended {len(new_rows)} new rows from sheet 'Data' to 'db.csv'")
+else:
+    # === FULL SYNC (first run, header change or modified db.csv) ===
+    all_rows = sheet.get_all_values()
 
-print("[OK] Sheet 'Data' successfully saved as 'db.csv'")
+    # === WRITING TO CSV FILE (CORRECT ESCAPING OF NEWLINES) ===
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        for row in all_rows:
+            writer.writerow(escape_row(row))
+    save_state(len(all_rows), header)
+    print("[OK] Sheet 'Data' successfully saved as 'db.csv'")